@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 class Settings(BaseSettings):
@@ -15,6 +15,75 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     AI_MODEL: str = "gpt-3.5-turbo"
     
+    # Client OpenAI partagé (pool HTTP par worker)
+    OPENAI_TIMEOUT: float = 30.0
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_MAX_CONCURRENCY: int = 32
+    
+    # Budget de temps d'une requête du copilot (recherche + génération) ; au-delà, réponse partielle
+    AI_REQUEST_TIMEOUT_SECONDS: float = 20.0
+    # Threads des étapes exécutées sous deadline ; pool saturé : l'étape s'exécute dans le thread appelant
+    DEADLINE_EXECUTOR_WORKERS: int = 32
+    
+    # Caches mémoire du service IA (LRU + TTL)
+    AI_RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    AI_RESPONSE_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    AI_EMBEDDING_CACHE_MAX_ENTRIES: int = 5000
+    AI_EMBEDDING_CACHE_MAX_BYTES: int = 100 * 1024 * 1024
+    AI_CACHE_TTL_SECONDS: int = 3600
+    
+    # Cache sémantique (questions reformulées) ; seuils par portée, ex. {"articles:3": 0.9}
+    SEMANTIC_CACHE_THRESHOLD: float = 0.82
+    SEMANTIC_CACHE_SCOPE_THRESHOLDS: Dict[str, float] = {}
+    SEMANTIC_CACHE_MAX_ENTRIES_PER_SCOPE: int = 2000
+    
+    # Compteurs d'utilisation de ConstitutionCache : écriture groupée toutes les N secondes ou N hits
+    CACHE_HIT_FLUSH_INTERVAL: float = 5.0
+    CACHE_HIT_FLUSH_THRESHOLD: int = 100
+    
+    # Embeddings persistés (clé : SHA-256 du modèle et du texte du chunk)
+    EMBEDDING_STORE_PATH: str = "embedding_store/embeddings.sqlite3"
+    
+    # Backend d'embeddings : "openai" ou "local" (sentence-transformers sur CPU, runtime "torch" ou "onnx")
+    EMBEDDING_BACKEND: str = "openai"
+    EMBEDDING_OPENAI_MODEL: Optional[str] = None
+    # Textes par requête à l'API d'embeddings OpenAI (EMBEDDING_BATCH_SIZE : lots d'encodage du modèle local)
+    EMBEDDING_OPENAI_BATCH_SIZE: int = 256
+    EMBEDDING_LOCAL_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    EMBEDDING_LOCAL_DEVICE: str = "cpu"
+    # "torch" ou "onnx" (ONNX requiert sentence-transformers >= 3.2)
+    EMBEDDING_LOCAL_RUNTIME: str = "torch"
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_WORKERS: int = 2
+    
+    # Cache de réponses à deux niveaux (L1 mémoire du worker, L2 partagé : "sqlite", "redis" ou "none")
+    SHARED_CACHE_BACKEND: str = "sqlite"
+    SHARED_CACHE_PATH: str = "shared_cache/responses.sqlite3"
+    SHARED_CACHE_URL: str = "redis://localhost:6379/0"
+    SHARED_CACHE_L1_TTL_SECONDS: float = 60.0
+    
+    # Index en lecture seule partagé par les workers (mmap) : vecteurs, textes des chunks, postings BM25
+    SHARED_INDEX_ENABLED: bool = True
+    SHARED_INDEX_PATH: str = "shared_index"
+    
+    # Extraction des PDF : processus du pool (0 = nombre de cœurs), pages minimum pour paralléliser
+    PDF_EXTRACTION_WORKERS: int = 0
+    PDF_PARALLEL_MIN_PAGES: int = 16
+    # OCR des seules pages sans couche texte, dans un pool borné
+    PDF_OCR_WORKERS: int = 2
+    PDF_OCR_DPI: int = 200
+    PDF_OCR_LANG: str = "fra"
+    PDF_OCR_MIN_CHARS: int = 10
+    # Artefacts d'extraction (texte, articles, métadonnées GPT-4) indexés par SHA-256 du fichier
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_PATH: str = "extraction_cache"
+    
+    # Préchauffage au démarrage (index RAG, classements BM25, requête témoin) ; /ready répond 503 avant la fin
+    AI_WARMUP_ENABLED: bool = True
+    AI_WARMUP_QUERY: str = "Quels sont les droits fondamentaux garantis par la constitution ?"
+    
     # Application
     APP_NAME: str = "ConstitutionIA"
     DEBUG: bool = True
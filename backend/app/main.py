@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.routers import ai_copilot, constitutions, chatnow
 from app.database import engine
+from app.services.fts_search import ensure_fts_tables
+from app.services.llm_client import close_openai_clients
+from app.services.cache_hit_buffer import stop_cache_hit_buffer
+from app.services.warmup_service import get_warmup_service, start_warmup
+from app.services.pdf_extraction import shutdown_extraction_pool
 from app.models import constitution, user
 from app.services.automation_service import start_automation_service, stop_automation_service
 import os
@@ -41,6 +47,11 @@ app.include_router(chatnow.router, tags=["ChatNow"])
 async def startup_event():
     """Événement de démarrage de l'application"""
     print("🚀 Démarrage de ConstitutionIA API")
+    
+    # Index plein texte FTS5 (tables virtuelles + triggers de synchronisation)
+    if ensure_fts_tables(engine):
+        print("✅ Index FTS5 des articles prêt")
+    
     print("📋 Initialisation du service d'automatisation...")
     
     # Démarrer le service d'automatisation
@@ -50,7 +61,10 @@ async def startup_event():
     atexit.register(stop_automation_service)
     
     print("✅ Service d'automatisation démarré")
-    print("✅ ConstitutionIA API prête")
+    
+    # Préchauffage IA en arrière-plan : /ready répond 503 tant que les classements BM25 et l'index RAG ne sont pas prêts
+    start_warmup()
+    print("✅ ConstitutionIA API démarrée (préchauffage en cours, voir /ready)")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -61,6 +75,15 @@ async def shutdown_event():
     # Arrêter le service d'automatisation
     stop_automation_service()
     
+    # Écrire les compteurs d'utilisation du cache encore en mémoire
+    stop_cache_hit_buffer()
+    
+    # Arrêter les processus d'extraction PDF
+    shutdown_extraction_pool()
+    
+    # Fermer les pools de connexions OpenAI
+    await close_openai_clients()
+    
     print("✅ Service d'automatisation arrêté")
     print("✅ ConstitutionIA API arrêtée")
 
@@ -72,6 +95,16 @@ async def root():
 async def health_check():
     return {"status": "healthy", "system": "RAG with FAISS"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Disponibilité pour le répartiteur de charge : 200 dès que les étapes requises du préchauffage sont prêtes
+    (classements BM25 et index RAG s'il est configuré), 503 avant ou si l'une d'elles a échoué ;
+    crud_ready signale un worker qui peut déjà servir les routes CRUD / fichiers
+    """
+    status = get_warmup_service().get_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.get("/automation/status")
 async def get_automation_status():
     """Obtenir le statut du service d'automatisation"""
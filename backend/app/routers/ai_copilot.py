@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
@@ -8,13 +10,24 @@ from app.models.constitution import Constitution as ConstitutionModel
 from app.services.optimized_ai_service import get_optimized_ai_service
 from app.services.pdf_analyzer import PDFAnalyzer
 from app.services.monitoring_service import monitoring_service
-import openai
+from app.services.bm25_ranker import get_articles_ranker
 from app.core.config import settings
 from pathlib import Path
-from openai import OpenAI
+from app.services.llm_client import chat_completion
+from app.services.sse import SSE_HEADERS, sse_event
+from app.services.semantic_cache import constitution_scope, get_semantic_cache
 
 router = APIRouter()
 
+def _load_articles_in_order(db: Session, article_ids: List[int]) -> list:
+    """Charge les articles par identifiant en conservant l'ordre du classement"""
+    from app.models.pdf_import import Article
+    if not article_ids:
+        return []
+    articles = db.query(Article).filter(Article.id.in_(article_ids)).all()
+    articles_by_id = {article.id: article for article in articles}
+    return [articles_by_id[article_id] for article_id in article_ids if article_id in articles_by_id]
+
 class AIQuery(BaseModel):
     query: str
     context: Optional[str] = None
@@ -34,6 +47,8 @@ class PDFChatRequest(BaseModel):
     question: str
     filename: str
     context: Optional[str] = None
+    part: Optional[str] = None  # Restreindre la recherche à une partie de la constitution
+    section: Optional[str] = None  # ... ou à une section
 
 class PDFChatResponse(BaseModel):
     response: str
@@ -51,6 +66,38 @@ class EnhancedSearchResponse(BaseModel):
     search_time: float
     query: str
 
+async def _retrieve_constitution_articles(db: Session, request: PDFChatRequest, constitution_id: int, top_k: int) -> list:
+    """
+    Articles pertinents d'une constitution : recherche hybride sur son sous-index FAISS
+    (filtrable par partie / section), classement BM25 de la constitution en secours
+    """
+    try:
+        hits = await run_in_threadpool(
+            get_optimized_ai_service().hybrid_search,
+            request.question,
+            top_k,
+            constitution_id,
+            request.part,
+            request.section
+        )
+        article_ids = [hit["article_id"] for hit in hits if hit.get("article_id")]
+    except Exception as e:
+        print(f"Recherche hybride indisponible, classement BM25: {str(e)}")
+        filters = {field: value for field, value in (("part", request.part), ("section", request.section)) if value}
+        # Avec un filtre, plus de candidats : ceux hors de la partie / section demandée sont écartés
+        ranked = get_articles_ranker(db).search(
+            request.question,
+            partition=constitution_id,
+            top_k=max(top_k * 10, 50) if filters else top_k
+        )
+        articles = _load_articles_in_order(db, [article_id for article_id, score in ranked])
+        matching = [
+            article for article in articles
+            if all(getattr(article, field) == value for field, value in filters.items())
+        ]
+        return matching[:top_k]
+    return _load_articles_in_order(db, article_ids)
+
 @router.post("/chat", response_model=AIResponse)
 async def chat_with_ai(
     query: AIQuery,
@@ -68,8 +115,10 @@ async def chat_with_ai(
         
         search_time = time.time() - start_time
         
-        # Génération de la réponse IA avec le service optimisé
-        response = ai_service.generate_response(
+        # Génération de la réponse IA avec le service optimisé, hors de la boucle d'événements
+        # (les requêtes identiques simultanées sont regroupées par le service)
+        response = await run_in_threadpool(
+            ai_service.generate_response,
             query.query,
             constitutions,
             context=query.context,
@@ -78,17 +127,7 @@ async def chat_with_ai(
         )
         
         # Convertir les résultats en format attendu
-        sources = []
-        if response.get("sources"):
-            for source in response["sources"]:
-                if isinstance(source, dict):
-                    sources.append(source)
-                else:
-                    # Si c'est un tuple (constitution, score, chunk)
-                    sources.append({
-                        "title": source[0].title if hasattr(source[0], 'title') else "Document",
-                        "content": source[2][:200] + "..." if len(source) > 2 else ""
-                    })
+        sources = _format_sources(response.get("sources"))
         
         return AIResponse(
             answer=response["answer"],
@@ -101,6 +140,63 @@ async def chat_with_ai(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur IA: {str(e)}")
 
+def _format_sources(raw_sources) -> List[Dict[str, Any]]:
+    """Convertit les sources du service IA au format de AIResponse"""
+    sources = []
+    for source in raw_sources or []:
+        if isinstance(source, dict):
+            sources.append(source)
+        else:
+            # Si c'est un tuple (constitution, score, chunk)
+            sources.append({
+                "title": source[0].title if hasattr(source[0], 'title') else "Document",
+                "content": source[2][:200] + "..." if len(source) > 2 else ""
+            })
+    return sources
+
+@router.post("/chat/stream")
+async def chat_with_ai_stream(
+    query: AIQuery,
+    db: Session = Depends(get_db)
+):
+    """
+    Variante en streaming (Server-Sent Events) de /chat
+    Événements : "token" pour chaque fragment généré, puis "done" avec la réponse complète ;
+    une réponse connue d'avance (cache, question simple) est envoyée en un seul événement "message"
+    """
+    try:
+        ai_service = get_optimized_ai_service()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur IA: {str(e)}")
+    
+    constitutions = db.query(ConstitutionModel).filter(ConstitutionModel.is_active == True).all()
+    
+    def to_payload(response: Dict[str, Any]) -> Dict[str, Any]:
+        return AIResponse(
+            answer=response["answer"],
+            sources=_format_sources(response.get("sources")),
+            confidence=response["confidence"],
+            suggestions=response.get("suggestions", []),
+            search_time=response.get("search_time")
+        ).dict()
+    
+    async def event_stream():
+        async for kind, content in ai_service.astream_response(
+            query.query,
+            constitutions,
+            context=query.context,
+            user_id=query.user_id,
+            session_id=query.session_id
+        ):
+            if kind == "delta":
+                yield sse_event("token", {"delta": content})
+            elif kind == "response":
+                yield sse_event("message", to_payload(content))
+            else:
+                yield sse_event("done", to_payload(content))
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/refresh-vector-db")
 async def refresh_vector_database():
     """Rafraîchit la base vectorielle avec les nouvelles données"""
@@ -131,76 +227,39 @@ async def semantic_search(
     max_results: int = 10,
     db: Session = Depends(get_db)
 ):
-    """Recherche sémantique améliorée dans les constitutions"""
+    """
+    Recherche sémantique améliorée dans les constitutions
+    Passages FAISS et articles trouvés par mots-clés, fusionnés par RRF (un résultat par article)
+    """
     import time
     start_time = time.time()
     
     try:
         ai_service = get_optimized_ai_service()
-        
-        # Utiliser la recherche optimisée
-        constitutions = db.query(ConstitutionModel).filter(ConstitutionModel.is_active == True).all()
-        
-        # Recherche optimisée avec cache
-        response = ai_service.generate_response(query, constitutions)
-        
-        # Convertir en format de recherche
-        if response["confidence"] > 0.3:
-            return EnhancedSearchResponse(
-                results=[SearchResult(
-                    constitution=ConstitutionModel(title="Document optimisé"),
-                    relevance_score=response["confidence"],
-                    matched_chunk=response["answer"][:200]
-                )],
-                total_found=1,
-                search_time=response["search_time"],
-                query=query
+        hits = await run_in_threadpool(ai_service.hybrid_search, query, max_results)
+        
+        constitution_ids = {hit["constitution_id"] for hit in hits if hit.get("constitution_id") is not None}
+        constitutions = {
+            constitution.id: constitution
+            for constitution in db.query(ConstitutionModel).filter(ConstitutionModel.id.in_(constitution_ids)).all()
+        } if constitution_ids else {}
+        
+        # Score relatif au meilleur passage (le score RRF brut dépend du nombre de classements)
+        best_score = hits[0]["score"] if hits else 1.0
+        results = [
+            SearchResult(
+                constitution=constitutions[hit["constitution_id"]],
+                relevance_score=round(hit["score"] / best_score, 4),
+                matched_chunk=hit["content"][:300]
             )
-        
-        # Fallback avec recherche par mots-clés
-        keyword_results = ai_service._fast_keyword_search(query, constitutions)
-        
-        # Combiner les résultats
-        combined_results = {}
-        
-        for constitution, score, chunk in semantic_results:
-            combined_results[constitution.id] = {
-                'constitution': constitution,
-                'semantic_score': score,
-                'keyword_score': 0,
-                'chunk': chunk
-            }
-        
-        for constitution, score, chunk in keyword_results:
-            if constitution.id in combined_results:
-                combined_results[constitution.id]['keyword_score'] = score
-            else:
-                combined_results[constitution.id] = {
-                    'constitution': constitution,
-                    'semantic_score': 0,
-                    'keyword_score': score,
-                    'chunk': chunk
-                }
-        
-        # Calculer le score final
-        final_results = []
-        for result in combined_results.values():
-            final_score = (result['semantic_score'] * 0.7 + result['keyword_score'] * 0.3)
-            final_results.append(SearchResult(
-                constitution=result['constitution'],
-                relevance_score=final_score,
-                matched_chunk=result['chunk']
-            ))
-        
-        # Trier par score
-        final_results.sort(key=lambda x: x.relevance_score, reverse=True)
-        
-        search_time = time.time() - start_time
+            for hit in hits
+            if hit.get("constitution_id") in constitutions
+        ]
         
         return EnhancedSearchResponse(
-            results=final_results[:max_results],
-            total_found=len(final_results),
-            search_time=search_time,
+            results=results,
+            total_found=len(results),
+            search_time=time.time() - start_time,
             query=query
         )
         
@@ -275,14 +334,23 @@ async def chat_with_pdf(
                 detail=f"Constitution '{request.filename}' non trouvée ou supprimée. Veuillez sélectionner une constitution active."
             )
         
-        # Utiliser le service IA optimisé avec les données de la base
-        ai_service = get_optimized_ai_service()
+        # Question déjà traitée (éventuellement reformulée) pour cette constitution
+        # (les questions restreintes à une partie / section ne passent pas par le cache)
+        cache_scope = constitution_scope("pdf", constitution.id)
+        use_cache = not (request.part or request.section)
+        semantic_match = get_semantic_cache().lookup(request.question, cache_scope) if use_cache else None
+        if semantic_match:
+            return PDFChatResponse(**semantic_match[0])
         
-        # Récupérer les articles de cette constitution
+        # Rechercher les articles pertinents pour la question dans cette constitution uniquement
         from app.models.pdf_import import Article
-        articles = db.query(Article).filter(Article.constitution_id == constitution.id).all()
+        relevant_articles = await _retrieve_constitution_articles(db, request, constitution.id, top_k=5)
+        
+        # Si aucun article pertinent, prendre les premiers articles
+        if not relevant_articles:
+            relevant_articles = db.query(Article).filter(Article.constitution_id == constitution.id).limit(3).all()
         
-        if not articles:
+        if not relevant_articles:
             raise HTTPException(status_code=400, detail="Aucun article trouvé pour cette constitution")
         
         # Créer un contexte spécifique à cette constitution
@@ -292,39 +360,6 @@ async def chat_with_pdf(
         context_parts.append("IMPORTANT: Utilisez uniquement le titre de la constitution, jamais le nom du fichier technique.")
         context_parts.append("")
         
-        # Rechercher les articles pertinents pour la question
-        import re
-        def tokenize(text: str):
-            return re.findall(r"\w+", text.lower())
-        
-        # Stopwords FR minimales
-        stop = {"le","la","les","de","des","du","un","une","et","en","d","l","au","aux","que","qui","dans","sur","pour","par","auprès","avec","sans","ne","pas","est","sont","ou","à","au","aux","se","ce","cet","cette"}
-        question_tokens = [t for t in tokenize(request.question) if t not in stop]
-        
-        # Scorer les articles par pertinence
-        scored_articles = []
-        for article in articles:
-            content_tokens = tokenize(article.content)
-            score = sum(content_tokens.count(qt) for qt in question_tokens)
-            
-            # Bonus pour les mots-clés spécifiques
-            if "mandat" in question_tokens and "mandat" in content_tokens:
-                score += 5
-            if "président" in question_tokens and "président" in content_tokens:
-                score += 5
-            if "durée" in question_tokens and any(word in content_tokens for word in ["ans", "années", "durée"]):
-                score += 3
-            
-            scored_articles.append((score, article))
-        
-        # Trier par score et prendre les plus pertinents
-        scored_articles.sort(key=lambda x: x[0], reverse=True)
-        relevant_articles = [article for score, article in scored_articles[:5] if score > 0]
-        
-        # Si aucun article pertinent, prendre les premiers articles
-        if not relevant_articles:
-            relevant_articles = articles[:3]
-        
         # Construire le contexte avec les articles pertinents (limiter la taille)
         for article in relevant_articles:
             # Limiter le contenu de chaque article pour éviter l'erreur de contexte
@@ -354,23 +389,18 @@ Contexte de la constitution {constitution.title}:
 Réponds en te basant uniquement sur cette constitution spécifique.
 IMPORTANT: Cite seulement le numéro d'article (ex: "Selon l'article 44..."), sans mentionner le nom du fichier ni le titre de la constitution."""
 
-        # Utiliser directement OpenAI pour une réponse précise
-        from openai import OpenAI
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        
+        # Utiliser directement OpenAI pour une réponse précise (client asynchrone partagé)
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            ai_response = await chat_completion(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=800,
                 temperature=0.1
             )
             
-            ai_response = response.choices[0].message.content.strip()
-            
             # Calculer la confiance
             confidence = 0.8
             if "n'est pas présente" in ai_response.lower():
@@ -378,11 +408,14 @@ IMPORTANT: Cite seulement le numéro d'article (ex: "Selon l'article 44..."), sa
             elif "article" in ai_response.lower() and constitution.title.lower() in ai_response.lower():
                 confidence = 0.9
             
-            return PDFChatResponse(
+            result = PDFChatResponse(
                 response=ai_response,
                 filename=request.filename,
                 confidence=confidence
             )
+            if use_cache:
+                get_semantic_cache().store(request.question, result.dict(), cache_scope)
+            return result
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erreur OpenAI: {str(e)}")
@@ -410,52 +443,28 @@ async def chat_with_articles(
         if not constitution:
             raise HTTPException(status_code=404, detail="Constitution non trouvée en base de données")
         
-        # Récupérer tous les articles de cette constitution
-        from app.models.pdf_import import Article
-        articles = db.query(Article).filter(
-            Article.constitution_id == constitution.id
-        ).order_by(Article.article_number).all()
-        
-        if not articles:
-            raise HTTPException(status_code=404, detail="Aucun article trouvé pour cette constitution")
-        
-        # Préparer le contexte à partir des articles
-        articles_context = []
-        for article in articles:
-            article_text = f"Article {article.article_number}"
-            if article.title:
-                article_text += f" - {article.title}"
-            article_text += f": {article.content}"
-            articles_context.append(article_text)
-        
-        # Rechercher les articles les plus pertinents pour la question
-        import re
-        def tokenize(text: str):
-            return re.findall(r"\w+", text.lower())
-        
-        # Stopwords FR minimales
-        stop = {"le","la","les","de","des","du","un","une","et","en","d","l","au","aux","que","qui","dans","sur","pour","par","auprès","avec","sans","ne","pas","est","sont","ou","à","au","aux","se","ce","cet","cette"}
-        question_tokens = [t for t in tokenize(request.question) if t not in stop]
-        
-        # Scorer les articles par pertinence
-        scored_articles = []
-        for article in articles:
-            content_tokens = tokenize(article.content)
-            score = sum(content_tokens.count(qt) for qt in question_tokens)
-            
-            # Bonus pour les mots-clés importants
-            if any(keyword in article.content.lower() for keyword in ["droit", "liberté", "pouvoir", "élection", "gouvernement"]):
-                score += 1
-            
-            scored_articles.append((score, article))
+        # Question déjà traitée (éventuellement reformulée) pour cette constitution
+        # (les questions restreintes à une partie / section ne passent pas par le cache)
+        cache_scope = constitution_scope("articles", constitution.id)
+        use_cache = not (request.part or request.section)
+        semantic_match = get_semantic_cache().lookup(request.question, cache_scope) if use_cache else None
+        if semantic_match:
+            return PDFChatResponse(**semantic_match[0])
         
-        # Trier par score et prendre les plus pertinents
-        scored_articles.sort(key=lambda x: x[0], reverse=True)
-        relevant_articles = [article for score, article in scored_articles[:10] if score > 0]
+        # Rechercher les articles les plus pertinents pour la question dans cette constitution uniquement
+        from app.models.pdf_import import Article
+        ranker = get_articles_ranker(db)
+        total_articles = ranker.partition_size(constitution.id)
+        relevant_articles = await _retrieve_constitution_articles(db, request, constitution.id, top_k=10)
         
         # Si aucun article pertinent, prendre les premiers articles
         if not relevant_articles:
-            relevant_articles = [article for score, article in scored_articles[:5]]
+            relevant_articles = db.query(Article).filter(
+                Article.constitution_id == constitution.id
+            ).order_by(Article.article_number).limit(5).all()
+        
+        if not relevant_articles:
+            raise HTTPException(status_code=404, detail="Aucun article trouvé pour cette constitution")
         
         # Construire le contexte à partir des articles pertinents
         context_chunks = []
@@ -480,7 +489,7 @@ async def chat_with_articles(
         context_info = f"""
         Constitution: {constitution.title}
         Fichier source: {constitution.filename}
-        Nombre total d'articles: {len(articles)}
+        Nombre total d'articles: {total_articles}
         Articles pertinents utilisés: {len(relevant_articles)}
         """
         
@@ -511,31 +520,33 @@ Réponds de manière structurée en citant les articles pertinents. Si l'informa
         if not openai_api_key:
             raise HTTPException(status_code=500, detail="OPENAI_API_KEY non configurée")
         
-        client = OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        ai_response = await chat_completion(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
+            model="gpt-4o-mini",
             max_tokens=1200,
             temperature=0.1
         )
         
-        ai_response = response.choices[0].message.content.strip()
-        
-        # Calculer un score de confiance basé sur la pertinence des articles
-        if relevant_articles:
-            avg_score = sum(score for score, _ in scored_articles[:len(relevant_articles)]) / len(relevant_articles)
+        # Calculer un score de confiance basé sur la pertinence (BM25) des articles retenus
+        article_scores = ranker.score(request.question, partition=constitution.id)
+        scored_articles = [article_scores[article.id] for article in relevant_articles if article.id in article_scores]
+        if scored_articles:
+            avg_score = sum(scored_articles) / len(scored_articles)
             confidence = min(0.95, max(0.3, avg_score / 10))  # Normaliser entre 0.3 et 0.95
         else:
             confidence = 0.3
         
-        return PDFChatResponse(
+        result = PDFChatResponse(
             response=ai_response,
             filename=request.filename,
             confidence=confidence
         )
+        if use_cache:
+            get_semantic_cache().store(request.question, result.dict(), cache_scope)
+        return result
         
     except HTTPException:
         raise
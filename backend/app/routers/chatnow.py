@@ -7,6 +7,7 @@ import logging
 import os
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import List
 from sqlalchemy.orm import Session
 
@@ -15,8 +16,11 @@ from app.schemas.chatnow import (
     ChatNowResponse,
     ChatNowErrorResponse
 )
-from app.services.chatnow_service import initialize_chatnow_service
+from app.services.cache_hit_buffer import get_cache_hit_buffer
+from app.services.shared_cache import get_response_cache_stats
+from app.services.chatnow_service import get_single_flight_stats, initialize_chatnow_service
 from app.services.constitution_parser import ConstitutionParser
+from app.services.sse import SSE_HEADERS, sse_event
 from app.database import get_db
 
 logger = logging.getLogger(__name__)
@@ -88,7 +92,10 @@ async def chatnow_health_check():
             "timestamp": datetime.now(),
             "version": "1.0.0",
             "txt_file": CONSTITUTION_TXT_PATH,
-            "txt_exists": True
+            "txt_exists": True,
+            "single_flight": get_single_flight_stats(),
+            "cache_hit_buffer": get_cache_hit_buffer().get_stats(),
+            "response_cache": get_response_cache_stats()
         }
     except Exception as e:
         return {
@@ -125,7 +132,7 @@ async def chatnow_conversation(request: ChatNowRequest, db: Session = Depends(ge
             )
         
         # Générer la réponse avec le service optimisé
-        response_text = chatnow_service.create_chat_response(
+        response_text = await chatnow_service.acreate_chat_response(
             question=request.question,
             chat_history=request.chat_history if hasattr(request, 'chat_history') else None,
             user_id=request.user_id
@@ -152,6 +159,70 @@ async def chatnow_conversation(request: ChatNowRequest, db: Session = Depends(ge
             detail="Erreur lors de la génération de la réponse"
         )
 
+@router.post("/chat/stream")
+async def chatnow_conversation_stream(request: ChatNowRequest, db: Session = Depends(get_db)):
+    """
+    Variante en streaming (Server-Sent Events) de /chat
+    Événements : "token" pour chaque fragment généré, puis "done" avec la réponse complète ;
+    une réponse déjà en cache est envoyée immédiatement en un seul événement "message"
+    """
+    if not request.question.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La question ne peut pas être vide"
+        )
+    
+    if not os.path.exists(CONSTITUTION_TXT_PATH):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fichier de constitution non trouvé: {CONSTITUTION_TXT_PATH}"
+        )
+    
+    initialize_chatnow_service(db)
+    from app.services.chatnow_service import chatnow_service
+    service = chatnow_service
+    
+    async def event_stream():
+        suggestions = service.get_conversation_suggestions("Constitution de la Guinée")
+        fragments = []
+        
+        async for kind, text in service.astream_chat_response(
+            question=request.question,
+            chat_history=request.chat_history,
+            user_id=request.user_id
+        ):
+            if kind == "answer":
+                yield sse_event("message", {
+                    "response": text,
+                    "constitution_title": "Constitution de la Guinée (02.txt) - Optimisé",
+                    "timestamp": datetime.now(),
+                    "suggestions": suggestions
+                })
+                return
+            if kind == "error":
+                # Flux interrompu : le client doit distinguer le texte tronqué d'une réponse complète
+                logger.warning(f"ChatNow streaming interrompu - Question: '{request.question[:50]}...'")
+                yield sse_event("error", {
+                    "detail": text,
+                    "response": "".join(fragments).strip(),
+                    "partial": True,
+                    "timestamp": datetime.now()
+                })
+                return
+            fragments.append(text)
+            yield sse_event("token", {"delta": text})
+        
+        logger.info(f"ChatNow streaming - Question: '{request.question[:50]}...'")
+        yield sse_event("done", {
+            "response": "".join(fragments).strip(),
+            "partial": False,
+            "constitution_title": "Constitution de la Guinée (02.txt) - Optimisé",
+            "timestamp": datetime.now(),
+            "suggestions": suggestions
+        })
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/init-database")
 async def initialize_constitution_database(db: Session = Depends(get_db)):
     """
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -12,6 +13,10 @@ from sqlalchemy import or_, and_
 from app.services.pdf_analyzer import PDFAnalyzer
 from app.services.file_watcher import FileWatcher
 from app.services.pdf_import import process_uploaded_pdf, delete_pdf_articles
+from app.services.bm25_ranker import invalidate_articles_ranker
+from app.services.semantic_cache import invalidate_constitution
+from app.services.fts_search import search_articles as search_fts_articles
+from app.services.optimized_ai_service import update_vector_index
 from app.models.pdf_import import Article, Metadata
 from app.core.config import settings
 
@@ -136,6 +141,12 @@ async def delete_constitution(constitution_id: int, db: Session = Depends(get_db
             # Réactiver cette constitution et extraire ses articles
             inactive_constitution.is_active = True
             db.commit()
+            # Invalidation après le commit : une reconstruction concurrente ne relit plus les articles supprimés
+            invalidate_articles_ranker()
+            invalidate_constitution(constitution_id)
+            await run_in_threadpool(
+                update_vector_index, added=[inactive_constitution.id], removed=[constitution_id]
+            )
             
             # Réactiver cette constitution (les articles seront importés manuellement)
             return {
@@ -146,6 +157,9 @@ async def delete_constitution(constitution_id: int, db: Session = Depends(get_db
             }
     
     db.commit()
+    invalidate_articles_ranker()
+    invalidate_constitution(constitution_id)
+    await run_in_threadpool(update_vector_index, removed=[constitution_id])
     
     return {
         "message": f"Constitution '{db_constitution.title}' supprimée avec succès",
@@ -164,11 +178,15 @@ async def reactivate_constitution(constitution_id: int, db: Session = Depends(ge
         raise HTTPException(status_code=404, detail="Constitution inactive non trouvée")
     
     # Désactiver toutes les autres constitutions
+    deactivated_ids = [
+        row.id for row in db.query(ConstitutionModel.id).filter(ConstitutionModel.is_active == True)
+    ]
     db.query(ConstitutionModel).filter(ConstitutionModel.is_active == True).update({"is_active": False})
     
     # Réactiver cette constitution
     db_constitution.is_active = True
     db.commit()
+    await run_in_threadpool(update_vector_index, added=[constitution_id], removed=deactivated_ids)
     
     # Réactiver cette constitution (les articles seront importés manuellement)
     return {
@@ -476,8 +494,10 @@ async def delete_constitution_file(filename: str, db: Session = Depends(get_db))
                 logger.error(f"❌ Erreur lors de la suppression des articles: {e}")
             
             # Supprimer la constitution
+            constitution_id = constitution.id
             db.delete(constitution)
             db.commit()
+            await run_in_threadpool(update_vector_index, removed=[constitution_id])
         
         # Supprimer le fichier physique
         file_path.unlink()
@@ -562,14 +582,9 @@ async def upload_constitution_file(
             if result['success']:
                 logger.info(f"✅ Articles extraits: {result['articles_count']} articles trouvés")
                 
-                # Rafraîchir la base vectorielle avec les nouveaux articles
-                try:
-                    from app.services.optimized_ai_service import get_optimized_ai_service
-                    ai_service = get_optimized_ai_service()
-                    ai_service.refresh_vector_db()
-                    logger.info("✅ Base vectorielle rafraîchie avec les nouveaux articles")
-                except Exception as refresh_error:
-                    logger.warning(f"⚠️ Échec du rafraîchissement de la base vectorielle: {refresh_error}")
+                # Ajouter les nouveaux articles à la base vectorielle (sans reconstruction complète)
+                if await run_in_threadpool(update_vector_index, added=[new_constitution.id]):
+                    logger.info("✅ Base vectorielle mise à jour avec les nouveaux articles")
                 
                 # Mettre à jour le message de retour
                 message = f"Fichier {filename} uploadé et analysé avec succès ({result['articles_count']} articles extraits)"
@@ -651,21 +666,32 @@ async def search_articles(
 ):
     """Rechercher dans les articles"""
     try:
-        # Construire la requête
-        search_query = db.query(Article).filter(
-            or_(
-                Article.content.ilike(f"%{query}%"),
-                Article.article_number.ilike(f"%{query}%"),
-                Article.title.ilike(f"%{query}%")
+        # Recherche plein texte FTS5 classée par pertinence (bm25)
+        fts_results = search_fts_articles(db, query, constitution_id=constitution_id, limit=50)
+        
+        if fts_results is not None:
+            matches = {result["id"]: result for result in fts_results}
+            articles_by_id = {
+                article.id: article
+                for article in db.query(Article).filter(Article.id.in_(matches.keys())).all()
+            } if matches else {}
+            articles = [articles_by_id[article_id] for article_id in matches if article_id in articles_by_id]
+        else:
+            # Repli sans FTS5 : recherche par sous-chaîne
+            search_query = db.query(Article).filter(
+                or_(
+                    Article.content.ilike(f"%{query}%"),
+                    Article.article_number.ilike(f"%{query}%"),
+                    Article.title.ilike(f"%{query}%")
+                )
             )
-        )
-        
-        # Filtrer par constitution si spécifié
-        if constitution_id:
-            search_query = search_query.filter(Article.constitution_id == constitution_id)
-        
-        # Récupérer les résultats
-        articles = search_query.limit(50).all()
+            
+            # Filtrer par constitution si spécifié
+            if constitution_id:
+                search_query = search_query.filter(Article.constitution_id == constitution_id)
+            
+            matches = {}
+            articles = search_query.limit(50).all()
         
         # Formater la réponse
         results = []
@@ -682,6 +708,8 @@ async def search_articles(
                 "content": article.content[:200] + "..." if len(article.content) > 200 else article.content,
                 "part": article.part,
                 "section": article.section,
+                "score": matches[article.id]["score"] if article.id in matches else None,
+                "snippet": matches[article.id]["snippet"] if article.id in matches else None,
                 "constitution": {
                     "id": constitution.id if constitution else None,
                     "title": constitution.title if constitution else "Inconnue",
@@ -0,0 +1,180 @@
+"""
+Index inversé en mémoire pour les articles de la constitution
+Remplace les recherches successives ilike('%mot%') (un scan complet de table par mot-clé)
+par des lookups en mémoire partagés par tout le processus
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Iterable, Tuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.constitution_data import ConstitutionArticle
+from app.services.text_normalizer import normalize_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+class _IndexState:
+    """Instantané immuable de l'index (remplacé d'un bloc à chaque reconstruction)"""
+
+    def __init__(self):
+        # token -> {article_id: fréquence du terme}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        # numéro d'article -> [article_id]
+        self.article_numbers: Dict[str, List[int]] = {}
+        self.doc_ids: List[int] = []
+        # article_id -> contenu normalisé (accents, casse, élisions), calculé une seule fois
+        self.folded_content: Dict[int, str] = {}
+        # Cache mot-clé -> tokens du vocabulaire le contenant
+        self.substring_cache: Dict[str, Tuple[str, ...]] = {}
+        self.built_at: Optional[float] = None
+
+
+class ArticleInvertedIndex:
+    """
+    Index inversé token -> liste de postings (article_id, fréquence)
+    Reproduit la sémantique de ilike('%mot%') sur le texte normalisé : un mot-clé correspond
+    à tous les tokens du vocabulaire qui le contiennent, accents et casse ignorés
+    """
+
+    def __init__(self):
+        self._state = _IndexState()
+
+    @property
+    def is_built(self) -> bool:
+        return self._state.built_at is not None
+
+    @property
+    def size(self) -> int:
+        return len(self._state.doc_ids)
+
+    def build(self, rows: Iterable[Tuple[int, str, str]]):
+        """
+        Construit l'index à partir de tuples (article_id, article_number, content)
+        Le nouvel état est préparé à part puis publié en une seule affectation
+        """
+        start_time = time.time()
+        state = _IndexState()
+
+        for article_id, article_number, content in rows:
+            state.doc_ids.append(article_id)
+            if article_number is not None:
+                state.article_numbers.setdefault(str(article_number).strip(), []).append(article_id)
+
+            folded = normalize_text(content)
+            state.folded_content[article_id] = folded
+            for token in tokenize(folded):
+                postings = state.postings.setdefault(token, {})
+                postings[article_id] = postings.get(article_id, 0) + 1
+
+        # Trier les identifiants pour conserver l'ordre d'insertion (équivalent rowid SQLite)
+        state.doc_ids.sort()
+        for ids in state.article_numbers.values():
+            ids.sort()
+
+        state.built_at = time.time()
+        self._state = state
+
+        logger.info(
+            f"📚 Index inversé construit: {len(state.doc_ids)} articles, "
+            f"{len(state.postings)} tokens en {(state.built_at - start_time) * 1000:.1f} ms"
+        )
+
+    def build_from_db(self, db: Session):
+        """Construit l'index à partir des articles actifs en base"""
+        rows = db.query(
+            ConstitutionArticle.id,
+            ConstitutionArticle.article_number,
+            ConstitutionArticle.content
+        ).filter(
+            ConstitutionArticle.is_active == True
+        ).all()
+        self.build(rows)
+
+    def _matching_tokens(self, term: str) -> Tuple[str, ...]:
+        """Tokens du vocabulaire contenant le terme (sémantique '%terme%')"""
+        state = self._state
+        cached = state.substring_cache.get(term)
+        if cached is not None:
+            return cached
+
+        matches = tuple(token for token in state.postings if term in token)
+        state.substring_cache[term] = matches
+        return matches
+
+    def _ids_for_term(self, term: str) -> set:
+        postings = self._state.postings
+        ids = set()
+        for token in self._matching_tokens(term):
+            ids.update(postings.get(token, ()))
+        return ids
+
+    def search(self, keyword: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Retourne les identifiants d'articles contenant le mot-clé, par ordre croissant
+        Un mot-clé composé ("sept ans") exige la présence de chacun de ses termes
+        """
+        terms = tokenize(keyword)
+        if not terms:
+            return []
+
+        matched = None
+        for term in terms:
+            ids = self._ids_for_term(term)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+
+        result = sorted(matched)
+        return result[:limit] if limit is not None else result
+
+    def search_article_numbers(self, numbers: Iterable[str]) -> List[int]:
+        """Retourne les identifiants des articles portant les numéros donnés"""
+        article_numbers = self._state.article_numbers
+        ids = set()
+        for number in numbers:
+            ids.update(article_numbers.get(str(number).strip(), ()))
+        return sorted(ids)
+
+    def folded_content(self, article_id: int, content: Optional[str] = None) -> str:
+        """Contenu normalisé précalculé d'un article (calculé à la volée s'il n'est pas indexé)"""
+        folded = self._state.folded_content.get(article_id)
+        if folded is None:
+            folded = normalize_text(content or "")
+        return folded
+
+    def term_frequencies(self, token: str) -> Dict[int, int]:
+        """Postings bruts d'un token exact"""
+        return self._state.postings.get(token, {})
+
+    def get_stats(self) -> Dict:
+        state = self._state
+        return {
+            "is_built": self.is_built,
+            "articles": len(state.doc_ids),
+            "tokens": len(state.postings),
+            "built_at": state.built_at
+        }
+
+
+# Instance globale partagée par tout le processus
+_article_index = ArticleInvertedIndex()
+_init_lock = threading.Lock()
+
+
+def get_article_index(db: Session) -> ArticleInvertedIndex:
+    """Retourne l'index des articles, construit au premier appel"""
+    if not _article_index.is_built:
+        with _init_lock:
+            if not _article_index.is_built:
+                _article_index.build_from_db(db)
+    return _article_index
+
+
+def rebuild_article_index(db: Session) -> ArticleInvertedIndex:
+    """Reconstruit l'index (à appeler après une modification des articles)"""
+    with _init_lock:
+        _article_index.build_from_db(db)
+    return _article_index
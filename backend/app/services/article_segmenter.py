@@ -0,0 +1,169 @@
+"""
+Découpage du texte d'une constitution en articles, en une seule passe sur les lignes
+Chaque ligne est classée par une expression ancrée en début de ligne (en-tête d'article, TITRE/PARTIE,
+CHAPITRE/SECTION, marqueur de page, ou texte) puis un automate à deux états (hors article / dans un article)
+accumule le contenu : le coût est linéaire en la taille du texte, sans retour arrière entre motifs.
+Les numéros de page viennent des positions de début de page de l'extraction ou des marqueurs
+« --- Page N --- » insérés par PDFAnalyzer
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+# Longueur des colonnes Article.part / Article.section
+_HEADING_MAX_LENGTH = 100
+
+# Contenu minimal d'un article retenu (en caractères)
+_MIN_CONTENT_LENGTH = 10
+
+_ORDINAL = r"(?:[IVXLCDM]+|\d+|PREMI(?:ER|[ÈE]RE)|UNIQUE)"
+
+_LINE_RE = re.compile(
+    rf"""
+    (?:article\s+|art\.\s*)(?P<article>\d+|premier)(?:er)?
+    | (?P<part>
+        TITRE\s+{_ORDINAL}\b
+        | (?:PREMI[ÈE]RE|DEUXI[ÈE]ME|TROISI[ÈE]ME|QUATRI[ÈE]ME|CINQUI[ÈE]ME|SIXI[ÈE]ME)\s+PARTIE\b
+        | PARTIE\s+{_ORDINAL}\b
+      )
+    | (?P<section>(?:SOUS-SECTION|SECTION|CHAPITRE)\s+{_ORDINAL}\b)
+    | -{{3}}\s*page\s+(?P<page>\d+)\s*-{{3}}
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Après le numéro, un en-tête d'article se termine ou continue par un séparateur ou une majuscule ;
+# « Article 45, alinéa 2 » ou « article 12 de la loi » en début de ligne sont des renvois
+_SEPARATORS = ".:-–—()"
+
+
+def _is_article_header(line: str, end: int) -> bool:
+    rest = line[end:].lstrip()
+    return not rest or rest[0] in _SEPARATORS or rest[0].isupper()
+
+
+# Fin de phrase : la ligne suivante peut ouvrir une division
+_SENTENCE_ENDS = ".:;!?»)"
+
+
+def _is_heading(line: str, end: int, previous: str, next_line: str) -> bool:
+    """
+    Intitulé de division (TITRE, CHAPITRE, SECTION...) dans un article ouvert, plutôt qu'une ligne
+    coupée au milieu d'une phrase (« ... conformément aux dispositions du / Chapitre II du présent titre »).
+    Retenu en capitales, ou suivi d'un intitulé (« Chapitre II : Du Gouvernement ») quand la ligne
+    précédente termine une phrase ou que la suivante est un en-tête d'article
+    """
+    if line.isupper():
+        return True
+    if not _is_article_header(line, end):
+        return False
+    if previous.endswith(tuple(_SENTENCE_ENDS)):
+        return True
+    match = _LINE_RE.match(next_line)
+    return bool(match and match.group("article") and _is_article_header(next_line, match.end()))
+
+
+def _header_remainder(line: str, end: int) -> str:
+    """Texte placé sur la ligne d'en-tête après le numéro (« Article 5 : Tout citoyen... »)"""
+    return line[end:].lstrip(_SEPARATORS + " \t").strip()
+
+
+def page_offsets(page_texts: Sequence[str], separator: str = "\n") -> List[int]:
+    """Position de début de chaque page dans separator.join(page_texts)"""
+    offsets, position = [], 0
+    for page_text in page_texts:
+        offsets.append(position)
+        position += len(page_text) + len(separator)
+    return offsets
+
+
+def segment_articles(text: str, page_offsets: Optional[Sequence[int]] = None) -> List[Dict]:
+    """
+    Articles du texte triés par numéro ; un numéro répété garde sa première occurrence.
+    page_offsets : position dans text du début de chaque page (la page 1 commence à page_offsets[0])
+    Chaque article : article_number ("Article N"), content, part (TITRE/PARTIE en cours),
+    section (CHAPITRE/SECTION en cours), page_number (page de l'en-tête, ou None)
+    """
+    articles: Dict[int, Dict] = {}
+    part: Optional[str] = None
+    section: Optional[str] = None
+    page: Optional[int] = 1 if page_offsets else None
+    next_page_index = 1
+
+    number: Optional[int] = None
+    lines: List[str] = []
+    article_page: Optional[int] = None
+
+    def close_article():
+        if number is None or number in articles:
+            return
+        content = "\n".join(lines).strip()
+        if len(content) > _MIN_CONTENT_LENGTH:
+            articles[number] = {
+                'article_number': f"Article {number}",
+                'content': content,
+                'part': part,
+                'section': section,
+                'page_number': article_page
+            }
+
+    raw_lines = text.split("\n")
+    previous = ""
+
+    def next_line(index: int) -> str:
+        for following in range(index + 1, len(raw_lines)):
+            line = raw_lines[following].strip()
+            if line:
+                return line
+        return ""
+
+    position = 0
+    for index, raw_line in enumerate(raw_lines):
+        line_start = position
+        position += len(raw_line) + 1
+        if page_offsets:
+            while next_page_index < len(page_offsets) and page_offsets[next_page_index] <= line_start:
+                next_page_index += 1
+                page = next_page_index
+
+        line = raw_line.strip()
+        if not line:
+            continue
+        previous_line, previous = previous, line
+        match = _LINE_RE.match(line)
+        if match is None:
+            if number is not None:
+                lines.append(line)
+            continue
+
+        if match.group("page"):
+            page = int(match.group("page"))
+        elif match.group("article"):
+            if not _is_article_header(line, match.end()):
+                if number is not None:
+                    lines.append(line)
+                continue
+            close_article()
+            value = match.group("article")
+            number = 1 if value.lower() == "premier" else int(value)
+            remainder = _header_remainder(line, match.end())
+            lines = [remainder] if remainder else []
+            article_page = page
+        elif not line[0].isupper() or (
+            number is not None and not _is_heading(line, match.end(), previous_line, next_line(index))
+        ):
+            # « section 2 du code... » en début de ligne, ou ligne coupée dans une phrase de l'article :
+            # renvoi dans le texte, pas un intitulé
+            if number is not None:
+                lines.append(line)
+        else:
+            # Une nouvelle division clôt l'article en cours ; son intitulé n'appartient à aucun article
+            close_article()
+            number, lines = None, []
+            if match.group("part"):
+                part, section = line[:_HEADING_MAX_LENGTH], None
+            else:
+                section = line[:_HEADING_MAX_LENGTH]
+    close_article()
+
+    return [articles[key] for key in sorted(articles)]
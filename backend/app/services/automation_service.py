@@ -16,6 +16,7 @@ from app.models.pdf_import import Article
 from app.services.pdf_import import process_uploaded_pdf, delete_pdf_articles
 from app.services.file_watcher import FileWatcher
 from app.services.pdf_analyzer import PDFAnalyzer
+from app.services.extraction_cache import get_extraction_cache
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -105,6 +106,8 @@ class AutomationService:
     
     def _process_new_files(self, new_files):
         """Traiter les nouveaux fichiers"""
+        from app.services.optimized_ai_service import update_vector_index
+        
         db = SessionLocal()
         
         try:
@@ -154,6 +157,7 @@ class AutomationService:
                     if result['success']:
                         logger.info(f"✅ {result['articles_count']} articles extraits pour {pdf_file.name}")
                         self.known_files.add(pdf_file.name)
+                        update_vector_index(added=[constitution.id])
                     else:
                         logger.error(f"❌ Échec de l'extraction pour {pdf_file.name}: {result.get('error')}")
                         # Ne pas supprimer la constitution si elle existait déjà
@@ -217,6 +221,8 @@ class AutomationService:
                 if result['success']:
                     logger.info(f"✅ {result['articles_count']} articles extraits pour {filename}")
                     self.known_files.add(filename)
+                    from app.services.optimized_ai_service import update_vector_index
+                    update_vector_index(added=[constitution.id])
                     return True
                 else:
                     logger.error(f"❌ Échec de l'extraction: {result.get('error')}")
@@ -236,7 +242,8 @@ class AutomationService:
             "scan_interval": self.scan_interval,
             "known_files_count": len(self.known_files),
             "files_dir": str(self.files_dir),
-            "thread_alive": self.watcher_thread.is_alive() if self.watcher_thread else False
+            "thread_alive": self.watcher_thread.is_alive() if self.watcher_thread else False,
+            "extraction_cache": get_extraction_cache().get_stats()
         }
 
 # Instance globale du service
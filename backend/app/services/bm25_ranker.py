@@ -0,0 +1,233 @@
+"""
+Moteur de classement BM25 partagé par ChatNow et les routes /chat/pdf et /chat/articles
+Les longueurs de documents, tables IDF et poids des postings sont précalculés à la construction :
+une requête ne fait que sommer des poids, sans re-tokeniser le contenu des articles
+"""
+
+import math
+import time
+import logging
+import threading
+from typing import Dict, List, Iterable, Tuple, Optional, Hashable
+
+from sqlalchemy.orm import Session
+
+from app.models.constitution_data import ConstitutionArticle
+from app.models.pdf_import import Article
+from app.services.text_normalizer import stem, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Stopwords FR minimales (forme normalisée, sans accents)
+STOPWORDS = {
+    "le", "la", "les", "de", "des", "du", "un", "une", "et", "en", "d", "l", "au", "aux",
+    "que", "qui", "dans", "sur", "pour", "par", "aupres", "avec", "sans", "ne", "pas",
+    "est", "sont", "ou", "a", "se", "ce", "cet", "cette"
+}
+
+
+def tokenize_for_ranking(text: str) -> List[str]:
+    """Tokens normalisés et racinisés utilisés pour l'indexation et les requêtes BM25"""
+    return [stem(token) for token in tokenize(text) if token not in STOPWORDS]
+
+
+class _Partition:
+    """Statistiques BM25 d'un sous-corpus (une constitution, ou tout le corpus ChatNow)"""
+
+    def __init__(self):
+        # token -> [(doc_id, poids BM25 précalculé)]
+        self.weights: Dict[str, List[Tuple[int, float]]] = {}
+        self.idf: Dict[str, float] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.avg_doc_length = 0.0
+
+
+class BM25Ranker:
+    """
+    Classement BM25 (Okapi) avec partitions optionnelles
+    Le poids idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)) de chaque posting
+    est calculé une fois pour toutes lors de la construction
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._partitions: Dict[Optional[Hashable], _Partition] = {}
+        self.built_at: Optional[float] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self.built_at is not None
+
+    def build(self, rows: Iterable[Tuple[int, Optional[Hashable], str]]):
+        """Construit l'index à partir de tuples (doc_id, partition, texte)"""
+        start_time = time.time()
+        term_frequencies: Dict[Optional[Hashable], Dict[str, Dict[int, int]]] = {}
+        partitions: Dict[Optional[Hashable], _Partition] = {}
+
+        for doc_id, partition_key, text in rows:
+            partition = partitions.setdefault(partition_key, _Partition())
+            postings = term_frequencies.setdefault(partition_key, {})
+            tokens = tokenize_for_ranking(text)
+            partition.doc_lengths[doc_id] = len(tokens)
+            for token in tokens:
+                doc_tf = postings.setdefault(token, {})
+                doc_tf[doc_id] = doc_tf.get(doc_id, 0) + 1
+
+        for partition_key, partition in partitions.items():
+            doc_count = len(partition.doc_lengths)
+            total_length = sum(partition.doc_lengths.values())
+            partition.avg_doc_length = (total_length / doc_count) if doc_count else 0.0
+            avg_length = partition.avg_doc_length or 1.0
+
+            for token, doc_tf in term_frequencies[partition_key].items():
+                df = len(doc_tf)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                partition.idf[token] = idf
+
+                weights = []
+                for doc_id, tf in doc_tf.items():
+                    norm = self.k1 * (1 - self.b + self.b * partition.doc_lengths[doc_id] / avg_length)
+                    weights.append((doc_id, idf * tf * (self.k1 + 1) / (tf + norm)))
+                partition.weights[token] = weights
+
+        self._partitions = partitions
+        self.built_at = time.time()
+        logger.info(
+            f"📊 Index BM25 construit: {sum(len(p.doc_lengths) for p in partitions.values())} documents, "
+            f"{len(partitions)} partitions en {(self.built_at - start_time) * 1000:.1f} ms"
+        )
+
+    @property
+    def document_count(self) -> int:
+        """Nombre total de documents indexés, toutes partitions confondues"""
+        return sum(len(p.doc_lengths) for p in self._partitions.values())
+
+    def partition_sizes(self) -> Dict[Optional[Hashable], int]:
+        return {key: len(p.doc_lengths) for key, p in self._partitions.items()}
+
+    def iter_postings(self) -> Iterable[Tuple[Optional[Hashable], str, List[Tuple[int, float]]]]:
+        """(partition, token, [(doc_id, poids)]) : export des postings précalculés (index partagé)"""
+        for key, partition in self._partitions.items():
+            for token, weights in partition.weights.items():
+                yield key, token, weights
+
+    def partition_size(self, partition: Optional[Hashable] = None) -> int:
+        """Nombre de documents indexés dans une partition"""
+        part = self._partitions.get(partition)
+        return len(part.doc_lengths) if part else 0
+
+    def score(self, query: str, partition: Optional[Hashable] = None) -> Dict[int, float]:
+        """Scores BM25 de tous les documents de la partition contenant au moins un terme de la requête"""
+        part = self._partitions.get(partition)
+        if part is None:
+            return {}
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize_for_ranking(query)):
+            for doc_id, weight in part.weights.get(token, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        return scores
+
+    def search(self, query: str, partition: Optional[Hashable] = None, top_k: int = 5) -> List[Tuple[int, float]]:
+        """Retourne les top_k documents (doc_id, score) par score décroissant"""
+        scores = self.score(query, partition)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k] if top_k is not None else ranked
+
+
+# Instances globales : corpus ChatNow (constitution_articles) et articles importés par constitution
+_chatnow_ranker = BM25Ranker()
+_articles_ranker = BM25Ranker()
+_ranker_lock = threading.Lock()
+# Dernière invalidation locale : une génération de l'index partagé plus ancienne est ignorée
+_articles_invalidated_at = 0.0
+# Incrémentée à chaque invalidation : une construction commencée avant n'est pas conservée
+_articles_generation = 0
+_generation_lock = threading.Lock()
+
+
+def _build_chatnow_ranker(db: Session):
+    rows = db.query(
+        ConstitutionArticle.id,
+        ConstitutionArticle.content
+    ).filter(
+        ConstitutionArticle.is_active == True
+    ).all()
+    _chatnow_ranker.build((article_id, None, content) for article_id, content in rows)
+
+
+def _build_articles_ranker(db: Session) -> BM25Ranker:
+    """
+    Construit le classement et l'installe comme instance globale, sauf si une invalidation est survenue
+    pendant la construction (lignes lues avant l'import) : il sert alors la requête courante sans être
+    conservé, la suivante reconstruit
+    """
+    global _articles_ranker
+    generation = _articles_generation
+    ranker = build_articles_ranker(db)
+    with _generation_lock:
+        installed = generation == _articles_generation
+        if installed:
+            _articles_ranker = ranker
+    if not installed:
+        logger.info("📊 Articles modifiés pendant la construction du classement BM25 : non conservé")
+    return ranker
+
+
+def build_articles_ranker(db: Session) -> BM25Ranker:
+    """Nouveau classement des articles importés, indépendant de l'instance globale (publication mmap)"""
+    ranker = BM25Ranker()
+    ranker.build(db.query(Article.id, Article.constitution_id, Article.content).all())
+    return ranker
+
+
+def _shared_articles_ranker():
+    """Postings mappés de la génération courante de l'index partagé, s'ils sont à jour"""
+    from app.services.shared_index import get_shared_index
+
+    index = get_shared_index()
+    if index is None or index.ranker is None or index.created_at < _articles_invalidated_at:
+        return None
+    return index.ranker
+
+
+def get_chatnow_ranker(db: Session) -> BM25Ranker:
+    """Classement BM25 des articles ChatNow (partition unique)"""
+    if not _chatnow_ranker.is_built:
+        with _ranker_lock:
+            if not _chatnow_ranker.is_built:
+                _build_chatnow_ranker(db)
+    return _chatnow_ranker
+
+
+def get_articles_ranker(db: Session) -> BM25Ranker:
+    """
+    Classement BM25 des articles importés, partitionné par constitution_id
+    Les postings de l'index partagé (mmap, communs aux workers) sont préférés à une copie locale
+    """
+    shared = _shared_articles_ranker()
+    if shared is not None:
+        return shared
+    ranker = _articles_ranker
+    if ranker.is_built:
+        return ranker
+    with _ranker_lock:
+        if _articles_ranker.is_built:
+            return _articles_ranker
+        return _build_articles_ranker(db)
+
+
+def rebuild_chatnow_ranker(db: Session):
+    """Reconstruit le classement ChatNow après modification de constitution_articles"""
+    with _ranker_lock:
+        _build_chatnow_ranker(db)
+
+
+def invalidate_articles_ranker():
+    """Marque l'index des articles importés comme obsolète (reconstruit à la prochaine requête)"""
+    global _articles_invalidated_at, _articles_generation
+    with _generation_lock:
+        _articles_generation += 1
+        _articles_invalidated_at = time.time()
+        _articles_ranker.built_at = None
@@ -0,0 +1,116 @@
+"""
+Écriture en masse des lignes importées (articles, mots-clés, structure)
+Au lieu de tout supprimer puis d'ajouter les objets ORM un par un, les lignes existantes sont lues
+une fois et comparées aux nouvelles par clé : seules les lignes nouvelles, modifiées ou disparues
+sont écrites, par lots en executemany (INSERT, UPDATE par clé primaire, DELETE ... IN).
+Une réimportation sans changement n'écrit rien et ne prend pas le verrou d'écriture SQLite
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, bindparam, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Lignes par instruction executemany / identifiants par DELETE ... IN (limite de variables SQLite : 999)
+BULK_CHUNK_SIZE = 500
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _normalize(column, value: Any) -> Any:
+    """Valeur convertie au type Python de la colonne, pour comparer avec ce que relit la base"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, python_type):
+        return value
+    try:
+        return python_type(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def sync_rows(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    key_fields: Sequence[str],
+    where: Optional[Any] = None,
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict[str, int]:
+    """
+    Aligne les lignes de table (restreintes par where) sur rows, sans commit
+    key_fields identifie une ligne ; les colonnes comparées sont celles présentes dans rows.
+    Une clé répétée est appariée ligne à ligne : les doublons en trop sont insérés ou supprimés.
+    Retourne le nombre de lignes insérées, mises à jour, supprimées et inchangées
+    """
+    fields = sorted({field for row in rows for field in row})
+    for field in key_fields:
+        if field not in fields:
+            fields.append(field)
+    columns = [table.c[field] for field in fields]
+    primary_key = table.c.id
+
+    # Lignes existantes, groupées par clé (dans l'ordre des identifiants)
+    query = select(primary_key, *columns)
+    if where is not None:
+        query = query.where(where)
+    existing: Dict[Tuple, List[Tuple[int, Tuple]]] = defaultdict(list)
+    key_positions = [fields.index(field) for field in key_fields]
+    for row in db.execute(query.order_by(primary_key)):
+        values = tuple(row[1:])
+        existing[tuple(values[position] for position in key_positions)].append((row[0], values))
+
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    unchanged = 0
+    for row in rows:
+        values = tuple(_normalize(column, row.get(field)) for field, column in zip(fields, columns))
+        matches = existing.get(tuple(values[position] for position in key_positions))
+        if not matches:
+            inserts.append(dict(zip(fields, values)))
+            continue
+        row_id, current = matches.pop(0)
+        if current == values:
+            unchanged += 1
+        else:
+            update = {field: value for field, value, old in zip(fields, values, current) if value != old}
+            update["_id"] = row_id
+            updates.append(update)
+    deletes = [row_id for matches in existing.values() for row_id, _ in matches]
+
+    for chunk in _chunks(deletes, chunk_size):
+        db.execute(table.delete().where(primary_key.in_(chunk)))
+
+    # executemany exige les mêmes colonnes dans chaque jeu de paramètres : regroupement par colonnes modifiées
+    update_groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+    for update in updates:
+        update_groups[tuple(sorted(update))].append(update)
+    statement = table.update().where(primary_key == bindparam("_id"))
+    for group in update_groups.values():
+        for chunk in _chunks(group, chunk_size):
+            db.execute(statement, list(chunk))
+
+    for chunk in _chunks(inserts, chunk_size):
+        db.execute(table.insert(), list(chunk))
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "unchanged": unchanged
+    }
+
+
+def has_changes(result: Dict[str, int]) -> bool:
+    return bool(result["inserted"] or result["updated"] or result["deleted"])
@@ -0,0 +1,219 @@
+"""
+Écriture différée (write-behind) des compteurs d'utilisation de ConstitutionCache
+Un hit de cache n'écrit plus en base : hit_count / last_used sont cumulés en mémoire puis
+appliqués en une seule requête UPDATE groupée toutes les quelques secondes ou tous les N hits
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingHits:
+    __slots__ = ("count", "last_used")
+
+    def __init__(self, last_used: datetime):
+        self.count = 0
+        self.last_used = last_used
+
+
+class CacheHitBuffer:
+    """
+    Compteurs en attente par id de cache, protégés par un verrou ; un thread démon vide
+    le tampon périodiquement, ou plus tôt dès que flush_threshold hits sont en attente
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 100
+    ):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._session_factory = session_factory
+
+        self._pending: Dict[int, _PendingHits] = {}
+        self._pending_hits = 0
+        self._lock = threading.Lock()
+        # Un seul vidage à la fois : un hit enregistré pendant un vidage attend le suivant
+        self._flush_lock = threading.Lock()
+
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def record_hit(self, cache_id: int, used_at: Optional[datetime] = None):
+        """Enregistre un hit en mémoire, sans accès à la base"""
+        used_at = used_at or datetime.now()
+        with self._lock:
+            pending = self._pending.get(cache_id)
+            if pending is None:
+                pending = self._pending[cache_id] = _PendingHits(used_at)
+            pending.count += 1
+            if used_at > pending.last_used:
+                pending.last_used = used_at
+            self._pending_hits += 1
+            self.recorded += 1
+            threshold_reached = self._pending_hits >= self.flush_threshold
+
+        self._ensure_flusher()
+        if threshold_reached:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Applique les compteurs en attente en une transaction (UPDATE exécuté par lot) ;
+        retourne le nombre de lignes de cache concernées. En cas d'échec les compteurs
+        sont remis dans le tampon pour le vidage suivant
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                pending, self._pending = self._pending, {}
+                self._pending_hits = 0
+
+            try:
+                self._write(pending)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture des compteurs de cache: {e}")
+                with self._lock:
+                    self.failures += 1
+                    self._merge_back(pending)
+                return 0
+
+            with self._lock:
+                self.flushes += 1
+                self.flushed += sum(hits.count for hits in pending.values())
+            logger.debug(f"💾 Compteurs de cache écrits pour {len(pending)} réponses")
+            return len(pending)
+
+    def _write(self, pending: Dict[int, _PendingHits]):
+        from sqlalchemy import bindparam, update
+        from app.models.constitution_data import ConstitutionCache
+
+        table = ConstitutionCache.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("cache_id"))
+            .values(
+                hit_count=table.c.hit_count + bindparam("hits"),
+                last_used=bindparam("used_at")
+            )
+        )
+        parameters: List[Dict[str, Any]] = [
+            {"cache_id": cache_id, "hits": hits.count, "used_at": hits.last_used}
+            for cache_id, hits in pending.items()
+        ]
+
+        session = self._new_session()
+        try:
+            session.execute(statement, parameters)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _merge_back(self, pending: Dict[int, _PendingHits]):
+        for cache_id, hits in pending.items():
+            current = self._pending.get(cache_id)
+            if current is None:
+                self._pending[cache_id] = hits
+            else:
+                current.count += hits.count
+                if hits.last_used > current.last_used:
+                    current.last_used = hits.last_used
+            self._pending_hits += hits.count
+
+    def _ensure_flusher(self):
+        """Démarre le thread de vidage au premier hit"""
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._flusher is None and not self._stop_event.is_set():
+                self._flusher = threading.Thread(
+                    target=self._flush_loop,
+                    name="cache-hit-flusher",
+                    daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Erreur lors du vidage des compteurs de cache: {e}")
+
+    def stop(self):
+        """Arrête le thread de vidage puis écrit les compteurs restants (arrêt propre)"""
+        self._stop_event.set()
+        self._wakeup.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending_entries": len(self._pending),
+                "pending_hits": self._pending_hits,
+                "recorded": self.recorded,
+                "flushed": self.flushed,
+                "flushes": self.flushes,
+                "failures": self.failures,
+                "flush_interval": self.flush_interval,
+                "flush_threshold": self.flush_threshold
+            }
+
+
+_cache_hit_buffer: Optional[CacheHitBuffer] = None
+_cache_hit_buffer_lock = threading.Lock()
+
+
+def get_cache_hit_buffer() -> CacheHitBuffer:
+    """Instance partagée par le processus"""
+    global _cache_hit_buffer
+    if _cache_hit_buffer is None:
+        with _cache_hit_buffer_lock:
+            if _cache_hit_buffer is None:
+                _cache_hit_buffer = CacheHitBuffer(
+                    flush_interval=settings.CACHE_HIT_FLUSH_INTERVAL,
+                    flush_threshold=settings.CACHE_HIT_FLUSH_THRESHOLD
+                )
+    return _cache_hit_buffer
+
+
+def flush_cache_hits() -> int:
+    """Écrit immédiatement les compteurs en attente (tests, arrêt de l'application)"""
+    if _cache_hit_buffer is None:
+        return 0
+    return _cache_hit_buffer.flush()
+
+
+def stop_cache_hit_buffer():
+    """Arrêt de l'application : arrête le thread de vidage et écrit les derniers compteurs"""
+    if _cache_hit_buffer is not None:
+        _cache_hit_buffer.stop()
@@ -6,11 +6,11 @@ Module optimisé pour les performances et la précision
 import logging
 import hashlib
 import time
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
-from openai import OpenAI
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.models.constitution_data import (
@@ -19,9 +19,25 @@ from app.models.constitution_data import (
     ConstitutionKeyword,
     ConstitutionCache
 )
+from app.services.article_index import get_article_index
+from app.services.bm25_ranker import get_chatnow_ranker
+from app.services.cache_hit_buffer import get_cache_hit_buffer
+from app.services.fts_search import search_constitution_articles
+from app.services.text_normalizer import contains_term, normalize_text
+from app.services.llm_client import chat_completion, get_openai_client, stream_chat_completion
+from app.services.semantic_cache import CHATNOW_SCOPE, get_semantic_cache
+from app.services.shared_cache import get_response_cache
+from app.services.single_flight import AsyncSingleFlight, SingleFlight, flight_key
 
 logger = logging.getLogger(__name__)
 
+# Durée de validité d'une réponse ChatNow (ConstitutionCache et cache partagé)
+RESPONSE_CACHE_HOURS = 24
+
+# Requêtes identiques en cours, partagées entre les instances créées à chaque requête
+_chat_flights = SingleFlight()
+_async_chat_flights = AsyncSingleFlight()
+
 class OptimizedChatNowService:
     """
     Service IA optimisé pour l'interface ChatNow
@@ -29,7 +45,8 @@ class OptimizedChatNowService:
     """
     
     def __init__(self, db: Session):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Client partagé : pas de nouveau pool de connexions à chaque requête
+        self.client = get_openai_client()
         self.model = "gpt-4o-mini"
         self.db = db
         
@@ -38,37 +55,119 @@ class OptimizedChatNowService:
         self._cache_timestamp = None
         self._cache_duration = 3600  # 1 heure
         
+        # Articles actifs chargés en une seule requête, à la première correspondance trouvée
+        self._articles_by_id = None
+        # Scores BM25 par question, calculés une fois par requête
+        self._bm25_scores = {}
+        
+    def _get_articles_by_id(self) -> Dict[int, ConstitutionArticle]:
+        """Charge les articles actifs une seule fois par requête"""
+        if self._articles_by_id is None:
+            articles = self.db.query(ConstitutionArticle).filter(
+                ConstitutionArticle.is_active == True
+            ).all()
+            self._articles_by_id = {article.id: article for article in articles}
+        return self._articles_by_id
+    
+    def _articles_for_ids(self, article_ids: List[int]) -> List[ConstitutionArticle]:
+        """Convertit des identifiants de l'index en articles, dans le même ordre"""
+        if not article_ids:
+            return []
+        articles_by_id = self._get_articles_by_id()
+        return [articles_by_id[article_id] for article_id in article_ids if article_id in articles_by_id]
+    
+    def _search_content(self, keyword: str, limit: int) -> List[ConstitutionArticle]:
+        """
+        Recherche d'un mot-clé dans le contenu des articles
+        Utilise l'index FTS5 partagé (classé par bm25) et, à défaut, l'index inversé en mémoire
+        """
+        fts_results = search_constitution_articles(self.db, keyword, limit=limit)
+        if fts_results is not None:
+            return self._articles_for_ids([result["id"] for result in fts_results])
+        
+        article_ids = get_article_index(self.db).search(keyword, limit=limit)
+        return self._articles_for_ids(article_ids)
+    
+    def _prepare_chat_response(self, question: str, chat_history: List[Dict] = None):
+        """
+        Étapes précédant l'appel au LLM : cache, analyse du contexte et recherche profonde
+        Retourne (réponse, None, None) si la réponse est déjà connue (cache ou fallback),
+        sinon (None, messages à envoyer, articles retenus)
+        """
+        # Vérifier le cache des réponses
+        cached_response = self._check_response_cache(question)
+        if cached_response:
+            return cached_response, None, None
+        
+        # TRAITEMENT DU CONTEXTE - NOUVEAU
+        context_analysis = self._analyze_question_context(question)
+        logger.info(f"Analyse du contexte: {context_analysis}")
+        
+        # RECHERCHE PROFONDE EN PLUSIEURS TOURS
+        relevant_articles = self._deep_search_with_multiple_rounds(question, context_analysis)
+        
+        # Si aucun article trouvé après tous les tours, générer un fallback intelligent
+        if not relevant_articles:
+            return self._generate_contextual_fallback_response(question, context_analysis), None, None
+        
+        # Construire le contexte optimisé
+        optimized_context = self._build_optimized_context(relevant_articles)
+        
+        # Construire l'historique de conversation avec contexte
+        conversation_messages = self._build_conversation_messages_with_context(question, optimized_context, context_analysis, chat_history)
+        
+        return None, conversation_messages, relevant_articles
+    
     def create_chat_response(self, question: str, chat_history: List[Dict] = None, user_id: Optional[str] = None) -> str:
         """
         Crée une réponse optimisée avec cache et recherche intelligente - AMÉLIORÉE AVEC RECHERCHE PROFONDE
+        Version synchrone (scripts) ; les routes FastAPI utilisent acreate_chat_response
+        Les appels simultanés pour la même question partagent une seule génération
         """
+        return _chat_flights.do(
+            flight_key(question, CHATNOW_SCOPE),
+            lambda: self._create_chat_response(question, chat_history)
+        )
+    
+    def _create_chat_response(self, question: str, chat_history: List[Dict] = None) -> str:
         try:
-            # Vérifier le cache des réponses
-            cached_response = self._check_response_cache(question)
-            if cached_response:
-                return cached_response
-            
-            # TRAITEMENT DU CONTEXTE - NOUVEAU
-            context_analysis = self._analyze_question_context(question)
-            logger.info(f"Analyse du contexte: {context_analysis}")
+            answer, conversation_messages, relevant_articles = self._prepare_chat_response(question, chat_history)
+            if answer is not None:
+                return answer
             
-            # RECHERCHE PROFONDE EN PLUSIEURS TOURS
-            relevant_articles = self._deep_search_with_multiple_rounds(question, context_analysis)
+            # Appel à l'API OpenAI avec paramètres optimisés
+            response = self._call_openai_api(conversation_messages)
             
-            # Si aucun article trouvé après tous les tours, générer un fallback intelligent
-            if not relevant_articles:
-                return self._generate_contextual_fallback_response(question, context_analysis)
+            # Sauvegarder dans le cache
+            self._save_response_cache(question, response, relevant_articles)
             
-            # Construire le contexte optimisé
-            optimized_context = self._build_optimized_context(relevant_articles)
+            return response
             
-            # Construire l'historique de conversation avec contexte
-            conversation_messages = self._build_conversation_messages_with_context(question, optimized_context, context_analysis, chat_history)
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération de la réponse optimisée: {e}")
+            return "Désolé, je rencontre une difficulté technique. Pouvez-vous reformuler votre question ?"
+    
+    async def acreate_chat_response(self, question: str, chat_history: List[Dict] = None, user_id: Optional[str] = None) -> str:
+        """
+        Variante asynchrone de create_chat_response : l'appel au LLM ne bloque pas la boucle d'événements
+        Les requêtes simultanées pour la même question attendent la génération du leader
+        """
+        return await _async_chat_flights.do(
+            flight_key(question, CHATNOW_SCOPE),
+            lambda: self._acreate_chat_response(question, chat_history)
+        )
+    
+    async def _acreate_chat_response(self, question: str, chat_history: List[Dict] = None) -> str:
+        try:
+            # Recherche et requêtes SQL synchrones : exécutées hors de la boucle d'événements
+            answer, conversation_messages, relevant_articles = await run_in_threadpool(
+                self._prepare_chat_response, question, chat_history
+            )
+            if answer is not None:
+                return answer
             
-            # Appel à l'API OpenAI avec paramètres optimisés
-            response = self._call_openai_api(conversation_messages)
+            response = await self._acall_openai_api(conversation_messages)
             
-            # Sauvegarder dans le cache
             self._save_response_cache(question, response, relevant_articles)
             
             return response
@@ -138,7 +237,7 @@ Suggère des reformulations de la question pour obtenir des informations plus pr
         Analyse le contexte de la question pour mieux comprendre l'intention
         """
         try:
-            question_lower = question.lower()
+            question_lower = normalize_text(question)
             context = {
                 'question_type': 'general',
                 'main_topic': None,
@@ -150,22 +249,22 @@ Suggère des reformulations de la question pour obtenir des informations plus pr
             }
             
             # Détecter le type de question
-            if any(word in question_lower for word in ['comment', 'comment se', 'comment sont']):
+            if any(contains_term(question_lower, word) for word in ['comment', 'comment se', 'comment sont']):
                 context['question_type'] = 'procedure'
                 context['intent'] = 'how_to'
-            elif any(word in question_lower for word in ['quand', 'quand peut', 'quand doit']):
+            elif any(contains_term(question_lower, word) for word in ['quand', 'quand peut', 'quand doit']):
                 context['question_type'] = 'timing'
                 context['intent'] = 'when'
-            elif any(word in question_lower for word in ['qui', 'qui peut', 'qui doit']):
+            elif any(contains_term(question_lower, word) for word in ['qui', 'qui peut', 'qui doit']):
                 context['question_type'] = 'actor'
                 context['intent'] = 'who'
-            elif any(word in question_lower for word in ['quoi', 'qu\'est-ce', 'définition']):
+            elif any(contains_term(question_lower, word) for word in ['quoi', 'qu\'est-ce', 'définition']):
                 context['question_type'] = 'definition'
                 context['intent'] = 'what_is'
-            elif any(word in question_lower for word in ['pourquoi', 'raison', 'cause']):
+            elif any(contains_term(question_lower, word) for word in ['pourquoi', 'raison', 'cause']):
                 context['question_type'] = 'reason'
                 context['intent'] = 'why'
-            elif any(word in question_lower for word in ['quels', 'quelles', 'liste']):
+            elif any(contains_term(question_lower, word) for word in ['quels', 'quelles', 'liste']):
                 context['question_type'] = 'list'
                 context['intent'] = 'list'
             
@@ -192,32 +291,32 @@ Suggère des reformulations de la question pour obtenir des informations plus pr
             
             # Identifier les entités dans la question
             for entity, keywords in entities.items():
-                if any(keyword in question_lower for keyword in keywords):
+                if any(contains_term(question_lower, keyword) for keyword in keywords):
                     context['entities'].append(entity)
                     if not context['main_topic']:
                         context['main_topic'] = entity
             
             # Extraire les mots-clés contextuels
             context_keywords = []
-            if 'enfant' in question_lower or 'enfants' in question_lower:
+            if contains_term(question_lower, 'enfant') or contains_term(question_lower, 'enfants'):
                 context_keywords.extend(['protection', 'éducation', 'famille', 'droits'])
-            if 'droit' in question_lower or 'droits' in question_lower:
+            if contains_term(question_lower, 'droit') or contains_term(question_lower, 'droits'):
                 context_keywords.extend(['garantie', 'protection', 'liberté'])
-            if 'citoyen' in question_lower:
+            if contains_term(question_lower, 'citoyen'):
                 context_keywords.extend(['devoir', 'responsabilité', 'participation'])
-            if 'président' in question_lower:
+            if contains_term(question_lower, 'président'):
                 context_keywords.extend(['pouvoir', 'mandat', 'élection'])
-            if 'gouvernement' in question_lower:
+            if contains_term(question_lower, 'gouvernement'):
                 context_keywords.extend(['formation', 'responsabilité', 'pouvoir'])
             
             context['keywords'] = context_keywords
             
             # Ajouter des indices contextuels
-            if 'droits' in question_lower and 'enfant' in question_lower:
+            if contains_term(question_lower, 'droits') and contains_term(question_lower, 'enfant'):
                 context['context_clues'].append('droits_fondamentaux_enfants')
-            if 'éducation' in question_lower:
+            if contains_term(question_lower, 'éducation'):
                 context['context_clues'].append('éducation_obligatoire')
-            if 'protection' in question_lower:
+            if contains_term(question_lower, 'protection'):
                 context['context_clues'].append('protection_sociale')
             
             return context
@@ -432,12 +531,7 @@ CONTENU DE LA CONSTITUTION :
                 keywords = entity_keywords[entity]
                 articles = []
                 for keyword in keywords:
-                    found_articles = self.db.query(ConstitutionArticle).filter(
-                        and_(
-                            ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                            ConstitutionArticle.is_active == True
-                        )
-                    ).limit(2).all()
+                    found_articles = self._search_content(keyword, limit=2)
                     articles.extend(found_articles)
                 
                 # Dédupliquer
@@ -453,12 +547,7 @@ CONTENU DE LA CONSTITUTION :
     def _search_by_context_keyword(self, keyword: str) -> List[ConstitutionArticle]:
         """Recherche par mot-clé contextuel"""
         try:
-            articles = self.db.query(ConstitutionArticle).filter(
-                and_(
-                    ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                    ConstitutionArticle.is_active == True
-                )
-            ).limit(2).all()
+            articles = self._search_content(keyword, limit=2)
             return articles
         except Exception as e:
             logger.error(f"Erreur lors de la recherche par mot-clé contextuel: {e}")
@@ -477,12 +566,7 @@ CONTENU DE LA CONSTITUTION :
                 keywords = clue_mapping[clue]
                 articles = []
                 for keyword in keywords:
-                    found_articles = self.db.query(ConstitutionArticle).filter(
-                        and_(
-                            ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                            ConstitutionArticle.is_active == True
-                        )
-                    ).limit(1).all()
+                    found_articles = self._search_content(keyword, limit=1)
                     articles.extend(found_articles)
                 
                 return articles[:2]
@@ -497,22 +581,22 @@ CONTENU DE LA CONSTITUTION :
         """Calcule un score de pertinence basé sur le contexte"""
         try:
             score = 0.0
-            content_lower = article.content.lower()
+            content_folded = get_article_index(self.db).folded_content(article.id, article.content)
             
             # Score basé sur les entités
             for entity in context['entities']:
-                if entity in content_lower:
+                if contains_term(content_folded, entity):
                     score += 3.0
             
             # Score basé sur les mots-clés contextuels
             for keyword in context['keywords']:
-                if keyword in content_lower:
+                if contains_term(content_folded, keyword):
                     score += 2.0
             
             # Score basé sur le type de question
-            if context['question_type'] == 'procedure' and any(word in content_lower for word in ['procédure', 'méthode', 'processus']):
+            if context['question_type'] == 'procedure' and any(contains_term(content_folded, word) for word in ['procédure', 'méthode', 'processus']):
                 score += 2.0
-            elif context['question_type'] == 'timing' and any(word in content_lower for word in ['quand', 'délai', 'durée']):
+            elif context['question_type'] == 'timing' and any(contains_term(content_folded, word) for word in ['quand', 'délai', 'durée']):
                 score += 2.0
             
             # Score basé sur la longueur (préférer les articles détaillés)
@@ -643,12 +727,7 @@ CONTENU DE LA CONSTITUTION :
             all_articles = []
             
             for keyword in keywords:
-                articles = self.db.query(ConstitutionArticle).filter(
-                    and_(
-                        ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                        ConstitutionArticle.is_active == True
-                    )
-                ).limit(3).all()
+                articles = self._search_content(keyword, limit=3)
                 all_articles.extend(articles)
             
             # Dédupliquer et trier par pertinence
@@ -683,12 +762,7 @@ CONTENU DE LA CONSTITUTION :
             for theme, keywords in general_themes.items():
                 for keyword in keywords:
                     if keyword in question_lower:
-                        articles = self.db.query(ConstitutionArticle).filter(
-                            and_(
-                                ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                                ConstitutionArticle.is_active == True
-                            )
-                        ).limit(2).all()
+                        articles = self._search_content(keyword, limit=2)
                         theme_articles.extend(articles)
                         break
             
@@ -720,12 +794,7 @@ CONTENU DE LA CONSTITUTION :
             
             semantic_articles = []
             for keyword in semantic_keywords[:5]:  # Limiter à 5 mots-clés
-                articles = self.db.query(ConstitutionArticle).filter(
-                    and_(
-                        ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                        ConstitutionArticle.is_active == True
-                    )
-                ).limit(1).all()
+                articles = self._search_content(keyword, limit=1)
                 semantic_articles.extend(articles)
             
             # Dédupliquer
@@ -738,51 +807,18 @@ CONTENU DE LA CONSTITUTION :
     
     def _search_exhaustive_with_scoring(self, question: str, context: Dict[str, any]) -> List[ConstitutionArticle]:
         """
-        Recherche exhaustive dans tous les articles avec scoring
+        Recherche exhaustive dans tous les articles avec scoring BM25
+        La requête est enrichie du sujet principal, des entités et des mots-clés contextuels
         """
         try:
-            # Récupérer tous les articles actifs
-            all_articles = self.db.query(ConstitutionArticle).filter(
-                ConstitutionArticle.is_active == True
-            ).all()
-            
-            # Calculer un score pour chaque article
-            scored_articles = []
-            question_lower = question.lower()
-            
-            for article in all_articles:
-                score = 0
-                content_lower = article.content.lower()
-                
-                # Score basé sur les mots de la question
-                question_words = question_lower.split()
-                for word in question_words:
-                    if len(word) > 3 and word in content_lower:
-                        score += 1
-                
-                # Score basé sur le contexte
-                if context['main_topic'] and context['main_topic'] in content_lower:
-                    score += 2
-                
-                # Score basé sur les entités
-                for entity in context['entities']:
-                    if entity in content_lower:
-                        score += 1
-                
-                # Score basé sur les mots-clés
-                for keyword in context['keywords']:
-                    if keyword in content_lower:
-                        score += 1
-                
-                # Score basé sur la longueur (préférer les articles détaillés)
-                score += min(len(article.content) / 1000, 1.0)
-                
-                if score > 0:
-                    scored_articles.append((article, score))
+            query_terms = [question]
+            if context['main_topic']:
+                query_terms.append(context['main_topic'])
+            query_terms.extend(context['entities'])
+            query_terms.extend(context['keywords'])
             
-            # Trier par score et retourner les meilleurs
-            scored_articles.sort(key=lambda x: x[1], reverse=True)
-            return [article for article, score in scored_articles[:3]]
+            ranked = get_chatnow_ranker(self.db).search(' '.join(query_terms), top_k=3)
+            return self._articles_for_ids([article_id for article_id, score in ranked])
             
         except Exception as e:
             logger.error(f"Erreur lors de la recherche exhaustive: {e}")
@@ -829,12 +865,7 @@ CONTENU DE LA CONSTITUTION :
             
             similar_articles = []
             for keyword in general_keywords:
-                articles = self.db.query(ConstitutionArticle).filter(
-                    and_(
-                        ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                        ConstitutionArticle.is_active == True
-                    )
-                ).limit(3).all()
+                articles = self._search_content(keyword, limit=3)
                 similar_articles.extend(articles)
             
             # Dédupliquer et limiter
@@ -883,12 +914,7 @@ CONTENU DE LA CONSTITUTION :
             # Rechercher des articles liés à ce thème
             theme_articles = []
             for keyword in theme_keywords[:3]:  # Limiter à 3 mots-clés
-                articles = self.db.query(ConstitutionArticle).filter(
-                    and_(
-                        ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                        ConstitutionArticle.is_active == True
-                    )
-                ).limit(2).all()
+                articles = self._search_content(keyword, limit=2)
                 theme_articles.extend(articles)
             
             # Dédupliquer et limiter
@@ -960,12 +986,7 @@ Vous pouvez également :
             
             similar_articles = []
             for keyword in general_keywords:
-                articles = self.db.query(ConstitutionArticle).filter(
-                    and_(
-                        ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                        ConstitutionArticle.is_active == True
-                    )
-                ).limit(2).all()
+                articles = self._search_content(keyword, limit=2)
                 similar_articles.extend(articles)
             
             # Dédupliquer et limiter
@@ -983,6 +1004,14 @@ Vous pouvez également :
         try:
             question_hash = hashlib.md5(question.lower().strip().encode()).hexdigest()
             
+            # Cache à deux niveaux (mémoire du worker, puis L2 partagé) avant la table ConstitutionCache
+            response_cache = get_response_cache(CHATNOW_SCOPE)
+            shared = response_cache.get(question_hash)
+            if shared is not None:
+                get_cache_hit_buffer().record_hit(shared["id"])
+                logger.info(f"Réponse trouvée en cache partagé pour: {question[:50]}...")
+                return shared["response"]
+            
             cached = self.db.query(ConstitutionCache).filter(
                 and_(
                     ConstitutionCache.question_hash == question_hash,
@@ -993,24 +1022,52 @@ Vous pouvez également :
             if cached:
                 # Vérifier si la réponse n'est pas trop ancienne (max 24h)
                 from datetime import timedelta
-                if cached.created_at < datetime.now() - timedelta(hours=24):
+                if cached.created_at < datetime.now() - timedelta(hours=RESPONSE_CACHE_HOURS):
                     logger.info(f"Cache expiré pour: {question[:50]}...")
                     return None
                 
-                # Mettre à jour le compteur d'utilisation
-                cached.hit_count += 1
-                cached.last_used = datetime.now()
-                self.db.commit()
+                # Compteur d'utilisation écrit en différé : le hit reste une simple lecture
+                get_cache_hit_buffer().record_hit(cached.id)
+                
+                remaining = min(
+                    (cached.expires_at - datetime.now()).total_seconds(),
+                    (cached.created_at + timedelta(hours=RESPONSE_CACHE_HOURS) - datetime.now()).total_seconds()
+                )
+                response_cache.set(question_hash, {"id": cached.id, "response": cached.response}, ttl=remaining)
                 
                 logger.info(f"Réponse trouvée en cache pour: {question[:50]}...")
                 return cached.response
             
-            return None
+            # Question formulée différemment d'une question déjà traitée
+            return self._check_semantic_cache(question)
             
         except Exception as e:
             logger.error(f"Erreur lors de la vérification du cache: {e}")
             return None
     
+    def _check_semantic_cache(self, question: str) -> Optional[str]:
+        """
+        Cherche une question proche déjà traitée ; la portée est initialisée à partir
+        des réponses encore valides de ConstitutionCache
+        """
+        semantic_cache = get_semantic_cache()
+        
+        def load_cached_answers():
+            rows = self.db.query(
+                ConstitutionCache.question,
+                ConstitutionCache.response,
+                ConstitutionCache.expires_at
+            ).filter(
+                ConstitutionCache.expires_at > datetime.now()
+            ).order_by(
+                ConstitutionCache.created_at.desc()
+            ).limit(semantic_cache.max_entries_per_scope).all()
+            return [(q, response, expires_at.timestamp()) for q, response, expires_at in reversed(rows)]
+        
+        semantic_cache.ensure_scope(CHATNOW_SCOPE, load_cached_answers)
+        match = semantic_cache.lookup(question, CHATNOW_SCOPE)
+        return match[0] if match else None
+    
     def _search_relevant_articles(self, question: str) -> List[ConstitutionArticle]:
         """
         Recherche intelligente des articles pertinents avec recherche contextuelle
@@ -1081,12 +1138,8 @@ Vous pouvez également :
                 logger.info(f"Numéros d'articles détectés: {article_numbers}")
                 
                 if article_numbers:
-                    articles = self.db.query(ConstitutionArticle).filter(
-                        and_(
-                            ConstitutionArticle.article_number.in_(article_numbers),
-                            ConstitutionArticle.is_active == True
-                        )
-                    ).all()
+                    article_ids = get_article_index(self.db).search_article_numbers(article_numbers)
+                    articles = self._articles_for_ids(article_ids)
                     
                     if articles:
                         logger.info(f"Articles trouvés par numéro: {[a.article_number for a in articles]}")
@@ -1098,22 +1151,10 @@ Vous pouvez également :
             return []
     
     def _search_general_articles(self, question: str) -> List[ConstitutionArticle]:
-        """Recherche générale dans tous les articles"""
+        """Recherche générale dans tous les articles (top 5 BM25)"""
         try:
-            all_articles = self.db.query(ConstitutionArticle).filter(
-                ConstitutionArticle.is_active == True
-            ).all()
-            
-            # Calculer la pertinence pour tous les articles
-            scored_articles = []
-            for article in all_articles:
-                score = self._calculate_relevance_score(article, question)
-                if score > 0:  # Seulement les articles avec un score positif
-                    scored_articles.append((article, score))
-            
-            # Trier par score et retourner les meilleurs
-            scored_articles.sort(key=lambda x: x[1], reverse=True)
-            return [article for article, score in scored_articles[:5]]
+            ranked = get_chatnow_ranker(self.db).search(question, top_k=5)
+            return self._articles_for_ids([article_id for article_id, score in ranked])
         except Exception as e:
             logger.warning(f"Erreur lors de la recherche générale: {e}")
             return []
@@ -1141,12 +1182,7 @@ Vous pouvez également :
         try:
             content_articles = []
             for keyword in keywords[:3]:
-                articles = self.db.query(ConstitutionArticle).filter(
-                    and_(
-                        ConstitutionArticle.content.ilike(f'%{keyword}%'),
-                        ConstitutionArticle.is_active == True
-                    )
-                ).limit(3).all()
+                articles = self._search_content(keyword, limit=3)
                 content_articles.extend(articles)
             return content_articles
         except Exception as e:
@@ -1162,12 +1198,7 @@ Vous pouvez également :
             if any(word in question_lower for word in ['enfant', 'jeune', 'école', 'éducation']):
                 child_related_words = ['enfant', 'jeune', 'école', 'éducation', 'enseignement', 'scolaire', 'formation']
                 for word in child_related_words:
-                    articles = self.db.query(ConstitutionArticle).filter(
-                        and_(
-                            ConstitutionArticle.content.ilike(f'%{word}%'),
-                            ConstitutionArticle.is_active == True
-                        )
-                    ).limit(2).all()
+                    articles = self._search_content(word, limit=2)
                     synonym_articles.extend(articles)
             
             return synonym_articles
@@ -1244,13 +1275,13 @@ Vous pouvez également :
             'stabilité': ['stabilité', 'stable', 'équilibre', 'équilibré']
         }
         
-        question_lower = question.lower()
+        question_lower = normalize_text(question)
         keywords = []
         
         # Extraire les mots-clés avec expansion sémantique
         for main_keyword, synonyms in keyword_mapping.items():
             for synonym in synonyms:
-                if synonym in question_lower:
+                if contains_term(question_lower, synonym):
                     keywords.append(main_keyword)
                     break
         
@@ -1268,7 +1299,7 @@ Vous pouvez également :
             # Mots communs qui pourraient indiquer le sujet
             general_words = ['que', 'quoi', 'comment', 'pourquoi', 'quand', 'où', 'qui', 'dis', 'dit', 'disent']
             for word in general_words:
-                if word in question_lower:
+                if contains_term(question_lower, word):
                     # Recherche plus large dans tous les articles
                     keywords.append('général')
                     break
@@ -1282,63 +1313,51 @@ Vous pouvez également :
         context_keywords = []
         
         # Détecter le type de question
-        if any(word in question_lower for word in ['comment', 'comment se', 'comment sont', 'comment peut']):
+        if any(contains_term(question_lower, word) for word in ['comment', 'comment se', 'comment sont', 'comment peut']):
             context_keywords.extend(['procédure', 'méthode', 'processus'])
         
-        if any(word in question_lower for word in ['quand', 'quand peut', 'quand doit']):
+        if any(contains_term(question_lower, word) for word in ['quand', 'quand peut', 'quand doit']):
             context_keywords.extend(['condition', 'moment', 'circonstance'])
         
-        if any(word in question_lower for word in ['qui', 'qui peut', 'qui doit']):
+        if any(contains_term(question_lower, word) for word in ['qui', 'qui peut', 'qui doit']):
             context_keywords.extend(['personne', 'autorité', 'responsable'])
         
-        if any(word in question_lower for word in ['quoi', 'qu\'est-ce', 'définition']):
+        if any(contains_term(question_lower, word) for word in ['quoi', 'qu\'est-ce', 'définition']):
             context_keywords.extend(['définition', 'concept', 'principe'])
         
-        if any(word in question_lower for word in ['pourquoi', 'raison', 'cause']):
+        if any(contains_term(question_lower, word) for word in ['pourquoi', 'raison', 'cause']):
             context_keywords.extend(['justification', 'motif', 'fondement'])
         
-        if any(word in question_lower for word in ['obligation', 'obligatoire', 'devoir', 'contrainte']):
+        if any(contains_term(question_lower, word) for word in ['obligation', 'obligatoire', 'devoir', 'contrainte']):
             context_keywords.extend(['obligation', 'devoir', 'responsabilité'])
         
-        if any(word in question_lower for word in ['formation', 'former', 'créer', 'établir']):
+        if any(contains_term(question_lower, word) for word in ['formation', 'former', 'créer', 'établir']):
             context_keywords.extend(['formation', 'création', 'établissement'])
         
-        if any(word in question_lower for word in ['dissolution', 'dissoudre', 'dissous']):
+        if any(contains_term(question_lower, word) for word in ['dissolution', 'dissoudre', 'dissous']):
             context_keywords.extend(['dissolution', 'fin', 'terminaison'])
         
-        if any(word in question_lower for word in ['urgence', 'crise', 'exceptionnel']):
+        if any(contains_term(question_lower, word) for word in ['urgence', 'crise', 'exceptionnel']):
             context_keywords.extend(['urgence', 'exception', 'crise'])
         
-        if any(word in question_lower for word in ['trahison', 'traître']):
+        if any(contains_term(question_lower, word) for word in ['trahison', 'traître']):
             context_keywords.extend(['trahison', 'infraction', 'crime'])
         
         return context_keywords
     
     def _calculate_relevance_score(self, article: ConstitutionArticle, question: str) -> float:
         """
-        Calcule un score de pertinence pour un article
+        Calcule un score de pertinence BM25 pour un article
+        Les scores de la question sont calculés une seule fois puis réutilisés pour chaque article
         """
-        score = 0.0
-        question_lower = question.lower()
-        content_lower = article.content.lower()
+        if question not in self._bm25_scores:
+            self._bm25_scores[question] = get_chatnow_ranker(self.db).score(question)
+        score = self._bm25_scores[question].get(article.id, 0.0)
         
-        # Score basé sur les mots-clés communs
-        keywords = article.keywords.split(', ') if article.keywords else []
-        for keyword in keywords:
-            if keyword.lower() in question_lower:
-                score += 2.0
-        
-        # Score basé sur le numéro d'article mentionné
+        # Bonus pour le numéro d'article mentionné
         if article.article_number in question:
             score += 5.0
         
-        # Score basé sur la catégorie
-        if article.category and article.category.lower() in question_lower:
-            score += 3.0
-        
-        # Score basé sur la longueur du contenu (préférer les articles détaillés)
-        score += min(len(article.content) / 1000, 2.0)
-        
         return score
     
     def _build_optimized_context(self, articles: List[ConstitutionArticle]) -> str:
@@ -1430,6 +1449,65 @@ TON STYLE: Amical, professionnel, précis, avec citations exactes."""
         
         return response.choices[0].message.content.strip()
     
+    async def astream_chat_response(self, question: str, chat_history: List[Dict] = None, user_id: Optional[str] = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Variante en streaming : produit des couples (type, texte)
+        - ("answer", texte) : réponse complète connue d'avance (cache ou fallback), en un seul événement
+        - ("delta", fragment) : fragment de la réponse du LLM au fil de sa génération
+        - ("error", message) : génération interrompue après des fragments ; la réponse envoyée est partielle
+        La réponse complète est enregistrée dans le cache une fois le flux terminé
+        """
+        try:
+            answer, conversation_messages, relevant_articles = await run_in_threadpool(
+                self._prepare_chat_response, question, chat_history
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de la préparation de la réponse en streaming: {e}")
+            yield "answer", "Désolé, je rencontre une difficulté technique. Pouvez-vous reformuler votre question ?"
+            return
+        
+        if answer is not None:
+            yield "answer", answer
+            return
+        
+        fragments = []
+        try:
+            async for delta in stream_chat_completion(
+                conversation_messages,
+                model=self.model,
+                max_tokens=500,
+                temperature=0.3,
+                timeout=10
+            ):
+                fragments.append(delta)
+                yield "delta", delta
+        except Exception as e:
+            logger.error(f"Erreur pendant le streaming de la réponse: {e}")
+            if not fragments:
+                yield "answer", "Désolé, je rencontre une difficulté technique. Pouvez-vous reformuler votre question ?"
+            else:
+                yield "error", "La génération de la réponse a été interrompue."
+            return
+        
+        # Le cache ne reçoit que des réponses complètes
+        response = "".join(fragments).strip()
+        if response:
+            self._save_response_cache(question, response, relevant_articles)
+    
+    async def _acall_openai_api(self, messages: List[Dict]) -> str:
+        """
+        Appel asynchrone via le client AsyncOpenAI partagé (mêmes paramètres que _call_openai_api)
+        """
+        return await chat_completion(
+            messages,
+            model=self.model,
+            max_tokens=500,
+            temperature=0.3,
+            presence_penalty=0.0,
+            frequency_penalty=0.0,
+            timeout=10
+        )
+    
     def _save_response_cache(self, question: str, response: str, articles: List[ConstitutionArticle]):
         """
         Sauvegarde la réponse dans le cache
@@ -1441,7 +1519,7 @@ TON STYLE: Amical, professionnel, précis, avec citations exactes."""
             article_refs = [f"Article {art.article_number}" for art in articles]
             
             # Expiration dans 24 heures
-            expires_at = datetime.now() + timedelta(hours=24)
+            expires_at = datetime.now() + timedelta(hours=RESPONSE_CACHE_HOURS)
             
             cache_entry = ConstitutionCache(
                 question_hash=question_hash,
@@ -1454,6 +1532,13 @@ TON STYLE: Amical, professionnel, précis, avec citations exactes."""
             self.db.add(cache_entry)
             self.db.commit()
             
+            get_response_cache(CHATNOW_SCOPE).set(
+                question_hash,
+                {"id": cache_entry.id, "response": response},
+                ttl=RESPONSE_CACHE_HOURS * 3600
+            )
+            get_semantic_cache().store(question, response, CHATNOW_SCOPE)
+            
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du cache: {e}")
             self.db.rollback()
@@ -1534,3 +1619,8 @@ def initialize_chatnow_service(db: Session):
     """Initialise le service ChatNow avec la base de données"""
     global chatnow_service
     chatnow_service = OptimizedChatNowService(db)
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Statistiques de regroupement des requêtes ChatNow"""
+    return {"sync": _chat_flights.get_stats(), "async": _async_chat_flights.get_stats()}
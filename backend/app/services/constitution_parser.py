@@ -14,6 +14,12 @@ from app.models.constitution_data import (
     ConstitutionKeyword,
     ConstitutionCache
 )
+from app.services.article_index import rebuild_article_index
+from app.services.bm25_ranker import rebuild_chatnow_ranker
+from app.services.bulk_writer import has_changes, sync_rows
+from app.services.fts_search import ensure_fts_tables
+from app.services.semantic_cache import CHATNOW_SCOPE, get_semantic_cache
+from app.services.shared_cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -265,30 +271,41 @@ class ConstitutionParser:
     def save_to_database(self, parsed_data: Dict) -> bool:
         """
         Sauvegarde les données parsées dans la base de données
+        Les lignes existantes sont comparées aux nouvelles (structure par niveau et titre, articles par
+        numéro, mots-clés par article et mot) : seules les différences sont écrites, en masse
         """
         try:
-            # Vider les tables existantes
-            self.db.query(ConstitutionArticle).delete()
-            self.db.query(ConstitutionStructure).delete()
-            self.db.query(ConstitutionKeyword).delete()
-            
-            # Sauvegarder la structure
-            for item in parsed_data['structure']:
-                structure = ConstitutionStructure(**item)
-                self.db.add(structure)
-            
-            # Sauvegarder les articles
-            for article_data in parsed_data['articles']:
-                article = ConstitutionArticle(**article_data)
-                self.db.add(article)
-            
-            # Sauvegarder les mots-clés
-            for keyword_data in parsed_data['keywords']:
-                keyword = ConstitutionKeyword(**keyword_data)
-                self.db.add(keyword)
+            results = {
+                'structure': sync_rows(
+                    self.db, ConstitutionStructure.__table__, parsed_data['structure'],
+                    key_fields=('level', 'title')
+                ),
+                'articles': sync_rows(
+                    self.db, ConstitutionArticle.__table__, parsed_data['articles'],
+                    key_fields=('article_number',)
+                ),
+                'keywords': sync_rows(
+                    self.db, ConstitutionKeyword.__table__, parsed_data['keywords'],
+                    key_fields=('article_id', 'keyword')
+                )
+            }
             
             self.db.commit()
-            logger.info(f"Données de constitution sauvegardées: {parsed_data['total_articles']} articles")
+            summary = ", ".join(
+                f"{name}: +{result['inserted']} ~{result['updated']} -{result['deleted']}"
+                for name, result in results.items()
+            )
+            logger.info(f"Données de constitution sauvegardées: {parsed_data['total_articles']} articles ({summary})")
+            
+            # Reconstruire l'index inversé et le classement BM25 utilisés par ChatNow (inutile sans changement)
+            if any(has_changes(result) for result in results.values()):
+                rebuild_article_index(self.db)
+                rebuild_chatnow_ranker(self.db)
+                # Réponses ChatNow en cache (L1 de ce worker, L2 partagé par tous les workers, cache sémantique)
+                get_response_cache(CHATNOW_SCOPE).clear()
+                get_semantic_cache().clear(CHATNOW_SCOPE)
+            # Les triggers FTS5 ont suivi les écritures ; crée l'index s'il n'existait pas encore
+            ensure_fts_tables(self.db.get_bind())
             return True
             
         except Exception as e:
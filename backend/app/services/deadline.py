@@ -0,0 +1,137 @@
+"""
+Budgets de temps par requête (deadlines) propagés par contextvars
+Remplace signal.alarm, qui ne fonctionne que dans le thread principal : la deadline courante
+est visible de la recherche, des embeddings et des appels LLM (threads du pool compris grâce à
+copy_context), et chaque étape borne son attente au temps restant
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Le budget de temps de la requête est épuisé"""
+
+    def __init__(self, stage: str = ""):
+        self.stage = stage
+        super().__init__(f"Délai dépassé{f' ({stage})' if stage else ''}")
+
+
+class Deadline:
+    """Instant limite (horloge monotone) d'une requête"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Temps d'attente accordé à une étape : le temps restant, éventuellement plafonné"""
+        remaining = self.remaining()
+        return remaining if cap is None else min(remaining, cap)
+
+    def check(self, stage: str = ""):
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+# Étapes bloquantes exécutées sous deadline ; une étape abandonnée finit en arrière-plan, bornée par
+# ses propres timeouts (request_timeout), ce qui libère son thread. Le sémaphore compte les threads
+# occupés : une étape n'attend jamais dans la file du pool en consommant son budget
+_executor = ThreadPoolExecutor(max_workers=settings.DEADLINE_EXECUTOR_WORKERS, thread_name_prefix="deadline")
+_executor_slots = threading.BoundedSemaphore(settings.DEADLINE_EXECUTOR_WORKERS)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def remaining_time(default: Optional[float] = None) -> Optional[float]:
+    """Temps restant de la deadline courante, ou default s'il n'y en a pas"""
+    deadline = _current_deadline.get()
+    return deadline.remaining() if deadline is not None else default
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[Deadline]:
+    """
+    Ouvre une deadline pour le bloc ; une deadline englobante plus proche reste prioritaire
+    (un appel interne ne peut jamais prolonger le budget de la requête)
+    """
+    outer = _current_deadline.get()
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def run_with_deadline(fn: Callable[..., Any], *args, stage: str = "", **kwargs) -> Any:
+    """
+    Exécute fn dans le pool et attend au plus le temps restant ; lève DeadlineExceeded au-delà
+    Sans deadline courante, fn est appelée directement ; pool saturé (étapes abandonnées encore en cours),
+    fn est appelée dans le thread courant, où ses appels réseau restent bornés par la deadline
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return fn(*args, **kwargs)
+    deadline.check(stage)
+    if not _executor_slots.acquire(blocking=False):
+        logger.warning(f"⏱️ Pool des deadlines saturé, exécution directe: {stage or getattr(fn, '__name__', 'étape')}")
+        return fn(*args, **kwargs)
+    context = contextvars.copy_context()
+    try:
+        future = _executor.submit(context.run, fn, *args, **kwargs)
+    except BaseException:
+        _executor_slots.release()
+        raise
+    future.add_done_callback(lambda _: _executor_slots.release())
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FutureTimeoutError:
+        logger.warning(f"⏱️ Délai dépassé pendant: {stage or getattr(fn, '__name__', 'étape')}")
+        raise DeadlineExceeded(stage)
+
+
+async def wait_with_deadline(awaitable: Awaitable[Any], stage: str = "") -> Any:
+    """Variante asyncio : annule l'attente quand la deadline courante expire"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ Délai dépassé pendant: {stage or 'appel asynchrone'}")
+        raise DeadlineExceeded(stage)
+
+
+def request_timeout(default: float) -> float:
+    """Timeout HTTP d'un appel (client OpenAI) : le temps restant s'il est plus court que default"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    deadline.check("appel LLM")
+    return deadline.timeout(cap=default)
@@ -0,0 +1,175 @@
+"""
+Backends d'embeddings interchangeables pour la recherche vectorielle
+- "openai" : OpenAIEmbeddings (un aller-retour HTTPS par requête)
+- "local"  : modèle sentence-transformers exécuté sur CPU (PyTorch ou ONNX), sans réseau
+Le backend est choisi par Settings.EMBEDDING_BACKEND ; son nom (backend + modèle) est enregistré
+avec l'index FAISS pour ne jamais mélanger des vecteurs issus de modèles différents
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+from app.services.deadline import current_deadline, request_timeout
+
+logger = logging.getLogger(__name__)
+
+# Première version de sentence-transformers acceptant SentenceTransformer(backend="onnx")
+ONNX_MIN_VERSION = (3, 2)
+
+
+def _version_tuple(version: str) -> tuple:
+    """"2.2.2" -> (2, 2) ; les suffixes (rc, dev) sont ignorés"""
+    parts = []
+    for part in version.split(".")[:2]:
+        digits = "".join(char for char in part if char.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts)
+
+
+class EmbeddingBackend(Embeddings):
+    """Interface commune : embed_documents / embed_query de LangChain, plus une description du modèle"""
+
+    backend: str = "base"
+    model: str = ""
+
+    @property
+    def name(self) -> str:
+        """Identifiant stable du modèle, utilisé comme clé du store d'embeddings et dans les métadonnées d'index"""
+        return f"{self.backend}:{self.model}"
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "model": self.model}
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    backend = "openai"
+
+    def __init__(self, api_key: str, model: Optional[str] = None, batch_size: int = 256):
+        from langchain_openai import OpenAIEmbeddings
+
+        kwargs: Dict[str, Any] = {"openai_api_key": api_key, "chunk_size": batch_size}
+        if model:
+            kwargs["model"] = model
+        self._embeddings = OpenAIEmbeddings(**kwargs)
+        self.model = getattr(self._embeddings, "model", model or "default")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if current_deadline() is None:
+            return self._embeddings.embed_query(text)
+        # Sous deadline, le temps restant devient le timeout HTTP : le thread est libéré à l'expiration
+        response = self._embeddings.client.create(
+            input=[text],
+            model=self.model,
+            timeout=request_timeout(settings.OPENAI_TIMEOUT)
+        )
+        return response.data[0].embedding
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    Encodage CPU par lots ; le pool de threads borné limite le nombre d'encodages simultanés
+    (les requêtes du threadpool FastAPI ne se disputent pas toutes les cœurs en même temps)
+    """
+
+    backend = "local"
+
+    def __init__(
+        self,
+        model: str,
+        device: str = "cpu",
+        runtime: str = "torch",
+        batch_size: int = 32,
+        max_workers: int = 2
+    ):
+        import sentence_transformers
+        from sentence_transformers import SentenceTransformer
+
+        if runtime not in ("torch", "onnx"):
+            raise ValueError(f"EMBEDDING_LOCAL_RUNTIME inconnu: {runtime} (attendu: torch ou onnx)")
+        self.model = model
+        self.runtime = runtime
+        self.batch_size = batch_size
+        kwargs: Dict[str, Any] = {"device": device}
+        if runtime == "onnx":
+            # Paramètre backend= disponible à partir de sentence-transformers 3.2 (dépendance optimum[onnxruntime])
+            version = sentence_transformers.__version__
+            if _version_tuple(version) < ONNX_MIN_VERSION:
+                raise ValueError(
+                    f"EMBEDDING_LOCAL_RUNTIME=onnx requiert sentence-transformers >= 3.2 "
+                    f"(version installée: {version}) ; utiliser EMBEDDING_LOCAL_RUNTIME=torch"
+                )
+            kwargs["backend"] = "onnx"
+        self._model = SentenceTransformer(model, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embeddings")
+        logger.info(f"✅ Modèle d'embeddings local chargé: {model} ({runtime}, {device})")
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # Plusieurs lots en parallèle dans le pool borné, résultat dans l'ordre d'origine
+        step = self.batch_size * 4
+        batches = [texts[start:start + step] for start in range(0, len(texts), step)]
+        vectors: List[List[float]] = []
+        for batch_vectors in self._executor.map(self._encode, batches):
+            vectors.extend(batch_vectors)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._executor.submit(self._encode, [text]).result()[0]
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "model": self.model, "runtime": self.runtime}
+
+
+def create_embedding_backend(backend: Optional[str] = None) -> EmbeddingBackend:
+    """Instancie le backend configuré (ou celui demandé)"""
+    backend = (backend or settings.EMBEDDING_BACKEND).lower()
+    if backend == "local":
+        return LocalEmbeddingBackend(
+            model=settings.EMBEDDING_LOCAL_MODEL,
+            device=settings.EMBEDDING_LOCAL_DEVICE,
+            runtime=settings.EMBEDDING_LOCAL_RUNTIME,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_workers=settings.EMBEDDING_MAX_WORKERS
+        )
+    if backend == "openai":
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY environment variable not found.")
+        return OpenAIEmbeddingBackend(
+            settings.OPENAI_API_KEY,
+            model=settings.EMBEDDING_OPENAI_MODEL,
+            batch_size=settings.EMBEDDING_OPENAI_BATCH_SIZE
+        )
+    raise ValueError(f"Backend d'embeddings inconnu: {backend}")
+
+
+_embedding_backend: Optional[EmbeddingBackend] = None
+_embedding_backend_lock = threading.Lock()
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """Instance partagée par le processus (un modèle local n'est chargé qu'une fois)"""
+    global _embedding_backend
+    if _embedding_backend is None:
+        with _embedding_backend_lock:
+            if _embedding_backend is None:
+                _embedding_backend = create_embedding_backend()
+    return _embedding_backend
@@ -0,0 +1,178 @@
+"""
+Stockage persistant des embeddings sur disque (SQLite)
+Chaque vecteur est indexé par SHA-256(modèle + texte du chunk) : une reconstruction de l'index FAISS
+ne calcule que les embeddings des chunks nouveaux ou modifiés, et un rafraîchissement complet
+d'un corpus inchangé ne fait aucun appel au fournisseur d'embeddings
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Nombre de paramètres par requête SELECT ... IN (...) (limite SQLite : 999 sur les anciennes versions)
+_LOOKUP_BATCH = 500
+
+
+def content_key(model: str, text: str) -> str:
+    """Clé d'un chunk : le même texte embarqué par un autre modèle est une autre entrée"""
+    return hashlib.sha256(f"{model}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Table SQLite (clé, modèle, dimension, vecteur float32 brut) ; une connexion par thread,
+    mode WAL pour que les lectures ne bloquent pas pendant l'écriture d'un lot
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL
+                )
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Vecteurs déjà connus parmi les clés demandées"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        connection = self._connection()
+        for start in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]) -> int:
+        """Enregistre des vecteurs en une transaction ; retourne le nombre de lignes écrites"""
+        rows = [
+            (key, model, len(vector), np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in items
+        ]
+        if not rows:
+            return 0
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def count(self, model: Optional[str] = None) -> int:
+        connection = self._connection()
+        if model is None:
+            return connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return connection.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def clear(self, model: Optional[str] = None):
+        with self._connection() as connection:
+            if model is None:
+                connection.execute("DELETE FROM embeddings")
+            else:
+                connection.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Enveloppe d'un modèle d'embeddings LangChain : embed_documents ne transmet au modèle
+    que les textes absents du store ; embed_query passe par un cache mémoire optionnel
+    """
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingStore, model_name: str, query_cache=None):
+        self.embeddings = embeddings
+        self.store = store
+        self.model_name = model_name
+        self.query_cache = query_cache
+
+        self.reused = 0
+        self.computed = 0
+        self.provider_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [content_key(self.model_name, text) for text in texts]
+        vectors = self.store.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = self.embeddings.embed_documents(list(missing.values()))
+            self.provider_calls += 1
+            self.computed += len(computed)
+            new_vectors = dict(zip(missing.keys(), computed))
+            self.store.put_many(self.model_name, new_vectors.items())
+            vectors.update(new_vectors)
+
+        self.reused += len(texts) - len(missing)
+        logger.info(
+            f"🧮 Embeddings: {len(texts) - len(missing)} réutilisés, {len(missing)} calculés ({self.model_name})"
+        )
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.query_cache is None:
+            return self.embeddings.embed_query(text)
+        key = content_key(self.model_name, text)
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.provider_calls += 1
+            self.query_cache.set(key, vector)
+        return vector
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "model": self.model_name,
+            "reused": self.reused,
+            "computed": self.computed,
+            "provider_calls": self.provider_calls,
+            "stored": self.store.count(self.model_name)
+        }
+
+
+_embedding_store: Optional[EmbeddingStore] = None
+_embedding_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Instance partagée par le processus"""
+    global _embedding_store
+    if _embedding_store is None:
+        with _embedding_store_lock:
+            if _embedding_store is None:
+                _embedding_store = EmbeddingStore(settings.EMBEDDING_STORE_PATH)
+    return _embedding_store
@@ -0,0 +1,144 @@
+"""
+Cache disque des artefacts d'extraction des PDF, indexé par l'empreinte SHA-256 du contenu
+Un même fichier passe par l'analyse GPT-4 (PDFAnalyzer), l'import des articles (PDFImporter)
+puis les retraitements forcés : les pages extraites (OCR compris) sont enregistrées une seule fois
+et partagées par les deux, chaque étape y ajoute son artefact (articles, métadonnées). Un fichier inchangé ne coûte plus qu'un calcul d'empreinte,
+mémorisé par (chemin, taille, mtime) pour toute la durée du processus.
+Structure : <racine>/v<version>/<sha[:2]>/<sha>/<artefact>.json, écrits de façon atomique
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand le format d'un artefact (ou le parsing qui le produit) change
+ARTIFACT_VERSION = 5
+
+# Empreintes mémorisées au plus (le dictionnaire est vidé au-delà)
+_MAX_DIGESTS = 1024
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Empreinte SHA-256 du contenu du fichier, lu par blocs de 1 Mo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Artefacts par empreinte : "pages" (extract_pages_cached), "articles" (PDFImporter), "metadata"
+    (PDFAnalyzer). Une lecture illisible ou une écriture impossible est journalisée et traitée comme
+    un défaut de cache : l'extraction est alors refaite normalement
+    """
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = os.path.join(root, f"v{ARTIFACT_VERSION}")
+        self.enabled = enabled
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hashed_files = 0
+
+    def digest(self, pdf_path: str) -> str:
+        """Empreinte du fichier, recalculée seulement si sa taille ou sa date de modification change"""
+        stat = os.stat(pdf_path)
+        key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is not None:
+            return digest
+        digest = file_sha256(pdf_path)
+        with self._lock:
+            if len(self._digests) >= _MAX_DIGESTS:
+                self._digests.clear()
+            self._digests[key] = digest
+            self.hashed_files += 1
+        return digest
+
+    def _artifact_path(self, digest: str, kind: str) -> str:
+        return os.path.join(self.root, digest[:2], digest, f"{kind}.json")
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def load(self, pdf_path: str, kind: str) -> Optional[Any]:
+        """Artefact enregistré pour le contenu actuel du fichier, ou None"""
+        if not self.enabled:
+            return None
+        try:
+            path = self._artifact_path(self.digest(pdf_path), kind)
+            with open(path, "r", encoding="utf-8") as handle:
+                value = json.load(handle)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Artefact {kind} illisible pour {os.path.basename(pdf_path)}: {e}")
+            self._count("misses")
+            return None
+        self._count("hits")
+        logger.info(f"♻️ Artefact {kind} réutilisé pour {os.path.basename(pdf_path)}")
+        return value
+
+    def store(self, pdf_path: str, kind: str, value: Any):
+        """Enregistre l'artefact (fichier temporaire puis os.replace : un lecteur ne voit jamais un JSON partiel)"""
+        if not self.enabled:
+            return
+        try:
+            path = self._artifact_path(self.digest(pdf_path), kind)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{kind}-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(value, handle, ensure_ascii=False, default=str)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Artefact {kind} non enregistré pour {os.path.basename(pdf_path)}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "path": self.root,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "hashed_files": self.hashed_files
+            }
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Cache du processus (les artefacts sur disque sont communs à tous les workers)"""
+    global _extraction_cache
+    if _extraction_cache is None:
+        with _extraction_cache_lock:
+            if _extraction_cache is None:
+                _extraction_cache = ExtractionCache(
+                    settings.EXTRACTION_CACHE_PATH,
+                    enabled=settings.EXTRACTION_CACHE_ENABLED
+                )
+    return _extraction_cache
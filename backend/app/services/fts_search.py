@@ -0,0 +1,151 @@
+"""
+Recherche plein texte SQLite FTS5 sur le contenu des articles
+Les tables virtuelles constitution_articles_fts et articles_fts sont des index "external content"
+synchronisés par triggers : chaque worker uvicorn interroge le même index sur disque
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.services.text_normalizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Tokenizer FTS5 : insensible à la casse et aux accents ("election" trouve "élection")
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# table source -> (table FTS, colonnes indexées)
+FTS_TABLES = {
+    "constitution_articles": ("constitution_articles_fts", ("content", "keywords")),
+    "articles": ("articles_fts", ("article_number", "title", "content")),
+}
+
+
+def _fts_ddl(source: str, fts_table: str, columns) -> List[str]:
+    """Table virtuelle + triggers AFTER INSERT/UPDATE/DELETE maintenant l'index à jour"""
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{col}" for col in columns)
+    old_cols = ", ".join(f"old.{col}" for col in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{cols}, content='{source}', content_rowid='id', tokenize='{FTS_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {source} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+    ]
+
+
+def ensure_fts_tables(engine: Engine, rebuild: bool = False) -> bool:
+    """
+    Crée les tables FTS5 et leurs triggers si nécessaire
+    Une table nouvellement créée est remplie à partir de sa table source ('rebuild')
+    Retourne False si la base n'est pas SQLite ou si FTS5 n'est pas disponible
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("ℹ️ Base non SQLite: recherche FTS5 désactivée")
+        return False
+
+    try:
+        existing_tables = set(inspect(engine).get_table_names())
+        with engine.begin() as conn:
+            for source, (fts_table, columns) in FTS_TABLES.items():
+                if source not in existing_tables:
+                    continue
+                created = fts_table not in existing_tables
+                for statement in _fts_ddl(source, fts_table, columns):
+                    conn.execute(text(statement))
+                if created or rebuild:
+                    conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+                    logger.info(f"📚 Index FTS5 {fts_table} construit")
+        return True
+    except OperationalError as e:
+        logger.warning(f"⚠️ FTS5 indisponible: {e}")
+        return False
+
+
+def build_match_query(query: str, match_all: bool = True) -> Optional[str]:
+    """
+    Convertit une saisie utilisateur en expression MATCH sûre
+    Chaque terme normalisé (élisions retirées) est mis entre guillemets, sans opérateur FTS5 interprété,
+    et recherché en préfixe
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    operator = " AND " if match_all else " OR "
+    return operator.join(f'"{term}"*' for term in terms)
+
+
+def _run_search(db: Session, sql: str, params: Dict) -> Optional[List[Dict]]:
+    if db.bind is None or db.bind.dialect.name != "sqlite":
+        return None
+    try:
+        rows = db.execute(text(sql), params).fetchall()
+    except OperationalError as e:
+        # Table FTS absente (base non initialisée) : l'appelant se rabat sur sa recherche SQL
+        logger.warning(f"⚠️ Recherche FTS5 impossible: {e}")
+        return None
+    # bm25() renvoie un score négatif (plus petit = plus pertinent)
+    return [{"id": row[0], "score": -row[1], "snippet": row[2]} for row in rows]
+
+
+def search_articles(
+    db: Session,
+    query: str,
+    constitution_id: Optional[int] = None,
+    limit: int = 50,
+    match_all: bool = True
+) -> Optional[List[Dict]]:
+    """
+    Recherche dans les articles importés (table articles), classée par bm25()
+    Retourne [{id, score, snippet}] ou None si FTS5 n'est pas utilisable
+    """
+    match = build_match_query(query, match_all)
+    if match is None:
+        return []
+
+    sql = (
+        "SELECT a.id, bm25(articles_fts), "
+        "snippet(articles_fts, 2, '<mark>', '</mark>', '…', 24) "
+        "FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+        "WHERE articles_fts MATCH :match"
+    )
+    params = {"match": match, "limit": limit}
+    if constitution_id:
+        sql += " AND a.constitution_id = :constitution_id"
+        params["constitution_id"] = constitution_id
+    sql += " ORDER BY bm25(articles_fts) LIMIT :limit"
+    return _run_search(db, sql, params)
+
+
+def search_constitution_articles(
+    db: Session,
+    query: str,
+    limit: int = 10,
+    match_all: bool = True
+) -> Optional[List[Dict]]:
+    """
+    Recherche dans les articles ChatNow actifs (table constitution_articles), classée par bm25()
+    Retourne [{id, score, snippet}] ou None si FTS5 n'est pas utilisable
+    """
+    match = build_match_query(query, match_all)
+    if match is None:
+        return []
+
+    sql = (
+        "SELECT c.id, bm25(constitution_articles_fts), "
+        "snippet(constitution_articles_fts, 0, '<mark>', '</mark>', '…', 24) "
+        "FROM constitution_articles_fts JOIN constitution_articles c ON c.id = constitution_articles_fts.rowid "
+        "WHERE constitution_articles_fts MATCH :match AND c.is_active = 1 "
+        "ORDER BY bm25(constitution_articles_fts) LIMIT :limit"
+    )
+    return _run_search(db, sql, {"match": match, "limit": limit})
@@ -0,0 +1,245 @@
+"""
+Recherche hybride : passages FAISS (sémantique) et articles trouvés par mots-clés (FTS5 / BM25)
+Les deux recherches s'exécutent en parallèle, leurs classements sont fusionnés par
+Reciprocal Rank Fusion (RRF) et dédoublonnés par numéro d'article
+"""
+
+import contextvars
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.services.deadline import remaining_time
+
+logger = logging.getLogger(__name__)
+
+# Constante de lissage usuelle de RRF : limite l'avantage des toutes premières places
+RRF_K = 60
+
+# Marge laissée à l'appelant pour fusionner et répondre avant l'expiration de la deadline
+_DEADLINE_MARGIN = 0.2
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, Sequence[Hashable]],
+    k: int = RRF_K
+) -> List[Tuple[Hashable, float, Dict[str, int]]]:
+    """
+    Fusionne des classements : score(d) = somme sur les classements de 1 / (k + rang(d))
+    Retourne [(clé, score, {classement: rang})] par score décroissant (rangs à partir de 1)
+    """
+    scores: Dict[Hashable, float] = {}
+    ranks: Dict[Hashable, Dict[str, int]] = {}
+    for name, ranking in rankings.items():
+        for rank, key in enumerate(ranking, start=1):
+            if name in ranks.get(key, {}):
+                continue  # doublon dans un même classement : seul le meilleur rang compte
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            ranks.setdefault(key, {})[name] = rank
+    fused = sorted(scores.items(), key=lambda item: -item[1])
+    return [(key, score, ranks[key]) for key, score in fused]
+
+
+def article_key(constitution_id: Any, article_number: Any, fallback: str = "") -> Hashable:
+    """Clé de dédoublonnage : un article d'une constitution, quel que soit le nombre de chunks qui le citent"""
+    if constitution_id is not None and article_number:
+        return (constitution_id, str(article_number).strip().lower())
+    return ("chunk", hashlib.sha1(fallback.encode("utf-8")).hexdigest())
+
+
+def _document_hit(document) -> Dict[str, Any]:
+    metadata = dict(document.metadata or {})
+    return {
+        "key": article_key(metadata.get("constitution_id"), metadata.get("article_number"), document.page_content),
+        "constitution_id": metadata.get("constitution_id"),
+        "constitution_title": metadata.get("constitution_title"),
+        "source": metadata.get("source", "Document"),
+        "article_id": metadata.get("article_id"),
+        "article_number": metadata.get("article_number"),
+        "title": metadata.get("article_title"),
+        "part": metadata.get("part"),
+        "section": metadata.get("section"),
+        "page": metadata.get("page_number", metadata.get("page", "N/A")),
+        "content": document.page_content
+    }
+
+
+def lexical_search(
+    query: str,
+    limit: int,
+    constitution_id: Optional[int] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Articles des constitutions actives classés par FTS5 (bm25), ou par le classement BM25 mémoire
+    si FTS5 n'est pas disponible ; utilise sa propre session (exécuté dans un thread du pool)
+    filters restreint aux articles d'une partie / section ({"part": ..., "section": ...})
+    """
+    from app.database import SessionLocal
+    from app.models.constitution import Constitution
+    from app.models.pdf_import import Article
+    from app.services.bm25_ranker import get_articles_ranker
+    from app.services.fts_search import search_articles
+
+    db = SessionLocal()
+    try:
+        active_query = db.query(Constitution.id).filter(Constitution.is_active == True)
+        if constitution_id is not None:
+            active_query = active_query.filter(Constitution.id == constitution_id)
+        active_ids = [row.id for row in active_query]
+        if not active_ids:
+            return []
+
+        # Termes alternatifs (OR) : bm25 classe d'abord les articles qui contiennent le plus de termes
+        hits = search_articles(db, query, constitution_id=constitution_id, limit=limit * 3, match_all=False)
+        if hits is not None:
+            article_ids = [hit["id"] for hit in hits]
+        else:
+            ranker = get_articles_ranker(db)
+            scored = []
+            for active_id in active_ids:
+                scored.extend(ranker.search(query, partition=active_id, top_k=limit))
+            scored.sort(key=lambda item: -item[1])
+            article_ids = [article_id for article_id, score in scored]
+        if not article_ids:
+            return []
+
+        rows_query = db.query(Article, Constitution.title, Constitution.filename).join(
+            Constitution, Constitution.id == Article.constitution_id
+        ).filter(
+            Article.id.in_(article_ids),
+            Article.constitution_id.in_(active_ids)
+        )
+        for field, value in (filters or {}).items():
+            rows_query = rows_query.filter(getattr(Article, field) == value)
+        rows = rows_query.all()
+        by_id = {article.id: (article, title, filename) for article, title, filename in rows}
+
+        results = []
+        for article_id in article_ids:
+            if article_id not in by_id:
+                continue
+            article, title, filename = by_id[article_id]
+            results.append({
+                "key": article_key(article.constitution_id, article.article_number, article.content or ""),
+                "constitution_id": article.constitution_id,
+                "constitution_title": title,
+                "source": filename or title,
+                "article_id": article.id,
+                "article_number": article.article_number,
+                "title": article.title,
+                "part": article.part,
+                "section": article.section,
+                "page": article.page_number or "N/A",
+                "content": f"Article {article.article_number}" + (f": {article.title}" if article.title else "")
+                           + f"\n\n{article.content or ''}"
+            })
+            if len(results) >= limit:
+                break
+        return results
+    finally:
+        db.close()
+
+
+class HybridRetriever:
+    """
+    vector_search(query, k, constitution_id, filters) retourne des Documents LangChain ;
+    la recherche lexicale interroge directement la base. Si l'une des deux échoue,
+    le classement de l'autre est utilisé seul
+    """
+
+    def __init__(
+        self,
+        vector_search: Callable[[str, int, Optional[int], Optional[Dict[str, Any]]], List[Any]],
+        lexical: Callable[[str, int, Optional[int], Optional[Dict[str, Any]]], List[Dict[str, Any]]] = lexical_search,
+        candidates: int = 10,
+        rrf_k: int = RRF_K,
+        max_workers: int = 8
+    ):
+        self.vector_search = vector_search
+        self.lexical = lexical
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hybrid-retrieval")
+        self._lock = threading.Lock()
+        self.stats = {"queries": 0, "vector_failures": 0, "lexical_failures": 0}
+
+    def _vector_hits(
+        self,
+        query: str,
+        k: int,
+        constitution_id: Optional[int],
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        return [_document_hit(document) for document in self.vector_search(query, k, constitution_id, filters)]
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        constitution_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k passages fusionnés ; chaque résultat porte son score RRF et ses rangs
+        ("vector", "lexical") pour le diagnostic
+        """
+        candidates = max(self.candidates, top_k)
+        filters = {field: value for field, value in (filters or {}).items() if value} or None
+        # Chaque recherche s'exécute dans une copie du contexte : la deadline de la requête borne aussi
+        # l'embedding de la question, l'initialisation de l'index et les appels faits dans le pool
+        vector_future = self._executor.submit(
+            contextvars.copy_context().run, self._vector_hits, query, candidates, constitution_id, filters
+        )
+        lexical_future = self._executor.submit(
+            contextvars.copy_context().run, self.lexical, query, candidates, constitution_id, filters
+        )
+
+        hits_by_source: Dict[str, List[Dict[str, Any]]] = {}
+        for name, future in (("vector", vector_future), ("lexical", lexical_future)):
+            try:
+                # Sous deadline, une recherche trop lente est ignorée : l'autre classement est utilisé seul
+                remaining = remaining_time()
+                timeout = max(0.0, remaining - _DEADLINE_MARGIN) if remaining is not None else None
+                hits_by_source[name] = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                logger.warning(f"⏱️ Recherche {name} ignorée : délai dépassé")
+                hits_by_source[name] = []
+                with self._lock:
+                    self.stats[f"{name}_failures"] += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Recherche {name} indisponible: {e}")
+                hits_by_source[name] = []
+                with self._lock:
+                    self.stats[f"{name}_failures"] += 1
+        with self._lock:
+            self.stats["queries"] += 1
+
+        # Premier passage rencontré par clé ; le texte complet de l'article (lexical) est préféré au chunk
+        hits: Dict[Hashable, Dict[str, Any]] = {}
+        for name in ("lexical", "vector"):
+            for hit in hits_by_source[name]:
+                hits.setdefault(hit["key"], hit)
+
+        fused = reciprocal_rank_fusion(
+            {name: [hit["key"] for hit in source_hits] for name, source_hits in hits_by_source.items()},
+            k=self.rrf_k
+        )
+        results = []
+        for key, score, ranks in fused[:top_k]:
+            result = dict(hits[key])
+            result["score"] = score
+            result["ranks"] = ranks
+            results.append(result)
+
+        logger.info(
+            f"🔀 Recherche hybride: {len(hits_by_source['vector'])} vectoriels + "
+            f"{len(hits_by_source['lexical'])} lexicaux → {len(results)} passages"
+        )
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
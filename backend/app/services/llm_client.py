@@ -0,0 +1,147 @@
+"""
+Clients OpenAI partagés par tout le processus
+Un seul pool de connexions HTTP (keep-alive) par worker au lieu d'un client par requête,
+et un sémaphore qui borne le nombre de complétions simultanées.
+Le SDK openai et httpx (longs à importer) ne sont chargés qu'à la création du premier client
+"""
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.deadline import request_timeout, wait_with_deadline
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+_async_client: Optional["AsyncOpenAI"] = None
+_sync_client: Optional["OpenAI"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_client_lock = threading.Lock()
+
+
+def _http_limits() -> "httpx.Limits":
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+    )
+
+
+def get_async_openai_client() -> "AsyncOpenAI":
+    """Client AsyncOpenAI du worker (créé au premier appel)"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                import httpx
+                from openai import AsyncOpenAI
+
+                _async_client = AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=settings.OPENAI_TIMEOUT,
+                    http_client=httpx.AsyncClient(limits=_http_limits(), timeout=settings.OPENAI_TIMEOUT)
+                )
+                logger.info("🔌 Client AsyncOpenAI partagé initialisé")
+    return _async_client
+
+
+def get_openai_client() -> "OpenAI":
+    """Client OpenAI synchrone partagé (scripts et chemins synchrones)"""
+    global _sync_client
+    if _sync_client is None:
+        with _client_lock:
+            if _sync_client is None:
+                import httpx
+                from openai import OpenAI
+
+                _sync_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=settings.OPENAI_TIMEOUT,
+                    http_client=httpx.Client(limits=_http_limits(), timeout=settings.OPENAI_TIMEOUT)
+                )
+    return _sync_client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def chat_completion(
+    messages: List[Dict],
+    model: str,
+    max_tokens: int,
+    temperature: float = 0.1,
+    **kwargs
+) -> str:
+    """
+    Complétion de chat sans bloquer la boucle d'événements
+    Au-delà de LLM_MAX_CONCURRENCY appels en cours, les requêtes attendent leur tour
+    """
+    client = get_async_openai_client()
+    # Borné par la deadline de la requête si elle est plus proche que OPENAI_TIMEOUT
+    kwargs.setdefault("timeout", request_timeout(settings.OPENAI_TIMEOUT))
+
+    async def call():
+        async with _get_semaphore():
+            return await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+
+    response = await wait_with_deadline(call(), stage="appel LLM")
+    return response.choices[0].message.content.strip()
+
+
+async def stream_chat_completion(
+    messages: List[Dict],
+    model: str,
+    max_tokens: int,
+    temperature: float = 0.1,
+    **kwargs
+) -> AsyncIterator[str]:
+    """
+    Complétion en streaming : produit les fragments de texte au fil de leur arrivée
+    L'emplacement du sémaphore est conservé jusqu'à la fin du flux
+    """
+    client = get_async_openai_client()
+    kwargs.setdefault("timeout", request_timeout(settings.OPENAI_TIMEOUT))
+    async with _get_semaphore():
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            **kwargs
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+async def close_openai_clients():
+    """Ferme les pools HTTP (arrêt de l'application)"""
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
@@ -1,25 +1,26 @@
 import os
 import time
-import signal
 import hashlib
 import json
-from typing import List, Dict, Any, Tuple, Optional
+import asyncio
+import fcntl
+import threading
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterable, List, Dict, Any, Tuple, Optional
 from sqlalchemy.orm import Session
 from app.models.constitution import Constitution
-import openai
 import re
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_openai import ChatOpenAI
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-import numpy as np
 import logging
 from app.services.monitoring_service import monitoring_service
 from app.core.config import settings
+from app.services.deadline import DeadlineExceeded, Deadline, deadline_scope, request_timeout, run_with_deadline
+from app.services.hybrid_retriever import HybridRetriever
+from app.services.llm_client import get_openai_client
+from app.services.response_cache import LRUTTLCache
+from app.services.semantic_cache import get_semantic_cache
+from app.services.shared_cache import get_response_cache
+from app.services.single_flight import SingleFlight, flight_key
 import random
 
 load_dotenv()
@@ -28,6 +29,29 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prompt de la chaîne RAG, partagé par le mode streaming
+RAG_PROMPT_TEMPLATE = """Tu es ConstitutionIA, assistant spécialisé dans l'analyse des constitutions de la Guinée.
+
+CONTEXTE:
+{context}
+
+QUESTION: {question}
+
+INSTRUCTIONS:
+1. Réponds UNIQUEMENT basé sur le contexte fourni
+2. Cite spécifiquement les articles pertinents
+3. Sois concis (max 200 mots)
+4. Si l'information n'est pas dans le contexte, dis-le clairement
+5. Utilise un langage juridique accessible
+
+RÉPONSE:"""
+
+# Fichier décrivant le modèle d'embeddings d'un index FAISS persistant
+INDEX_METADATA_FILE = "index_meta.json"
+
+# Réponses de repli après un échec RAG, jamais mises en cache (L1, L2 partagé, cache sémantique)
+UNCACHEABLE_METHODS = frozenset({"rag_timeout", "rag_error", "rag_quota_error"})
+
 # Instance singleton du service optimisé
 _optimized_service_instance = None
 
@@ -38,6 +62,22 @@ def get_optimized_ai_service():
         _optimized_service_instance = OptimizedAIService()
     return _optimized_service_instance
 
+def update_vector_index(added: Iterable[int] = (), removed: Iterable[int] = ()) -> bool:
+    """
+    Mise à jour incrémentale de l'index vectoriel après un import, une suppression ou une réactivation
+    Un échec est journalisé sans interrompre l'opération appelante
+    """
+    try:
+        service = get_optimized_ai_service()
+        for constitution_id in removed:
+            service.remove_constitution(constitution_id)
+        for constitution_id in added:
+            service.index_constitution(constitution_id)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Échec de la mise à jour de l'index vectoriel: {e}")
+        return False
+
 class OptimizedAIService:
     """
     Service IA optimisé avec cache, fallback intelligent et RAG simplifié
@@ -53,9 +93,19 @@ class OptimizedAIService:
 
         logger.info(f"✅ Clé API chargée: {'OUI' if self.openai_api_key else 'NON'}")
 
-        # Cache en mémoire pour les réponses
-        self.response_cache = {}
-        self.embedding_cache = {}
+        # Caches mémoire bornés (LRU + TTL), partagés par les threads du threadpool FastAPI
+        self.cache_ttl = settings.AI_CACHE_TTL_SECONDS
+        # Réponses : L1 mémoire du worker + L2 partagé par tous les workers (cf. shared_cache)
+        self.response_cache = get_response_cache("copilot")
+        self.embedding_cache = LRUTTLCache(
+            "embeddings",
+            max_entries=settings.AI_EMBEDDING_CACHE_MAX_ENTRIES,
+            max_bytes=settings.AI_EMBEDDING_CACHE_MAX_BYTES,
+            ttl=self.cache_ttl
+        )
+        self.semantic_cache_scope = "copilot"
+        # Questions identiques en cours de génération (threads du threadpool FastAPI)
+        self.response_flights = SingleFlight()
 
         # Mémoire de conversation améliorée pour multi-utilisateurs
         self.conversation_memory = {}
@@ -67,11 +117,10 @@ class OptimizedAIService:
         self.chunk_size = 2000  # Chunks plus gros
         self.chunk_overlap = 100  # Moins d'overlap
         self.max_chunks = 2  # Moins de chunks
-        self.timeout_seconds = 5  # Timeout plus court
+        self.timeout_seconds = settings.AI_REQUEST_TIMEOUT_SECONDS  # Budget de temps d'une requête
 
         # Seuils pour décider de la méthode
         self.simple_query_threshold = 3  # Mots pour requête simple
-        self.cache_ttl = 3600  # 1 heure de cache
 
         # Types de questions avec détection améliorée
         self.question_types = {
@@ -97,6 +146,7 @@ class OptimizedAIService:
         }
 
         # Initialiser les composants IA (lazy loading)
+        self.embedding_backend = None
         self.embeddings = None
         self.llm = None
         self.vector_db = None
@@ -105,6 +155,22 @@ class OptimizedAIService:
         
         # Chemin pour persister la base vectorielle
         self.vector_db_path = "vector_db_cache"
+        # Sérialise les mises à jour de l'index (upload, suppression, rafraîchissement) entre threads ;
+        # _index_file_lock les sérialise entre workers
+        self._index_lock = threading.RLock()
+        # Révision de l'index sur disque dont la copie FAISS en mémoire est issue
+        self._loaded_revision: Optional[str] = None
+        # Profondeur de _index_file_lock dans ce processus (le verrou fichier n'est pris qu'une fois)
+        self._file_lock_depth = 0
+        
+        # Recherche FAISS + mots-clés en parallèle, fusionnée par RRF
+        self.retriever = HybridRetriever(self._vector_search)
+        # Sous-index FAISS par constitution (chat sur un document précis)
+        self.constitution_indexes: Dict[int, Any] = {}
+        # Construction d'un sous-index : verrou par constitution (hors _index_lock, les embeddings
+        # peuvent appeler le modèle) et époque incrémentée à chaque invalidation
+        self._constitution_index_locks: Dict[int, threading.Lock] = {}
+        self._constitution_index_epoch = 0
 
     def _get_cache_key(self, query: str) -> str:
         """Génère une clé de cache pour une requête"""
@@ -112,30 +178,24 @@ class OptimizedAIService:
 
     def _get_cached_response(self, query: str) -> Optional[Dict[str, Any]]:
         """Récupère une réponse du cache"""
-        cache_key = self._get_cache_key(query)
-        cached = self.response_cache.get(cache_key)
-
-        if cached and time.time() - cached.get('timestamp', 0) < self.cache_ttl:
+        cached = self.response_cache.get(self._get_cache_key(query))
+        if cached is not None:
             logger.info(f"Cache hit pour: {query[:50]}...")
-            # Incrémenter les hits
-            if not hasattr(self, 'cache_hits'):
-                self.cache_hits = 0
-            self.cache_hits += 1
-            return cached['response']
-
-        # Incrémenter les misses
-        if not hasattr(self, 'cache_misses'):
-            self.cache_misses = 0
-        self.cache_misses += 1
-        return None
+            return cached
+
+        # Question reformulée : réponse d'une question proche déjà traitée
+        match = get_semantic_cache().lookup(query, self.semantic_cache_scope)
+        return match[0] if match else None
 
     def _cache_response(self, query: str, response: Dict[str, Any]):
-        """Met en cache une réponse"""
-        cache_key = self._get_cache_key(query)
-        self.response_cache[cache_key] = {
-            'response': response,
-            'timestamp': time.time()
-        }
+        """
+        Met en cache une réponse, sauf réponse partielle (interrompue par le délai) ou message d'erreur
+        RAG (délai, quota, panne) : ces échecs sont transitoires et ne doivent pas être servis à nouveau
+        """
+        if response.get("partial") or response.get("method") in UNCACHEABLE_METHODS:
+            return
+        self.response_cache.set(self._get_cache_key(query), response)
+        get_semantic_cache().store(query, response, self.semantic_cache_scope, ttl=self.cache_ttl)
         logger.info(f"Réponse mise en cache: {query[:50]}...")
 
     def _is_simple_query(self, query: str) -> bool:
@@ -267,8 +327,36 @@ class OptimizedAIService:
             "suggestions": reformulation_suggestions['suggestions']
         }
 
-    def _initialize_rag_lazy(self):
-        """Initialise le RAG seulement si nécessaire (lazy loading)"""
+    def _init_embeddings(self) -> bool:
+        """Initialise le modèle d'embeddings (partagé par la construction et la mise à jour de l'index)"""
+        if self.embeddings:
+            return True
+        logger.info("📡 Initialisation des embeddings...")
+        try:
+            # Pile LangChain importée au premier usage : les workers CRUD ne la chargent jamais
+            from app.services.embedding_backends import get_embedding_backend
+            from app.services.embedding_store import CachedEmbeddings, get_embedding_store
+
+            # Backend choisi par Settings.EMBEDDING_BACKEND (OpenAI ou modèle local CPU)
+            self.embedding_backend = get_embedding_backend()
+            # Embeddings persistés par hash du chunk : seuls les chunks nouveaux ou modifiés sont calculés
+            self.embeddings = CachedEmbeddings(
+                self.embedding_backend,
+                get_embedding_store(),
+                model_name=self.embedding_backend.name,
+                query_cache=self.embedding_cache
+            )
+            logger.info(f"✅ Embeddings initialisés ({self.embedding_backend.name})")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur embeddings: {e}")
+            return False
+
+    def _initialize_rag_lazy(self, build_local: bool = False):
+        """
+        Initialise le RAG seulement si nécessaire (lazy loading)
+        build_local : charge ou construit l'index FAISS de ce worker même si un index partagé existe
+        """
         if self.is_initialized:
             logger.info("✅ RAG déjà initialisé")
             return True
@@ -283,18 +371,14 @@ class OptimizedAIService:
                 return False
 
             # Initialiser les composants seulement si nécessaire
-            if not self.embeddings:
-                logger.info("📡 Initialisation des embeddings...")
-                try:
-                    self.embeddings = OpenAIEmbeddings(openai_api_key=self.openai_api_key)
-                    logger.info("✅ Embeddings initialisés")
-                except Exception as e:
-                    logger.error(f"❌ Erreur embeddings: {e}")
-                    return False
+            if not self._init_embeddings():
+                return False
 
             if not self.llm:
                 logger.info("🤖 Initialisation du LLM...")
                 try:
+                    from langchain_openai import ChatOpenAI
+
                     self.llm = ChatOpenAI(
                         model_name="gpt-3.5-turbo", 
                         temperature=0.1,
@@ -306,61 +390,25 @@ class OptimizedAIService:
                     logger.error(f"❌ Erreur LLM: {e}")
                     return False
 
-            # Charger ou créer la base vectorielle
-            if not self.vector_db:
+            # Charger ou créer la base vectorielle ; un worker en lecture seule utilise l'index partagé (mmap)
+            # publié par un autre worker sans charger sa propre copie FAISS. Un rafraîchissement
+            # (build_local) construit toujours la copie locale pour publier une nouvelle génération
+            if not build_local and not self.vector_db and self._shared_index() is not None:
+                logger.info("🗺️ Index partagé (mmap) utilisé, FAISS non chargé dans ce worker")
+            elif not self.vector_db:
                 # Essayer de charger la base vectorielle persistante
                 if self._load_vector_db_from_cache():
                     logger.info("✅ Base vectorielle chargée depuis le cache")
-                else:
-                    logger.info("📚 Création d'une nouvelle base vectorielle...")
-                    pdf_docs = self._load_pdf_documents()
-                    if not pdf_docs:
-                        logger.warning("❌ Aucun document trouvé")
-                        return False
-
-                    logger.info(f"📄 {len(pdf_docs)} documents chargés")
-
-                    # Découper avec paramètres optimisés
-                    text_splitter = RecursiveCharacterTextSplitter(
-                        chunk_size=self.chunk_size,
-                        chunk_overlap=self.chunk_overlap,
-                        length_function=len,
-                        separators=["\n\n", "\n", ". ", " ", ""]
-                    )
-                    docs = text_splitter.split_documents(pdf_docs)
-                    logger.info(f"📄 {len(docs)} chunks créés (optimisé)")
-
-                    # Créer la base vectorielle
-                    logger.info("🔍 Création de la base vectorielle FAISS...")
-                    try:
-                        self.vector_db = FAISS.from_documents(docs, self.embeddings)
-                        logger.info("✅ Base vectorielle FAISS créée")
-                        
-                        # Sauvegarder la base vectorielle
-                        self._save_vector_db_to_cache()
-                        logger.info("💾 Base vectorielle sauvegardée")
-                    except Exception as e:
-                        logger.error(f"❌ Erreur FAISS: {e}")
-                        return False
+                elif not self._build_vector_db():
+                    return False
 
                 # Créer la chaîne RAG optimisée
+                from langchain.chains import RetrievalQA
+                from langchain.prompts import PromptTemplate
+
                 custom_prompt = PromptTemplate(
                     input_variables=["context", "question"],
-                    template="""Tu es ConstitutionIA, assistant spécialisé dans l'analyse des constitutions de la Guinée.
-
-CONTEXTE:
-{context}
-
-QUESTION: {question}
-
-INSTRUCTIONS:
-1. Réponds UNIQUEMENT basé sur le contexte fourni
-2. Cite spécifiquement les articles pertinents
-3. Sois concis (max 200 mots)
-4. Si l'information n'est pas dans le contexte, dis-le clairement
-5. Utilise un langage juridique accessible
-
-RÉPONSE:"""
+                    template=RAG_PROMPT_TEMPLATE
                 )
 
                 try:
@@ -390,8 +438,41 @@ RÉPONSE:"""
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
             return False
 
-    def _load_pdf_documents(self, folder_path: str = "Fichier/") -> List:
-        """Charge les documents depuis la base de données au lieu des fichiers PDF"""
+    def _build_vector_db(self) -> bool:
+        """Construit l'index FAISS complet des constitutions actives, le sauvegarde et le publie"""
+        logger.info("📚 Création d'une nouvelle base vectorielle...")
+        pdf_docs = self._load_pdf_documents()
+        if not pdf_docs:
+            logger.warning("❌ Aucun document trouvé")
+            return False
+
+        logger.info(f"📄 {len(pdf_docs)} documents chargés")
+
+        # Découper avec paramètres optimisés
+        docs, ids = self._split_into_chunks(pdf_docs)
+        logger.info(f"📄 {len(docs)} chunks créés (optimisé)")
+
+        # Créer la base vectorielle
+        logger.info("🔍 Création de la base vectorielle FAISS...")
+        try:
+            from langchain_community.vectorstores import FAISS
+
+            self.vector_db = FAISS.from_documents(docs, self.embeddings, ids=ids)
+            logger.info("✅ Base vectorielle FAISS créée")
+
+            # Sauvegarder la base vectorielle (publie aussi la génération partagée)
+            self._save_vector_db_to_cache()
+            logger.info("💾 Base vectorielle sauvegardée")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur FAISS: {e}")
+            return False
+
+    def _load_pdf_documents(self, folder_path: str = "Fichier/", constitution_ids: Optional[List[int]] = None) -> List:
+        """
+        Charge les documents depuis la base de données au lieu des fichiers PDF
+        constitution_ids restreint le chargement à certaines constitutions actives (mise à jour incrémentale)
+        """
         from app.database import SessionLocal
         from app.models.constitution import Constitution
         from app.models.pdf_import import Article
@@ -404,7 +485,10 @@ RÉPONSE:"""
             logger.info("📚 Chargement des documents depuis la base de données...")
             
             # Récupérer toutes les constitutions avec leurs articles
-            constitutions = db.query(Constitution).filter(Constitution.is_active == True).all()
+            query = db.query(Constitution).filter(Constitution.is_active == True)
+            if constitution_ids is not None:
+                query = query.filter(Constitution.id.in_(constitution_ids))
+            constitutions = query.all()
             
             if not constitutions:
                 logger.warning("❌ Aucune constitution active trouvée en base de données")
@@ -442,6 +526,7 @@ RÉPONSE:"""
                             'source': constitution.filename,
                             'constitution_id': constitution.id,
                             'constitution_title': constitution.title,
+                            'article_id': article.id,
                             'article_number': article.article_number,
                             'article_title': article.title,
                             'part': article.part,
@@ -455,7 +540,7 @@ RÉPONSE:"""
             logger.info(f"✅ {len(documents)} documents créés depuis la base de données")
             
             # Si aucun document n'a été créé, essayer de charger depuis les fichiers PDF comme fallback
-            if not documents:
+            if not documents and constitution_ids is None:
                 logger.warning("⚠️ Aucun document créé depuis la base, tentative de chargement depuis les fichiers PDF...")
                 documents = self._load_pdf_documents_fallback(folder_path)
             
@@ -463,6 +548,8 @@ RÉPONSE:"""
             
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement depuis la base de données: {str(e)}")
+            if constitution_ids is not None:
+                raise
             logger.warning("⚠️ Fallback vers le chargement depuis les fichiers PDF...")
             return self._load_pdf_documents_fallback(folder_path)
         finally:
@@ -485,6 +572,8 @@ RÉPONSE:"""
                 file_path = os.path.join(folder_path, filename)
                 logger.info(f"📖 Chargement de: {filename}")
                 
+                from langchain_community.document_loaders import PyPDFLoader
+
                 loader = PyPDFLoader(file_path)
                 docs = loader.load()
 
@@ -504,50 +593,223 @@ RÉPONSE:"""
         return documents
 
     def _save_vector_db_to_cache(self):
-        """Sauvegarde la base vectorielle dans le cache"""
+        """
+        Sauvegarde la base vectorielle dans le cache
+        Écriture dans un dossier temporaire puis échange par renommage : un arrêt pendant
+        la sauvegarde ne laisse jamais un index à moitié écrit dans vector_db_path
+        """
+        import shutil
+        if not self.vector_db:
+            return
+        suffix = f"{os.getpid()}-{int(time.time() * 1000)}"
+        tmp_path = f"{self.vector_db_path}.tmp-{suffix}"
+        old_path = f"{self.vector_db_path}.old-{suffix}"
         try:
-            if self.vector_db and os.path.exists(self.vector_db_path):
-                import shutil
-                shutil.rmtree(self.vector_db_path)
-            
-            if self.vector_db:
-                self.vector_db.save_local(self.vector_db_path)
+            with self._index_file_lock():
+                self.vector_db.save_local(tmp_path)
+                revision = self._write_index_metadata(tmp_path)
+                if os.path.exists(self.vector_db_path):
+                    os.rename(self.vector_db_path, old_path)
+                os.rename(tmp_path, self.vector_db_path)
+                self._loaded_revision = revision
+                shutil.rmtree(old_path, ignore_errors=True)
                 logger.info(f"💾 Base vectorielle sauvegardée dans {self.vector_db_path}")
+                self._publish_shared_index()
         except Exception as e:
             logger.error(f"❌ Erreur lors de la sauvegarde de la base vectorielle: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if os.path.exists(old_path) and not os.path.exists(self.vector_db_path):
+                os.rename(old_path, self.vector_db_path)
+
+    def _recover_vector_db_cache(self):
+        """Restaure la dernière sauvegarde complète si un échange a été interrompu"""
+        import glob
+        if os.path.exists(self.vector_db_path):
+            return
+        previous = sorted(glob.glob(f"{self.vector_db_path}.old-*"), key=os.path.getmtime)
+        if previous:
+            os.rename(previous[-1], self.vector_db_path)
+            logger.warning(f"⚠️ Base vectorielle restaurée depuis {previous[-1]}")
+
+    def _write_index_metadata(self, path: str) -> str:
+        """
+        Décrit avec l'index le modèle d'embeddings qui l'a construit
+        Retourne la révision écrite, unique par sauvegarde (saved_at n'a qu'une précision d'une seconde)
+        """
+        revision = f"{time.time_ns()}-{os.getpid()}"
+        metadata = {
+            **self.embedding_backend.describe(),
+            "embedding_model": self.embedding_backend.name,
+            "dimension": self.vector_db.index.d,
+            "chunks": self.vector_db.index.ntotal,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": revision
+        }
+        with open(os.path.join(path, INDEX_METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        return revision
+
+    def _read_index_metadata(self) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.vector_db_path, INDEX_METADATA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _index_matches_backend(self) -> bool:
+        """Un index construit avec un autre modèle n'est pas réutilisable (dimensions et espace différents)"""
+        metadata = self._read_index_metadata()
+        if metadata is None:
+            # Index antérieur aux métadonnées : construit avec OpenAIEmbeddings
+            return self.embedding_backend.backend == "openai"
+        if metadata.get("embedding_model") != self.embedding_backend.name:
+            logger.warning(
+                f"⚠️ Index construit avec {metadata.get('embedding_model')}, backend actuel "
+                f"{self.embedding_backend.name} : reconstruction nécessaire"
+            )
+            return False
+        return True
 
     def _load_vector_db_from_cache(self):
-        """Charge la base vectorielle depuis le cache"""
+        """
+        Charge la base vectorielle depuis le cache ; lecture et publication sous _index_file_lock,
+        pour qu'une sauvegarde d'un autre worker ne s'intercale pas entre les deux
+        """
         try:
-            if os.path.exists(self.vector_db_path) and self.embeddings:
+            with self._index_file_lock():
+                self._recover_vector_db_cache()
+                if not (os.path.exists(self.vector_db_path) and self.embeddings):
+                    logger.info("📂 Aucune base vectorielle en cache trouvée")
+                    return False
+                if not self._index_matches_backend():
+                    return False
+                from langchain_community.vectorstores import FAISS
+
+                metadata = self._read_index_metadata() or {}
                 self.vector_db = FAISS.load_local(self.vector_db_path, self.embeddings)
+                self._loaded_revision = metadata.get("revision")
                 logger.info(f"📂 Base vectorielle chargée depuis {self.vector_db_path}")
+                if self._shared_index() is None:
+                    self._publish_shared_index()
                 return True
-            else:
-                logger.info("📂 Aucune base vectorielle en cache trouvée")
-                return False
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement de la base vectorielle: {e}")
             return False
 
+    def _shared_index(self):
+        """Génération courante de l'index partagé, si elle a été construite avec le backend d'embeddings actuel"""
+        from app.services.shared_index import get_shared_index
+
+        if not settings.SHARED_INDEX_ENABLED or not self._init_embeddings():
+            return None
+        index = get_shared_index()
+        if index is None or index.embedding_model != self.embedding_backend.name:
+            return None
+        return index
+
+    def _publish_shared_index(self):
+        """
+        Publie l'index FAISS de ce worker (vecteurs, chunks) et les postings BM25 des articles
+        comme nouvelle génération mmap, lue par tous les workers ; appelé sous _index_file_lock.
+        La génération porte la révision FAISS : une copie plus ancienne que CURRENT n'est pas publiée
+        """
+        if not settings.SHARED_INDEX_ENABLED or not self.vector_db:
+            return
+        try:
+            from app.database import SessionLocal
+            from app.services.bm25_ranker import build_articles_ranker
+            from app.services.shared_index import publish_generation, reset_shared_index_check
+
+            with self._index_lock:
+                total = self.vector_db.index.ntotal
+                vectors = self.vector_db.index.reconstruct_n(0, total) if total else []
+                documents = [
+                    self.vector_db.docstore.search(self.vector_db.index_to_docstore_id[position])
+                    for position in range(total)
+                ]
+            db = SessionLocal()
+            try:
+                ranker = build_articles_ranker(db)
+            finally:
+                db.close()
+            publish_generation(
+                vectors,
+                [document.page_content for document in documents],
+                [dict(document.metadata or {}) for document in documents],
+                embedding_model=self.embedding_backend.name,
+                ranker=ranker,
+                revision=self._loaded_revision
+            )
+            reset_shared_index_check()
+        except Exception as e:
+            logger.error(f"❌ Publication de l'index partagé impossible: {e}")
+
+    def has_vector_index(self) -> bool:
+        """Index vectoriel disponible dans ce worker (copie FAISS ou index partagé mappé)"""
+        return self.vector_db is not None or self._shared_index() is not None
+
+    @contextmanager
+    def _index_file_lock(self):
+        """
+        Verrou fichier (flock) des écritures de l'index sur disque et de sa publication partagée, commun
+        à tous les workers ; prend aussi _index_lock et peut être imbriqué (sauvegarde pendant une mise à jour)
+        """
+        with self._index_lock:
+            if self._file_lock_depth:
+                self._file_lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+                return
+            lock_path = f"{self.vector_db_path}.lock"
+            directory = os.path.dirname(lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(lock_path, "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                self._file_lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth = 0
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _disk_index_is_newer(self) -> bool:
+        """Un autre worker a sauvegardé l'index depuis que la copie en mémoire a été chargée ou écrite"""
+        try:
+            metadata = self._read_index_metadata()
+        except (OSError, ValueError):
+            return False
+        return metadata is not None and metadata.get("revision") != self._loaded_revision
+
     def refresh_vector_db(self):
         """Force le rafraîchissement de la base vectorielle"""
+        with self._index_file_lock():
+            return self._refresh_vector_db()
+
+    def _refresh_vector_db(self):
         try:
             logger.info("🔄 Rafraîchissement de la base vectorielle...")
             
-            # Supprimer l'ancienne base vectorielle
+            # Supprimer l'ancienne base vectorielle ; les embeddings des chunks inchangés
+            # sont relus depuis le store persistant au lieu d'être recalculés
             if os.path.exists(self.vector_db_path):
                 import shutil
                 shutil.rmtree(self.vector_db_path)
                 logger.info("🗑️ Ancienne base vectorielle supprimée")
             
             # Réinitialiser les composants
+            self._invalidate_constitution_indexes()
             self.vector_db = None
             self.qa_chain = None
             self.is_initialized = False
             
-            # Recréer la base vectorielle
-            success = self._initialize_rag_lazy()
+            # Recréer la base vectorielle dans ce worker, même si un index partagé est publié :
+            # c'est elle qui devient la nouvelle génération
+            success = self._initialize_rag_lazy(build_local=True)
             if success:
                 logger.info("✅ Base vectorielle rafraîchie avec succès")
             else:
@@ -558,6 +820,241 @@ RÉPONSE:"""
             logger.error(f"❌ Erreur lors du rafraîchissement: {e}")
             return False
 
+    def _split_into_chunks(self, documents: List) -> Tuple[List, List[str]]:
+        """
+        Découpe les documents en chunks ; chaque chunk d'article reçoit un id stable
+        "c{constitution}-a{article}-{n}" qui permet de le retrouver pour une mise à jour incrémentale
+        """
+        import uuid
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+        chunks = text_splitter.split_documents(documents)
+        ids = []
+        positions: Dict[Tuple[Any, Any], int] = {}
+        for chunk in chunks:
+            constitution_id = chunk.metadata.get("constitution_id")
+            article_id = chunk.metadata.get("article_id")
+            if constitution_id is None or article_id is None:
+                ids.append(str(uuid.uuid4()))
+                continue
+            position = positions.get((constitution_id, article_id), 0)
+            positions[(constitution_id, article_id)] = position + 1
+            ids.append(f"c{constitution_id}-a{article_id}-{position}")
+        return chunks, ids
+
+    def _ensure_vector_db_loaded(self) -> bool:
+        """
+        Index FAISS en mémoire, chargé depuis le disque si nécessaire ; sans index sur disque
+        (ou avec un index d'un autre modèle), il est construit en entier et publié.
+        Une copie en mémoire plus ancienne que l'index sur disque est rechargée : une mise à jour
+        appliquée par un autre worker n'est pas écrasée. À appeler sous _index_file_lock
+        """
+        self._recover_vector_db_cache()
+        if self.vector_db and not self._disk_index_is_newer():
+            return True
+        if self.vector_db:
+            logger.info("🔄 Index vectoriel modifié par un autre worker : rechargement depuis le disque")
+            self.vector_db = None
+        if not self._init_embeddings():
+            return False
+        return self._load_vector_db_from_cache() or self._build_vector_db()
+
+    def _constitution_chunk_ids(self, constitution_id: int) -> List[str]:
+        """Ids des chunks d'une constitution (métadonnées, pour couvrir aussi les index construits sans ids stables)"""
+        chunk_ids = []
+        for docstore_id in self.vector_db.index_to_docstore_id.values():
+            document = self.vector_db.docstore.search(docstore_id)
+            if getattr(document, "metadata", {}).get("constitution_id") == constitution_id:
+                chunk_ids.append(docstore_id)
+        return chunk_ids
+
+    def _remove_constitution_chunks(self, constitution_id: int) -> int:
+        chunk_ids = self._constitution_chunk_ids(constitution_id)
+        if chunk_ids:
+            self.vector_db.delete(chunk_ids)
+        return len(chunk_ids)
+
+    def _after_index_update(self):
+        """Les réponses en cache peuvent citer des articles qui ont changé"""
+        self.response_cache.clear()
+        get_semantic_cache().clear(self.semantic_cache_scope)
+        self._save_vector_db_to_cache()
+
+    def index_constitution(self, constitution_id: int) -> Dict[str, Any]:
+        """
+        Ajoute (ou remplace) les vecteurs des articles d'une constitution active sans reconstruire l'index ;
+        seuls les chunks absents du store d'embeddings sont calculés
+        """
+        with self._index_file_lock():
+            self._invalidate_constitution_indexes(constitution_id)
+            if not self._ensure_vector_db_loaded():
+                logger.info("📂 Pas encore d'index vectoriel : il sera construit à la première recherche")
+                return {"indexed": False, "added": 0, "removed": 0}
+
+            documents = self._load_pdf_documents(constitution_ids=[constitution_id])
+            chunks, ids = self._split_into_chunks(documents)
+            removed = self._remove_constitution_chunks(constitution_id)
+            if chunks:
+                self.vector_db.add_documents(chunks, ids=ids)
+            self._invalidate_constitution_indexes(constitution_id)
+            self._after_index_update()
+
+        logger.info(f"✅ Index vectoriel mis à jour pour la constitution {constitution_id}: +{len(chunks)} / -{removed} chunks")
+        return {"indexed": True, "added": len(chunks), "removed": removed}
+
+    def remove_constitution(self, constitution_id: int) -> Dict[str, Any]:
+        """Retire de l'index les vecteurs d'une constitution supprimée ou désactivée"""
+        with self._index_file_lock():
+            self._invalidate_constitution_indexes(constitution_id)
+            if not self._ensure_vector_db_loaded():
+                return {"indexed": False, "removed": 0}
+            removed = self._remove_constitution_chunks(constitution_id)
+            if removed:
+                self._after_index_update()
+
+        logger.info(f"🗑️ Index vectoriel: {removed} chunks retirés pour la constitution {constitution_id}")
+        return {"indexed": True, "removed": removed}
+
+    def _constitution_index(self, constitution_id: int):
+        """
+        Sous-index FAISS d'une seule constitution, construit à la première question la concernant ;
+        les vecteurs viennent du store d'embeddings (aucun appel au modèle pour des articles déjà indexés)
+        """
+        index = self.constitution_indexes.get(constitution_id)
+        if index is not None:
+            return index
+        with self._index_lock:
+            build_lock = self._constitution_index_locks.setdefault(constitution_id, threading.Lock())
+        # Construction hors de _index_lock : sauvegardes, publications et autres constitutions ne l'attendent pas ;
+        # seules les questions sur la même constitution attendent le premier constructeur
+        with build_lock:
+            with self._index_lock:
+                if constitution_id in self.constitution_indexes:
+                    return self.constitution_indexes[constitution_id]
+                epoch = self._constitution_index_epoch
+            if not self._init_embeddings():
+                return None
+            documents = self._load_pdf_documents(constitution_ids=[constitution_id])
+            chunks, ids = self._split_into_chunks(documents)
+            if not chunks:
+                return None
+            from langchain_community.vectorstores import FAISS
+
+            index = FAISS.from_documents(chunks, self.embeddings, ids=ids)
+            with self._index_lock:
+                # Articles modifiés pendant la construction : l'index sert cette question sans être conservé
+                if epoch == self._constitution_index_epoch:
+                    self.constitution_indexes[constitution_id] = index
+            logger.info(f"🗂️ Sous-index FAISS de la constitution {constitution_id}: {len(chunks)} chunks")
+            return index
+
+    def _invalidate_constitution_indexes(self, constitution_id: Optional[int] = None):
+        """Oublie un sous-index (ou tous) ; une construction en cours ne sera pas conservée"""
+        with self._index_lock:
+            if constitution_id is None:
+                self.constitution_indexes.clear()
+            else:
+                self.constitution_indexes.pop(constitution_id, None)
+            self._constitution_index_epoch += 1
+
+    def search_constitution(
+        self,
+        query: str,
+        constitution_id: int,
+        k: int = 5,
+        part: Optional[str] = None,
+        section: Optional[str] = None
+    ) -> List:
+        """Recherche vectorielle limitée à une constitution, éventuellement à une partie / section"""
+        index = self._constitution_index(constitution_id)
+        if index is None:
+            return []
+        metadata_filter = {field: value for field, value in (("part", part), ("section", section)) if value}
+        if metadata_filter:
+            # Filtrage sur les métadonnées des fetch_k plus proches voisins du sous-index
+            return index.similarity_search(query, k=k, filter=metadata_filter, fetch_k=max(k * 10, 50))
+        return index.similarity_search(query, k=k)
+
+    def _vector_search(
+        self,
+        query: str,
+        k: int,
+        constitution_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List:
+        """Passages FAISS les plus proches (liste vide si l'index vectoriel n'est pas disponible)"""
+        shared = self._shared_index()
+        if shared is not None:
+            # Recherche exacte dans les vecteurs mappés, communs à tous les workers
+            return shared.similarity_search_by_vector(
+                self.embeddings.embed_query(query), k=k, constitution_id=constitution_id, filters=filters
+            )
+        if constitution_id is not None:
+            return self.search_constitution(query, constitution_id, k=k, **(filters or {}))
+        if not self._initialize_rag_lazy() or not self.vector_db:
+            return []
+        if filters:
+            return self.vector_db.similarity_search(query, k=k, filter=filters, fetch_k=max(k * 10, 50))
+        return self.vector_db.similarity_search(query, k=k)
+
+    def hybrid_search(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        constitution_id: Optional[int] = None,
+        part: Optional[str] = None,
+        section: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Passages fusionnés (vectoriel + mots-clés), un par article ; filtrables par constitution, partie et section"""
+        return self.retriever.retrieve(
+            query,
+            top_k=top_k or self.max_chunks,
+            constitution_id=constitution_id,
+            filters={"part": part, "section": section}
+        )
+
+    def _sources_from_hits(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{
+            "title": hit.get("constitution_title") or hit.get("source", "Document"),
+            "article_number": hit.get("article_number"),
+            "content": hit["content"][:200] + "...",
+            "page": hit.get("page", "N/A"),
+            "score": hit.get("score")
+        } for hit in hits]
+
+    def _rag_prompt_from_hits(self, query: str, hits: List[Dict[str, Any]]) -> str:
+        return RAG_PROMPT_TEMPLATE.format(
+            context="\n\n".join(hit["content"] for hit in hits),
+            question=query
+        )
+
+    def _partial_rag_response(self, hits: List[Dict[str, Any]], answer_start: str = "") -> Dict[str, Any]:
+        """
+        Réponse partielle quand la recherche a abouti mais que la génération dépasse le budget :
+        le début de réponse éventuel, puis les passages trouvés (non mise en cache)
+        """
+        excerpts = "\n\n".join(
+            f"• Article {hit.get('article_number') or '?'} : {hit['content'][:300].strip()}..."
+            for hit in hits
+        )
+        if answer_start:
+            answer = f"{answer_start.rstrip()}…\n\n(Réponse interrompue : délai dépassé.) Passages consultés :\n\n{excerpts}"
+        else:
+            answer = f"La génération de la réponse a dépassé le délai imparti. Voici les passages les plus pertinents :\n\n{excerpts}"
+        return {
+            "answer": answer,
+            "sources": self._sources_from_hits(hits),
+            "confidence": 0.4,
+            "method": "rag_partial",
+            "partial": True
+        }
+
     def _rag_search_optimized(self, query: str) -> Dict[str, Any]:
         """Recherche RAG optimisée avec timeout et gestion d'erreurs"""
         logger.info(f"🔍 Vérification RAG - is_initialized: {self.is_initialized}")
@@ -571,54 +1068,56 @@ RÉPONSE:"""
             logger.warning("❌ RAG non initialisé - tentative d'initialisation...")
             init_success = self._initialize_rag_lazy()
             logger.info(f"🔄 Résultat initialisation: {init_success}")
-            
             if not init_success:
-                return {
-                    "answer": "Système RAG non disponible. Utilisation du mode fallback.",
-                    "sources": [],
-                    "confidence": 0.0,
-                    "method": "rag_unavailable"
-                }
+                # Index vectoriel indisponible : la recherche hybride se limite aux mots-clés
+                logger.warning("⚠️ RAG indisponible, recherche par mots-clés uniquement")
 
         try:
-            # Timeout avec gestion d'erreurs
-            def timeout_handler(signum, frame):
-                raise TimeoutError("Recherche RAG trop lente")
-
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(self.timeout_seconds)
+            # Budget de temps propagé à la recherche et à l'appel LLM (fonctionne hors du thread principal)
+            with deadline_scope(self.timeout_seconds):
+                # Une seule recherche hybride (vectorielle + mots-clés) au lieu de FAISS seul
+                hits = run_with_deadline(self.hybrid_search, query, stage="recherche")
+                if not hits:
+                    return {
+                        "answer": "",
+                        "sources": [],
+                        "confidence": 0.0,
+                        "method": "rag_no_results"
+                    }
+
+                import openai
 
-            try:
-                response = self.qa_chain.invoke({"query": query})  # Utiliser invoke au lieu de __call__
-                signal.alarm(0)  # Annuler le timeout
+                try:
+                    completion = get_openai_client().chat.completions.create(
+                        model="gpt-3.5-turbo",
+                        messages=[{"role": "user", "content": self._rag_prompt_from_hits(query, hits)}],
+                        max_tokens=600,
+                        temperature=0.1,
+                        timeout=request_timeout(settings.OPENAI_TIMEOUT)
+                    )
+                except (DeadlineExceeded, openai.APITimeoutError):
+                    # Passages trouvés mais génération trop lente : on renvoie les passages
+                    return self._partial_rag_response(hits)
 
-                # Extraire les sources avec plus de détails
-                sources = []
-                for doc in response['source_documents']:
-                    sources.append({
-                        "title": doc.metadata.get('source', 'Document'),
-                        "content": doc.page_content[:200] + "...",
-                        "page": doc.metadata.get('page', 'N/A')
-                    })
+            answer = completion.choices[0].message.content.strip()
 
-                # Calculer la confiance basée sur la qualité de la réponse
-                confidence = 0.8 if len(response['result']) > 30 else 0.5
+            # Calculer la confiance basée sur la qualité de la réponse
+            confidence = 0.8 if len(answer) > 30 else 0.5
 
-                return {
-                    "answer": response['result'],
-                    "sources": sources,
-                    "confidence": confidence,
-                    "method": "rag_search"
-                }
+            return {
+                "answer": answer,
+                "sources": self._sources_from_hits(hits),
+                "confidence": confidence,
+                "method": "rag_search"
+            }
 
-            except TimeoutError:
-                signal.alarm(0)
-                return {
-                    "answer": self.precomputed_responses["error_timeout"],
-                    "sources": [],
-                    "confidence": 0.0,
-                    "method": "rag_timeout"
-                }
+        except DeadlineExceeded:
+            return {
+                "answer": self.precomputed_responses["error_timeout"],
+                "sources": [],
+                "confidence": 0.0,
+                "method": "rag_timeout"
+            }
 
         except Exception as e:
             error_msg = str(e)
@@ -655,12 +1154,28 @@ RÉPONSE:"""
         # Récupérer le contexte de la conversation
         conversation_context = self._get_context_from_history(unique_user_id)
         
-        # Si c'est une correction, utiliser un prompt spécial
-        if is_correction and conversation_context:
-            response = self._handle_correction(query, conversation_context, constitutions)
-        else:
-            # Logique normale pour les nouvelles questions avec contexte
-            response = self._generate_normal_response_with_context(query, constitutions, context, conversation_context, unique_user_id)
+        # Budget de temps de la requête, visible de toutes les étapes (recherche, embeddings, LLM)
+        with deadline_scope(self.timeout_seconds):
+            # Si c'est une correction, utiliser un prompt spécial
+            if is_correction and conversation_context:
+                response = self._handle_correction(query, conversation_context, constitutions)
+            else:
+                # Logique normale pour les nouvelles questions avec contexte
+                # Les doublons simultanés (même question, même contexte de conversation) partagent une seule génération
+                context_digest = hashlib.sha256(conversation_context.encode()).hexdigest() if len(conversation_context) > 50 else None
+                try:
+                    response = dict(self.response_flights.do(
+                        flight_key(query, self.semantic_cache_scope, context_digest),
+                        lambda: self._generate_normal_response_with_context(query, constitutions, context, conversation_context, unique_user_id)
+                    ))
+                except DeadlineExceeded:
+                    # Doublon dont le leader n'a pas répondu dans le budget de la requête
+                    response = {
+                        "answer": self.precomputed_responses["error_timeout"],
+                        "sources": [],
+                        "confidence": 0.0,
+                        "method": "rag_timeout"
+                    }
         
         # Ajouter la réponse à l'historique
         self._add_to_conversation(unique_user_id, "assistant", response.get("answer", ""))
@@ -676,6 +1191,152 @@ RÉPONSE:"""
         
         return response
 
+    async def astream_response(self, query: str, constitutions: List[Constitution], context: str = None, user_id: str = "default", session_id: str = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Variante en streaming de generate_response, produit des couples (type, contenu) :
+        - ("response", dict) : réponse complète connue d'avance (cache, question simple, fallback)
+        - ("delta", fragment) : fragment de texte généré par le LLM
+        - ("done", dict) : réponse finale reconstituée, mise en cache et ajoutée à l'historique
+        """
+        import openai
+        from starlette.concurrency import run_in_threadpool
+        from app.services.llm_client import stream_chat_completion
+
+        start_time = time.time()
+        # Budget de la requête : borne la recherche puis la durée du flux (réponse partielle au-delà)
+        deadline = Deadline(self.timeout_seconds)
+        unique_user_id = self._generate_user_id(user_id, session_id)
+        self._add_to_conversation(unique_user_id, "user", query)
+
+        is_correction = self._detect_correction(query)
+        conversation_context = self._get_context_from_history(unique_user_id)
+        question_type = self._detect_question_type(query)
+
+        def finalize(response: Dict[str, Any]) -> Dict[str, Any]:
+            self._add_to_conversation(unique_user_id, "assistant", response.get("answer", ""))
+            response["search_time"] = time.time() - start_time
+            response["is_correction"] = is_correction
+            return response
+
+        sources = []
+        hits = None
+        cacheable = True
+        if is_correction and conversation_context:
+            context_analysis = self._analyze_correction_context(query, conversation_context)
+            prompt = self._build_correction_prompt(query, conversation_context, context_analysis)
+            method = "correction_dialog"
+            cacheable = False
+        else:
+            cached_response = self._get_cached_response(query)
+            if cached_response:
+                yield "response", finalize(dict(cached_response))
+                return
+
+            if question_type in ["identity", "politeness"]:
+                response = self._handle_simple_question(query, question_type)
+                self._cache_response(query, response)
+                yield "response", finalize(dict(response))
+                return
+
+            if conversation_context and len(conversation_context) > 50:
+                prompt = self._build_contextual_prompt(query, conversation_context)
+                method = "contextual_dialog"
+            else:
+                def search_within_deadline():
+                    # Deadline ouverte dans le thread : si l'attente ci-dessous est annulée, la recherche
+                    # (embedding, initialisation RAG, FAISS) s'arrête d'elle-même au lieu de continuer sans limite
+                    with deadline_scope(deadline.remaining()):
+                        return self.hybrid_search(query)
+
+                # Récupération des passages hors de la boucle d'événements (initialisation RAG, FAISS et base bloquantes)
+                try:
+                    hits = await asyncio.wait_for(
+                        run_in_threadpool(search_within_deadline),
+                        timeout=deadline.remaining()
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("⏱️ Recherche hybride interrompue : délai dépassé")
+                except Exception as e:
+                    logger.error(f"Erreur de recherche hybride: {e}")
+
+                if not hits:
+                    keyword_response = self._fast_keyword_search(query, constitutions)
+                    if "suggestions" not in keyword_response:
+                        keyword_response["suggestions"] = self._generate_suggestions(query, question_type)
+                    self._cache_response(query, keyword_response)
+                    yield "response", finalize(dict(keyword_response))
+                    return
+
+                sources = self._sources_from_hits(hits)
+                prompt = self._rag_prompt_from_hits(query, hits)
+                method = "rag_search"
+
+        fragments = []
+        timed_out = False
+        stream = stream_chat_completion(
+            [{"role": "user", "content": prompt}],
+            model="gpt-3.5-turbo",
+            max_tokens=600,
+            temperature=0.1,
+            timeout=deadline.timeout(cap=settings.OPENAI_TIMEOUT)
+        )
+        try:
+            async for delta in stream:
+                fragments.append(delta)
+                yield "delta", delta
+                if deadline.expired:
+                    timed_out = True
+                    break
+        except (DeadlineExceeded, openai.APITimeoutError):
+            timed_out = True
+        except Exception as e:
+            logger.error(f"Erreur pendant le streaming de la réponse: {e}")
+            error_msg = str(e)
+            if not fragments:
+                answer = (self.precomputed_responses["error_quota"]
+                          if "quota" in error_msg.lower() or "429" in error_msg
+                          else f"Erreur lors de la recherche: {error_msg}")
+                yield "response", finalize({
+                    "answer": answer,
+                    "sources": [],
+                    "confidence": 0.0,
+                    "method": "rag_error",
+                    "suggestions": self._generate_suggestions(query, question_type)
+                })
+                return
+            cacheable = False
+        finally:
+            # Libère la connexion et l'emplacement du sémaphore si le flux est interrompu
+            await stream.aclose()
+
+        if timed_out:
+            logger.warning("⏱️ Génération interrompue : délai dépassé, réponse partielle")
+            if hits:
+                response = self._partial_rag_response(hits, "".join(fragments))
+            else:
+                response = {
+                    "answer": "".join(fragments).rstrip() + "…" if fragments else self.precomputed_responses["error_timeout"],
+                    "sources": sources,
+                    "confidence": 0.4 if fragments else 0.0,
+                    "method": f"{method}_partial",
+                    "partial": True
+                }
+            response["suggestions"] = self._generate_suggestions(query, question_type)
+            yield ("done" if fragments else "response"), finalize(response)
+            return
+
+        answer = "".join(fragments)
+        response = {
+            "answer": answer,
+            "sources": sources,
+            "confidence": 0.8 if len(answer) > 30 else 0.5,
+            "method": method,
+            "suggestions": self._generate_suggestions(query, question_type)
+        }
+        if cacheable:
+            self._cache_response(query, response)
+        yield "done", finalize(dict(response))
+
     def _generate_normal_response_with_context(self, query: str, constitutions: List[Constitution], context: str = None, conversation_context: str = "", user_id: str = "default") -> Dict[str, Any]:
         """Génère une réponse normale en tenant compte du contexte de conversation"""
         # Vérifier le cache d'abord
@@ -720,33 +1381,54 @@ RÉPONSE:"""
         self._cache_response(query, keyword_response)
         return keyword_response
 
+    def _build_contextual_prompt(self, query: str, conversation_context: str) -> str:
+        """Prompt de réponse tenant compte de l'historique de conversation"""
+        return f"""
+        CONTEXTE DE LA CONVERSATION:
+        {conversation_context}
+        
+        NOUVELLE QUESTION: "{query}"
+        
+        Tu es ConstitutionIA, un assistant spécialisé dans la constitution de la Guinée.
+        
+        INSTRUCTIONS:
+        1. Analyse le contexte de la conversation
+        2. Comprends la progression logique de la discussion
+        3. Donne une réponse cohérente avec le sujet en cours
+        4. Fais référence aux échanges précédents si pertinent
+        5. Reste focalisé sur la constitution de la Guinée
+        6. Cite des articles spécifiques si possible
+        
+        RÉPONSE CONTEXTUELLE:
+        """
+
+    def _complete_within_deadline(self, prompt: str, stage: str) -> str:
+        """
+        Complétion bornée par la deadline courante : le temps restant est le timeout HTTP de l'appel,
+        le thread est donc libéré à l'expiration au lieu de continuer en arrière-plan
+        """
+        import openai
+
+        try:
+            completion = get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=600,
+                temperature=0.1,
+                timeout=request_timeout(settings.OPENAI_TIMEOUT)
+            )
+        except openai.APITimeoutError:
+            logger.warning(f"⏱️ Délai dépassé pendant: {stage}")
+            raise DeadlineExceeded(stage)
+        return completion.choices[0].message.content.strip()
+
     def _generate_contextual_response(self, query: str, constitutions: List[Constitution], conversation_context: str, question_type: str) -> Optional[Dict[str, Any]]:
         """Génère une réponse contextuelle en utilisant l'historique de conversation"""
         try:
             # Utiliser GPT pour générer une réponse contextuelle
-            contextual_prompt = f"""
-            CONTEXTE DE LA CONVERSATION:
-            {conversation_context}
-            
-            NOUVELLE QUESTION: "{query}"
+            contextual_prompt = self._build_contextual_prompt(query, conversation_context)
             
-            Tu es ConstitutionIA, un assistant spécialisé dans la constitution de la Guinée.
-            
-            INSTRUCTIONS:
-            1. Analyse le contexte de la conversation
-            2. Comprends la progression logique de la discussion
-            3. Donne une réponse cohérente avec le sujet en cours
-            4. Fais référence aux échanges précédents si pertinent
-            5. Reste focalisé sur la constitution de la Guinée
-            6. Cite des articles spécifiques si possible
-            
-            RÉPONSE CONTEXTUELLE:
-            """
-            
-            if self.llm is None:
-                self._initialize_rag_lazy()
-            
-            response = self.llm.predict(contextual_prompt)
+            response = self._complete_within_deadline(contextual_prompt, stage="génération contextuelle")
             
             return {
                 "answer": response,
@@ -760,6 +1442,35 @@ RÉPONSE:"""
             logger.error(f"Erreur dans la génération de réponse contextuelle: {e}")
             return None
 
+    def _build_correction_prompt(self, query: str, conversation_context: str, context_analysis: Dict[str, str]) -> str:
+        """Prompt de correction d'une réponse précédente"""
+        return f"""
+        CONTEXTE DE LA CONVERSATION:
+        {conversation_context}
+        
+        ANALYSE DU CONTEXTE:
+        - Sujet principal: {context_analysis.get('main_topic', 'Non identifié')}
+        - Dernière question: {context_analysis.get('last_question', 'Non identifié')}
+        - Ma dernière réponse: {context_analysis.get('last_response', 'Non identifié')}
+        - Type de correction: {context_analysis.get('correction_type', 'Général')}
+        
+        CORRECTION DE L'UTILISATEUR: "{query}"
+        
+        Tu es ConstitutionIA, un assistant spécialisé dans la constitution de la Guinée.
+        L'utilisateur dit que ma réponse précédente est incorrecte.
+        
+        INSTRUCTIONS:
+        1. Analyse ma réponse précédente dans le contexte
+        2. Comprends ce que l'utilisateur veut corriger spécifiquement
+        3. Donne une réponse plus précise et vérifiée
+        4. Cite les articles spécifiques de la constitution si possible
+        5. Sois humble et reconnais si tu as fait une erreur
+        6. Reste cohérent avec le sujet de la conversation
+        7. Si tu n'es pas sûr, demande des clarifications
+        
+        RÉPONSE CORRIGÉE:
+        """
+
     def _handle_correction(self, query: str, conversation_context: str, constitutions: List[Constitution]) -> Dict[str, Any]:
         """Gère les corrections de l'utilisateur avec analyse contextuelle améliorée"""
         try:
@@ -767,38 +1478,10 @@ RÉPONSE:"""
             context_analysis = self._analyze_correction_context(query, conversation_context)
             
             # Utiliser GPT pour comprendre la correction avec contexte enrichi
-            correction_prompt = f"""
-            CONTEXTE DE LA CONVERSATION:
-            {conversation_context}
-            
-            ANALYSE DU CONTEXTE:
-            - Sujet principal: {context_analysis.get('main_topic', 'Non identifié')}
-            - Dernière question: {context_analysis.get('last_question', 'Non identifié')}
-            - Ma dernière réponse: {context_analysis.get('last_response', 'Non identifié')}
-            - Type de correction: {context_analysis.get('correction_type', 'Général')}
-            
-            CORRECTION DE L'UTILISATEUR: "{query}"
-            
-            Tu es ConstitutionIA, un assistant spécialisé dans la constitution de la Guinée.
-            L'utilisateur dit que ma réponse précédente est incorrecte.
-            
-            INSTRUCTIONS:
-            1. Analyse ma réponse précédente dans le contexte
-            2. Comprends ce que l'utilisateur veut corriger spécifiquement
-            3. Donne une réponse plus précise et vérifiée
-            4. Cite les articles spécifiques de la constitution si possible
-            5. Sois humble et reconnais si tu as fait une erreur
-            6. Reste cohérent avec le sujet de la conversation
-            7. Si tu n'es pas sûr, demande des clarifications
-            
-            RÉPONSE CORRIGÉE:
-            """
+            correction_prompt = self._build_correction_prompt(query, conversation_context, context_analysis)
             
             # Utiliser le LLM pour générer une réponse corrigée
-            if self.llm is None:
-                self._initialize_rag_lazy()
-            
-            response = self.llm.predict(correction_prompt)
+            response = self._complete_within_deadline(correction_prompt, stage="correction")
             
             return {
                 "answer": response,
@@ -971,13 +1654,17 @@ RÉPONSE:"""
 
     def get_system_status(self) -> Dict[str, Any]:
         """Retourne le statut du système IA optimisé"""
+        shared = self._shared_index()
         return {
             "is_initialized": self.is_initialized,
             "rag_available": self.qa_chain is not None,
             "vector_db_available": self.vector_db is not None,
+            "shared_index": shared.describe() if shared is not None else None,
             "openai_configured": bool(self.openai_api_key),
+            "embedding_backend": self.embedding_backend.describe() if self.embedding_backend else settings.EMBEDDING_BACKEND,
+            "index_metadata": self.get_index_metadata(),
             "cache_size": len(self.response_cache),
-            "cache_hits": getattr(self, 'cache_hits', 0),
+            "cache_hits": self.response_cache.hits,
             "chunk_size": self.chunk_size,
             "chunk_overlap": self.chunk_overlap,
             "max_chunks": self.max_chunks,
@@ -989,6 +1676,7 @@ RÉPONSE:"""
         """Vide le cache"""
         self.response_cache.clear()
         self.embedding_cache.clear()
+        get_semantic_cache().clear(self.semantic_cache_scope)
         logger.info("Cache vidé")
 
     def _suggest_reformulation(self, query: str) -> Dict[str, Any]:
@@ -1075,15 +1763,30 @@ RÉPONSE:"""
             "suggestions": suggestions
         }
 
+    def get_index_metadata(self) -> Optional[Dict[str, Any]]:
+        """Métadonnées de l'index vectoriel persistant (backend d'embeddings, dimension, nombre de chunks)"""
+        try:
+            return self._read_index_metadata()
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la lecture des métadonnées de l'index: {e}")
+            return None
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques du cache"""
+        response_stats = self.response_cache.get_stats()
         return {
-            "response_cache_size": len(self.response_cache),
+            "response_cache_size": response_stats["entries"],
             "embedding_cache_size": len(self.embedding_cache),
             "cache_ttl": self.cache_ttl,
-            "cache_hits": getattr(self, 'cache_hits', 0),
-            "cache_misses": getattr(self, 'cache_misses', 0)
-        } 
+            "cache_hits": response_stats["hits"],
+            "cache_misses": response_stats["misses"],
+            "response_cache": response_stats,
+            "embedding_cache": self.embedding_cache.get_stats(),
+            "embedding_store": self.embeddings.get_stats() if hasattr(self.embeddings, "get_stats") else None,
+            "semantic_cache": get_semantic_cache().get_stats(),
+            "single_flight": self.response_flights.get_stats(),
+            "hybrid_retrieval": self.retriever.get_stats()
+        }
 
     def _generate_user_id(self, user_id: str = None, session_id: str = None) -> str:
         """Génère un ID utilisateur unique basé sur l'authentification ou la session"""
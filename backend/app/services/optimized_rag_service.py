@@ -1,6 +1,5 @@
 import os
 import time
-import signal
 from typing import List, Dict, Any, Tuple, Optional
 from sqlalchemy.orm import Session
 from app.models.constitution import Constitution
@@ -10,12 +9,13 @@ import re
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 import numpy as np
+from app.services.embedding_backends import get_embedding_backend
+from app.services.deadline import DeadlineExceeded, deadline_scope, run_with_deadline
 
 load_dotenv()
 
@@ -27,7 +27,8 @@ class OptimizedRAGService:
             raise ValueError("OPENAI_API_KEY environment variable not found.")
         
         # Initialiser les composants optimisés
-        self.embeddings = OpenAIEmbeddings(openai_api_key=self.openai_api_key)
+        # Backend d'embeddings partagé, choisi par Settings.EMBEDDING_BACKEND
+        self.embeddings = get_embedding_backend()
         self.llm = ChatOpenAI(
             model_name="gpt-3.5-turbo", 
             temperature=0.1,  # Réduire la température pour plus de cohérence
@@ -146,16 +147,10 @@ RÉPONSE:"""
             }
         
         try:
-            # Timeout avec gestion d'erreurs améliorée
-            def timeout_handler(signum, frame):
-                raise TimeoutError("Recherche RAG trop lente")
-            
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(self.timeout_seconds)
-            
+            # Deadline coopérative (signal.alarm ne fonctionne pas hors du thread principal)
             try:
-                response = self.qa_chain(query)
-                signal.alarm(0)  # Annuler le timeout
+                with deadline_scope(self.timeout_seconds):
+                    response = run_with_deadline(self.qa_chain, query, stage="chaîne RAG")
                 
                 # Extraire les sources avec plus de détails
                 sources = []
@@ -175,8 +170,7 @@ RÉPONSE:"""
                     "confidence": confidence
                 }
                 
-            except TimeoutError:
-                signal.alarm(0)
+            except DeadlineExceeded:
                 return {
                     "answer": "Désolé, la recherche prend trop de temps. Essayez une question plus spécifique.",
                     "sources": [],
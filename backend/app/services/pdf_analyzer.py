@@ -1,11 +1,11 @@
 import os
-import PyPDF2
-from openai import OpenAI
 from typing import Dict, Optional, List
 from pathlib import Path
 import logging
 import re
 from app.core.config import settings
+from app.services.extraction_cache import get_extraction_cache
+from app.services.pdf_extraction import extract_pages_cached
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -13,32 +13,35 @@ logger = logging.getLogger(__name__)
 
 class PDFAnalyzer:
     def __init__(self, openai_api_key: str):
+        from openai import OpenAI
+
         self.openai_api_key = openai_api_key
         self.client = OpenAI(api_key=openai_api_key)
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extrait le texte d'un fichier PDF avec améliorations"""
+        """Extrait le texte d'un fichier PDF avec améliorations (pages réutilisées si le fichier est inchangé)"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    
-                    # Nettoyer le texte extrait
-                    page_text = self._clean_text(page_text)
-                    
-                    # Ajouter le numéro de page si le texte n'est pas vide
-                    if page_text.strip():
-                        text += f"\n--- Page {page_num + 1} ---\n"
-                        text += page_text + "\n"
-                
-                # Nettoyer le texte final
-                text = self._clean_final_text(text)
+            # Pages extraites en parallèle (pool de processus), réassemblées dans l'ordre ;
+            # partagées avec PDFImporter via le cache d'artefacts
+            extraction = extract_pages_cached(pdf_path)
+            parts = []
+            
+            for page in extraction.pages:
+                # Nettoyer le texte extrait
+                page_text = self._clean_text(page.text)
                 
-                logger.info(f"Texte extrait avec succès: {len(text)} caractères")
-                return text
+                # Ajouter le numéro de page si le texte n'est pas vide
+                if page_text.strip():
+                    parts.append(f"\n--- Page {page.number} ---\n{page_text}\n")
+            
+            # Nettoyer le texte final
+            text = self._clean_final_text("".join(parts))
+            
+            logger.info(
+                f"Texte extrait avec succès: {len(text)} caractères, "
+                f"{extraction.page_count} pages en {extraction.seconds:.2f}s"
+            )
+            return text
                 
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction du texte du PDF: {e}")
@@ -116,6 +119,12 @@ class PDFAnalyzer:
     def analyze_pdf_with_gpt4(self, pdf_path: str, filename: str) -> Dict:
         """Analyse un PDF avec GPT-4 et retourne les métadonnées améliorées"""
         try:
+            # Métadonnées d'un fichier au contenu identique déjà analysé : pas de nouvel appel GPT-4
+            cache = get_extraction_cache()
+            cached = cache.load(pdf_path, "metadata")
+            if cached is not None:
+                return cached
+            
             # Extraire le texte du PDF
             text = self.extract_text_from_pdf(pdf_path)
             
@@ -179,6 +188,8 @@ class PDFAnalyzer:
                 result['articles_preview'] = [{'number': art['number'], 'summary': art['summary']} for art in articles[:5]]
                 
                 logger.info(f"Analyse GPT-4 réussie pour: {filename}")
+                # Seule une analyse réussie est conservée : un échec sera retenté au prochain traitement
+                cache.store(pdf_path, "metadata", result)
                 return result
             except json.JSONDecodeError:
                 logger.error(f"Erreur de parsing JSON pour: {filename}")
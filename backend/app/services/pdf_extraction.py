@@ -0,0 +1,268 @@
+"""
+Extraction du texte des PDF page par page, répartie sur plusieurs processus
+Les pages sont découpées en tranches contiguës traitées par un ProcessPoolExecutor (PyPDF2 est
+du Python pur : des threads resteraient limités à un cœur par le GIL), puis réassemblées dans
+l'ordre ; chaque page conserve son numéro et son temps d'extraction.
+Seules les pages dont la couche texte est vide (scans, annexes image) passent par l'OCR,
+dans un second pool borné : un PDF numérique avec quelques annexes scannées n'est pas OCRisé en entier
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.extraction_cache import get_extraction_cache
+
+logger = logging.getLogger(__name__)
+
+# Tranches par processus : plusieurs petites tranches équilibrent les pages lentes (tableaux, annexes)
+_SHARDS_PER_WORKER = 4
+
+
+class ExtractedPage:
+    """Texte d'une page (numérotée à partir de 1) et durée de son extraction"""
+
+    __slots__ = ("number", "text", "seconds", "method")
+
+    def __init__(self, number: int, text: str, seconds: float, method: str = "text_layer"):
+        self.number = number
+        self.text = text
+        self.seconds = seconds
+        self.method = method
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page": self.number,
+            "characters": len(self.text),
+            "seconds": round(self.seconds, 4),
+            "method": self.method
+        }
+
+
+class PDFExtraction:
+    """Pages extraites d'un fichier, dans l'ordre du document"""
+
+    def __init__(self, path: str, pages: List[ExtractedPage], seconds: float, workers: int, from_cache: bool = False):
+        self.path = path
+        self.pages = pages
+        self.seconds = seconds
+        self.workers = workers
+        self.from_cache = from_cache
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def text(self, separator: str = "\n") -> str:
+        """Texte complet, chaque page suivie de separator"""
+        return "".join(page.text + separator for page in self.pages)
+
+    def timings(self) -> Dict[str, Any]:
+        """Durée totale et pages les plus lentes, pour les journaux et les réponses d'import"""
+        slowest = sorted(self.pages, key=lambda page: -page.seconds)[:5]
+        return {
+            "pages": self.page_count,
+            "workers": self.workers,
+            "seconds": round(self.seconds, 3),
+            "page_seconds": round(sum(page.seconds for page in self.pages), 3),
+            "ocr_pages": sum(1 for page in self.pages if page.method == "ocr"),
+            "slowest_pages": [page.to_dict() for page in slowest],
+            "from_cache": self.from_cache
+        }
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str, float]]:
+    """
+    Exécuté dans un processus du pool : ouvre le fichier une fois par tranche
+    et extrait les pages [start, end) ; retourne (index, texte, secondes) par page
+    """
+    import PyPDF2
+
+    results = []
+    with open(pdf_path, "rb") as handle:
+        reader = PyPDF2.PdfReader(handle)
+        for index in range(start, end):
+            page_start = time.perf_counter()
+            try:
+                text = reader.pages[index].extract_text() or ""
+            except Exception:
+                text = ""
+            results.append((index, text, time.perf_counter() - page_start))
+    return results
+
+
+def _ocr_page(pdf_path: str, index: int, dpi: int) -> Tuple[int, str, float]:
+    """Exécuté dans un processus du pool OCR : rendu d'une seule page puis Tesseract"""
+    import fitz
+    import pytesseract
+    from PIL import Image
+
+    page_start = time.perf_counter()
+    with fitz.open(pdf_path) as document:
+        pixmap = document[index].get_pixmap(dpi=dpi)
+        image = Image.frombytes("RGB", [pixmap.width, pixmap.height], pixmap.samples)
+    text = pytesseract.image_to_string(image, lang=settings.PDF_OCR_LANG)
+    return index, text, time.perf_counter() - page_start
+
+
+def _page_count(pdf_path: str) -> int:
+    import PyPDF2
+
+    with open(pdf_path, "rb") as handle:
+        return len(PyPDF2.PdfReader(handle).pages)
+
+
+def _shards(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    size = max(1, -(-page_count // (workers * _SHARDS_PER_WORKER)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Processus démarrés par "spawn" : un fork de worker uvicorn copierait ses threads (threadpool, verrous
+# tenus, clients HTTP) et pourrait bloquer ; les fonctions exécutées ne dépendent que de leurs arguments
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _worker_count() -> int:
+    return settings.PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Pool partagé par les imports du processus (créé au premier gros fichier)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=_worker_count(), mp_context=_MP_CONTEXT)
+    return _pool
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    """Pool OCR borné (Tesseract est gourmand en CPU et en mémoire par page)"""
+    global _ocr_pool
+    if _ocr_pool is None:
+        with _pool_lock:
+            if _ocr_pool is None:
+                _ocr_pool = ProcessPoolExecutor(
+                    max_workers=max(1, settings.PDF_OCR_WORKERS), mp_context=_MP_CONTEXT
+                )
+    return _ocr_pool
+
+
+def is_empty_page(text: str) -> bool:
+    """Couche texte inexploitable : moins de PDF_OCR_MIN_CHARS caractères visibles"""
+    return len("".join(text.split())) < settings.PDF_OCR_MIN_CHARS
+
+
+def ocr_pages(pdf_path: str, indexes: List[int]) -> List[ExtractedPage]:
+    """
+    OCR des pages demandées (index à partir de 0) dans le pool borné, résultat dans l'ordre ;
+    une page en échec reste vide. Lève ImportError si PyMuPDF / pytesseract sont absents
+    """
+    import fitz  # noqa: F401 - vérifie la présence des dépendances OCR avant de remplir le pool
+    import pytesseract  # noqa: F401
+
+    if not indexes:
+        return []
+    pool = _get_ocr_pool()
+    futures = [pool.submit(_ocr_page, pdf_path, index, settings.PDF_OCR_DPI) for index in indexes]
+    pages = []
+    for index, future in zip(indexes, futures):
+        try:
+            _, text, seconds = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ OCR de la page {index + 1} échoué: {e}")
+            text, seconds = "", 0.0
+        pages.append(ExtractedPage(index + 1, text, seconds, method="ocr"))
+    logger.info(f"🔎 OCR de {len(indexes)} pages de {os.path.basename(pdf_path)}")
+    return pages
+
+
+def extract_pages(pdf_path: str, ocr: bool = True) -> PDFExtraction:
+    """
+    Texte de chaque page du PDF (couche texte) ; les petits fichiers sont traités dans le processus
+    courant, les gros répartis sur le pool. En cas d'échec du pool, extraction séquentielle.
+    Avec ocr=True, les pages vides sont ensuite OCRisées (et seulement elles)
+    """
+    start_time = time.perf_counter()
+    page_count = _page_count(pdf_path)
+    workers = min(_worker_count(), page_count) if page_count >= settings.PDF_PARALLEL_MIN_PAGES else 1
+
+    rows: List[Tuple[int, str, float]] = []
+    if workers > 1:
+        try:
+            pool = _get_pool()
+            futures = [pool.submit(_extract_page_range, pdf_path, start, end) for start, end in _shards(page_count, workers)]
+            for future in futures:
+                rows.extend(future.result())
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"⚠️ Pool d'extraction indisponible, extraction séquentielle: {e}")
+            # Un processus mort rend le pool inutilisable : le suivant sera recréé
+            shutdown_extraction_pool()
+            rows, workers = [], 1
+    if workers == 1:
+        rows = _extract_page_range(pdf_path, 0, page_count)
+
+    # Les tranches sont soumises et lues dans l'ordre : les pages le sont aussi
+    pages = [ExtractedPage(index + 1, text, seconds) for index, text, seconds in rows]
+
+    empty = [page.number - 1 for page in pages if is_empty_page(page.text)]
+    if ocr and empty:
+        try:
+            for ocr_page in ocr_pages(pdf_path, empty):
+                pages[ocr_page.number - 1] = ocr_page
+        except ImportError as e:
+            logger.warning(f"⚠️ OCR indisponible ({e}), {len(empty)} pages sans texte")
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️ Pool OCR indisponible, {len(empty)} pages sans texte: {e}")
+            shutdown_extraction_pool()
+
+    extraction = PDFExtraction(pdf_path, pages, time.perf_counter() - start_time, workers)
+    timings = extraction.timings()
+    logger.info(
+        f"📄 {os.path.basename(pdf_path)}: {page_count} pages extraites en {timings['seconds']}s "
+        f"({workers} processus, {timings['page_seconds']}s cumulées, {timings['ocr_pages']} pages OCR)"
+    )
+    return extraction
+
+
+def extract_pages_cached(pdf_path: str) -> PDFExtraction:
+    """
+    extract_pages avec OCR, enregistré une fois par empreinte SHA-256 (artefact "pages") : l'analyse
+    (PDFAnalyzer) et l'import (PDFImporter) d'un même fichier partagent une seule extraction
+    """
+    cache = get_extraction_cache()
+    cached = cache.load(pdf_path, "pages")
+    if cached is not None:
+        pages = [ExtractedPage(number, text, seconds, method) for number, text, seconds, method in cached["pages"]]
+        return PDFExtraction(pdf_path, pages, cached["seconds"], cached["workers"], from_cache=True)
+
+    extraction = extract_pages(pdf_path)
+    if any(page.text.strip() for page in extraction.pages):
+        cache.store(pdf_path, "pages", {
+            "pages": [[page.number, page.text, page.seconds, page.method] for page in extraction.pages],
+            "seconds": extraction.seconds,
+            "workers": extraction.workers
+        })
+    return extraction
+
+
+def shutdown_extraction_pool():
+    """Arrête les pools (arrêt de l'application, ou pool cassé)"""
+    global _pool, _ocr_pool
+    with _pool_lock:
+        for pool in (_pool, _ocr_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _pool = _ocr_pool = None
@@ -1,6 +1,4 @@
 import sqlite3
-import PyPDF2
-import re
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
@@ -9,6 +7,12 @@ from sqlalchemy.sql import func
 from pathlib import Path
 import logging
 from app.models.pdf_import import Article, Metadata
+from app.services.article_segmenter import page_offsets, segment_articles
+from app.services.bm25_ranker import invalidate_articles_ranker
+from app.services.bulk_writer import has_changes, sync_rows
+from app.services.extraction_cache import get_extraction_cache
+from app.services.pdf_extraction import extract_pages_cached, ocr_pages
+from app.services.semantic_cache import invalidate_constitution
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -19,19 +23,29 @@ logger = logging.getLogger(__name__)
 class PDFImporter:
     def __init__(self, db_session: Session):
         self.db = db_session
+        # Dernière extraction page par page (durées par page, rapportées par process_pdf_file)
+        self.last_extraction = None
+        # Début de chaque page dans le dernier texte extrait (numéros de page des articles)
+        self.last_page_offsets = None
         
     def extract_pdf_text(self, pdf_path: str) -> str:
-        """Extraction du texte PDF avec fallbacks"""
+        """Extraction du texte PDF avec fallbacks (pages réutilisées depuis le cache d'artefacts si le fichier est inchangé)"""
         text = ""
+        extraction = None
+        self.last_extraction = None
+        self.last_page_offsets = None
         
-        # Essai 1: PyPDF2
+        # Essai 1: PyPDF2 page par page (pool de processus), OCR des seules pages sans couche texte ;
+        # pages partagées avec PDFAnalyzer via le cache d'artefacts
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
+            extraction = self.last_extraction = extract_pages_cached(pdf_path)
+            text = extraction.text()
             if text.strip():
-                logger.info(f"Texte extrait avec PyPDF2: {len(text)} caractères")
+                self.last_page_offsets = page_offsets([page.text for page in extraction.pages])
+                logger.info(
+                    f"Texte extrait avec PyPDF2: {len(text)} caractères, "
+                    f"{extraction.page_count} pages en {extraction.seconds:.2f}s"
+                )
                 return text
         except Exception as e:
             logger.warning(f"PyPDF2 échoué: {e}")
@@ -52,132 +66,86 @@ class PDFImporter:
         try:
             import fitz
             with fitz.open(pdf_path) as doc:
-                text = "\n".join(page.get_text() for page in doc)
+                page_texts = [page.get_text() for page in doc]
+            text = "\n".join(page_texts)
             if text.strip():
+                self.last_page_offsets = page_offsets(page_texts)
                 logger.info(f"Texte extrait avec PyMuPDF: {len(text)} caractères")
                 return text
         except Exception as e:
             logger.warning(f"PyMuPDF échoué: {e}")
         
-        # Essai 4: OCR avec Tesseract
-        try:
-            import fitz
-            import pytesseract
-            from PIL import Image
-            ocr_text_parts = []
-            with fitz.open(pdf_path) as doc:
-                for page in doc:
-                    pix = page.get_pixmap(dpi=200)
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    text_page = pytesseract.image_to_string(img, lang="fra")
-                    if text_page.strip():
-                        ocr_text_parts.append(text_page)
-            text = "\n".join(ocr_text_parts)
-            if text.strip():
-                logger.info(f"Texte extrait avec OCR: {len(text)} caractères")
-                return text
-        except Exception as e:
-            logger.warning(f"OCR échoué: {e}")
+        # Essai 4: OCR de toutes les pages, dans le pool OCR borné ; inutile si l'essai 1 a lu
+        # le fichier (ses pages vides ont alors déjà été OCRisées)
+        if extraction is None:
+            try:
+                import fitz
+                with fitz.open(pdf_path) as doc:
+                    page_count = doc.page_count
+                pages = ocr_pages(pdf_path, list(range(page_count)))
+                text = "\n".join(page.text for page in pages if page.text.strip())
+                if text.strip():
+                    logger.info(f"Texte extrait avec OCR: {len(text)} caractères")
+                    return text
+            except Exception as e:
+                logger.warning(f"OCR échoué: {e}")
         
         logger.error("Aucune méthode d'extraction n'a fonctionné")
         return ""
 
-    def parse_constitution(self, text: str) -> list:
-        """Parsing des articles avec expressions régulières améliorées"""
-        articles = []
-        
-        # Patterns améliorés pour capturer les articles
-        patterns = [
-            # Pattern 1: Article X - format standard
-            r'(Article\s+\d+[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 2: Article X. - avec point
-            r'(Article\s+\d+\.?[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 3: ART. X - format abrégé
-            r'(ART\.\s*\d+[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 4: Art. X - format court
-            r'(Art\.\s*\d+[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 5: ARTICLE X - format majuscule
-            r'(ARTICLE\s+\d+[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 6: Article X : - avec deux points
-            r'(Article\s+\d+\s*:[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 7: Article X - avec tiret
-            r'(Article\s+\d+\s*-[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 8: Article X (avec parenthèses)
-            r'(Article\s+\d+\s*\([^)]*\)[^\n]*)\n((?:[^\n]+\n)+)',
-            # Pattern 9: Article X - format avec alinéas
-            r'(Article\s+\d+[^\n]*)\n((?:[^\n]+\n)+?)(?=Article\s+\d+|$)',
-            # Pattern 10: Article X - format avec numérotation
-            r'(Article\s+\d+[^\n]*)\n((?:[^\n]+\n)+?)(?=Article\s+\d+|$)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.VERBOSE | re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                article_num = match.group(1).strip()
-                content = match.group(2).strip()
-                
-                # Nettoyer le contenu
-                content = re.sub(r'\n+', '\n', content).strip()
-                
-                # Détection des parties/sections
-                part_section = re.search(r'(PREMIÈRE|DEUXIÈME|TROISIÈME|QUATRIÈME|CINQUIÈME)\s+PARTIE|(TITRE\s+[IVXLCDM]+)', article_num, re.IGNORECASE)
-                
-                # Extraire le numéro d'article
-                article_number_match = re.search(r'(\d+)', article_num)
-                article_number = article_number_match.group(1) if article_number_match else article_num
-                
-                # Vérifier que le contenu n'est pas vide et a une longueur minimale
-                if content and len(content) > 10:
-                    articles.append({
-                        'article_number': f"Article {article_number}",
-                        'content': content,
-                        'part': part_section.group(1) if part_section and part_section.group(1) else None,
-                        'section': part_section.group(2) if part_section and part_section.group(2) else None,
-                        'page_number': None  # À implémenter si nécessaire
-                    })
-        
-        # Supprimer les doublons basés sur le numéro d'article
-        seen = set()
-        unique_articles = []
-        for article in articles:
-            if article['article_number'] not in seen:
-                seen.add(article['article_number'])
-                unique_articles.append(article)
-        
-        # Trier par numéro d'article
-        unique_articles.sort(key=lambda x: int(re.search(r'\d+', x['article_number']).group()) if re.search(r'\d+', x['article_number']) else 0)
-        
-        return unique_articles
+    def parse_constitution(self, text: str, page_offsets: list = None) -> list:
+        """
+        Découpage des articles en une passe (TITRE/PARTIE et CHAPITRE/SECTION en cours, page de l'en-tête)
+        page_offsets : début de chaque page dans text, tel que calculé à l'extraction
+        """
+        return segment_articles(text, page_offsets)
 
     def save_articles_to_db(self, constitution_id: int, articles: list) -> bool:
-        """Sauvegarder les articles en base de données"""
+        """
+        Sauvegarder les articles en base de données : comparaison avec les articles existants
+        (par numéro) puis écriture en masse des seuls articles nouveaux, modifiés ou disparus
+        """
         try:
-            # Supprimer les articles existants pour cette constitution
-            self.db.query(Article).filter(Article.constitution_id == constitution_id).delete()
+            rows = [
+                {
+                    'constitution_id': constitution_id,
+                    'article_number': article['article_number'],
+                    'title': article.get('title'),
+                    'content': article['content'],
+                    'part': article.get('part'),
+                    'section': article.get('section'),
+                    'page_number': article.get('page_number')
+                }
+                for article in articles
+            ]
+            table = Article.__table__
+            result = sync_rows(
+                self.db,
+                table,
+                rows,
+                key_fields=('constitution_id', 'article_number'),
+                where=table.c.constitution_id == constitution_id
+            )
             
-            # Insérer les nouveaux articles
-            for article in articles:
-                db_article = Article(
+            # Articles inchangés : aucune écriture (ni métadonnée, ni verrou SQLite),
+            # classement BM25 et cache sémantique restent valides
+            if has_changes(result):
+                # Mettre à jour les métadonnées
+                metadata = Metadata(
                     constitution_id=constitution_id,
-                    article_number=article['article_number'],
-                    title=article.get('title'),
-                    content=article['content'],
-                    part=article.get('part'),
-                    section=article.get('section'),
-                    page_number=article.get('page_number')
+                    key='last_parsed',
+                    value=datetime.now().isoformat()
                 )
-                self.db.add(db_article)
-            
-            # Mettre à jour les métadonnées
-            metadata = Metadata(
-                constitution_id=constitution_id,
-                key='last_parsed',
-                value=datetime.now().isoformat()
+                self.db.add(metadata)
+                
+                self.db.commit()
+                invalidate_articles_ranker()
+                invalidate_constitution(constitution_id)
+            logger.info(
+                f"✅ {len(articles)} articles sauvegardés pour constitution_id {constitution_id} "
+                f"({result['inserted']} ajoutés, {result['updated']} modifiés, "
+                f"{result['deleted']} supprimés, {result['unchanged']} inchangés)"
             )
-            self.db.add(metadata)
-            
-            self.db.commit()
-            logger.info(f"✅ {len(articles)} articles sauvegardés pour constitution_id {constitution_id}")
             return True
             
         except Exception as e:
@@ -190,17 +158,26 @@ class PDFImporter:
         try:
             logger.info(f"🔄 Traitement du fichier: {file_path}")
             
-            # Extraction du texte
-            text = self.extract_pdf_text(file_path)
-            if not text.strip():
-                return {
-                    'success': False,
-                    'error': 'Impossible d\'extraire le texte du PDF',
-                    'articles_count': 0
-                }
-            
-            # Parsing des articles
-            articles = self.parse_constitution(text)
+            # Articles déjà extraits d'un fichier au contenu identique : ni extraction ni parsing
+            cache = get_extraction_cache()
+            cached = cache.load(file_path, "articles")
+            if cached is not None:
+                articles, text_length = cached["articles"], cached["text_length"]
+                self.last_extraction = None
+            else:
+                # Extraction du texte
+                text = self.extract_pdf_text(file_path)
+                if not text.strip():
+                    return {
+                        'success': False,
+                        'error': 'Impossible d\'extraire le texte du PDF',
+                        'articles_count': 0
+                    }
+                
+                # Parsing des articles
+                articles = self.parse_constitution(text, self.last_page_offsets)
+                text_length = len(text)
+                cache.store(file_path, "articles", {"articles": articles, "text_length": text_length})
             logger.info(f"📄 {len(articles)} articles trouvés")
             
             # Sauvegarde en base
@@ -208,7 +185,9 @@ class PDFImporter:
                 return {
                     'success': True,
                     'articles_count': len(articles),
-                    'text_length': len(text)
+                    'text_length': text_length,
+                    'extraction': self.last_extraction.timings() if self.last_extraction else None,
+                    'from_cache': cached is not None
                 }
             else:
                 return {
@@ -235,6 +214,8 @@ class PDFImporter:
             self.db.query(Metadata).filter(Metadata.constitution_id == constitution_id).delete()
             
             self.db.commit()
+            invalidate_articles_ranker()
+            invalidate_constitution(constitution_id)
             logger.info(f"🗑️ Articles supprimés pour constitution_id {constitution_id}")
             return True
             
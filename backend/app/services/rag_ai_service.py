@@ -4,6 +4,7 @@ import sys
 from typing import List, Dict, Any, Tuple, Optional
 from sqlalchemy.orm import Session
 from app.models.constitution import Constitution
+from app.services.deadline import DeadlineExceeded, deadline_scope, run_with_deadline
 import openai
 import re
 
@@ -141,19 +142,10 @@ class RAGAIService:
             }
         
         try:
-            # Timeout pour éviter les réponses trop lentes
-            import signal
-            
-            def timeout_handler(signum, frame):
-                raise TimeoutError("Recherche RAG trop lente")
-            
-            # Définir un timeout de 5 secondes
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(5)
-            
+            # Deadline coopérative de 5 secondes (signal.alarm ne fonctionne pas hors du thread principal)
             try:
-                response = self.qa_chain(query)
-                signal.alarm(0)  # Annuler le timeout
+                with deadline_scope(5):
+                    response = run_with_deadline(self.qa_chain, query, stage="chaîne RAG")
                 
                 # Extraire les sources
                 sources = []
@@ -170,8 +162,7 @@ class RAGAIService:
                     "confidence": 0.8  # RAG avec GPT-3.5-turbo
                 }
                 
-            except TimeoutError:
-                signal.alarm(0)
+            except DeadlineExceeded:
                 return {
                     "answer": "Désolé, la recherche prend trop de temps. Essayez une question plus spécifique.",
                     "sources": [],
@@ -0,0 +1,187 @@
+"""
+Cache mémoire borné LRU + TTL
+Bornes en nombre d'entrées et en octets (approximatifs), expiration balayée en arrière-plan,
+compteurs de hits/misses/évictions protégés par le même verrou que les données
+"""
+
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def approximate_size(value: Any) -> int:
+    """Taille approximative (octets) d'une valeur composée de dict/list/str/nombres"""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class LRUTTLCache:
+    """
+    Cache thread-safe : les entrées les moins récemment lues sont évincées dès que
+    max_entries ou max_bytes est dépassé ; les entrées expirées sont ignorées à la lecture
+    et supprimées périodiquement par un thread de balayage
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1000,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttl: float = 3600,
+        sweep_interval: float = 60,
+        sizer: Callable[[Any], int] = approximate_size
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._sizer = sizer
+
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._stop_event = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Valeur associée à la clé, ou None si absente ou expirée"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Ajoute ou remplace une entrée puis évince jusqu'à respecter les bornes"""
+        size = self._sizer(value)
+        if size > self.max_bytes:
+            logger.warning(f"⚠️ Cache {self.name}: entrée de {size} octets ignorée (limite {self.max_bytes})")
+            return
+
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = _Entry(value, expires_at, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+        self._ensure_sweeper()
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+
+    def sweep(self) -> int:
+        """Supprime les entrées expirées ; retourne le nombre d'entrées supprimées"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._data.items() if entry.expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def _ensure_sweeper(self):
+        """Démarre le thread de balayage à la première écriture"""
+        if self._sweeper is not None or self.sweep_interval <= 0:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(
+                    target=self._sweep_loop,
+                    name=f"cache-sweeper-{self.name}",
+                    daemon=True
+                )
+                self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.debug(f"🧹 Cache {self.name}: {removed} entrées expirées supprimées")
+            except Exception as e:
+                logger.error(f"Erreur lors du balayage du cache {self.name}: {e}")
+
+    def stop(self):
+        """Arrête le thread de balayage"""
+        self._stop_event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
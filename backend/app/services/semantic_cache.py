@@ -0,0 +1,312 @@
+"""
+Cache sémantique des réponses : une question reformulée réutilise la réponse d'une question
+déjà traitée si leurs embeddings sont suffisamment proches (similarité cosinus)
+Les embeddings sont calculés localement (hashing de tokens normalisés et de n-grammes de caractères),
+sans appel réseau ; chaque portée (ChatNow, copilot, constitution) a son propre index et son seuil.
+Une similarité élevée ne suffit pas : numéros cités, négation et bornes (minimum / maximum)
+doivent être identiques, et chaque mot porteur de sens propre à une question doit avoir une variante
+dans l'autre (« présidentiel » / « président ») ; sinon deux questions proches (« qui nomme » / « qui révoque »,
+« état d'urgence » / « état de siège ») auraient la même réponse alors que le droit diffère
+"""
+
+import time
+import zlib
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.bm25_ranker import STOPWORDS
+from app.services.text_normalizer import stem, tokenize
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mots interrogatifs sans valeur discriminante pour comparer deux questions
+QUESTION_WORDS = {
+    "quel", "quelle", "quels", "quelles", "comment", "combien", "pourquoi", "quand", "ou",
+    "quoi", "dit", "dis", "peut", "peux", "on", "il", "elle", "ils", "y", "t", "moi", "me"
+}
+
+# Mots de négation : gardés dans l'embedding (« ne », « pas » sont des mots vides pour BM25)
+# et exigés à l'identique entre deux questions
+NEGATION_WORDS = {"ne", "pas", "non", "jamais", "aucun", "aucune", "ni", "nul", "nulle", "sans", "rien"}
+
+# Bornes opposées : « âge minimum » et « âge maximum » ne sont jamais équivalentes
+BOUND_WORDS = {"minimum", "maximum", "minimal", "maximal", "minimale", "maximale", "min", "max"}
+
+# Portée de ChatNow, qui ne travaille que sur la constitution de 02.txt
+CHATNOW_SCOPE = "chatnow"
+
+EMBEDDING_DIM = 512
+_CHAR_NGRAM = 4
+
+# Préfixe commun minimal de deux racines considérées comme variantes d'un même mot
+_VARIANT_PREFIX = 5
+
+
+def _bucket(feature: str) -> int:
+    # crc32 est stable d'un processus à l'autre, contrairement à hash()
+    return zlib.crc32(feature.encode("utf-8")) % EMBEDDING_DIM
+
+
+def question_markers(question: str) -> frozenset:
+    """
+    Marqueurs qui doivent être identiques pour réutiliser une réponse : numéros cités (articles, alinéas),
+    présence d'une négation, bornes citées
+    """
+    markers = set()
+    for token in tokenize(question):
+        if token.isdigit() or token in BOUND_WORDS:
+            markers.add(token)
+        elif token in NEGATION_WORDS:
+            markers.add("negation")
+    return frozenset(markers)
+
+
+def _content_tokens(question: str) -> List[str]:
+    """Mots porteurs de sens (négations comprises), hors mots vides et mots interrogatifs"""
+    return [
+        token for token in tokenize(question)
+        if token in NEGATION_WORDS or not (token in STOPWORDS or token in QUESTION_WORDS)
+    ]
+
+
+def content_stems(question: str) -> frozenset:
+    return frozenset(stem(token) for token in _content_tokens(question))
+
+
+def _has_variant(root: str, others: frozenset) -> bool:
+    return any(
+        root[:_VARIANT_PREFIX] == other[:_VARIANT_PREFIX]
+        for other in others
+        if len(root) >= _VARIANT_PREFIX and len(other) >= _VARIANT_PREFIX
+    )
+
+
+def same_content(stems: frozenset, other_stems: frozenset) -> bool:
+    """
+    Les racines propres à l'une des deux questions ont toutes une variante dans l'autre :
+    une reformulation (ordre, flexion, forme interrogative) passe, un mot de contenu différent non
+    """
+    return all(_has_variant(root, other_stems) for root in stems - other_stems) and all(
+        _has_variant(root, stems) for root in other_stems - stems
+    )
+
+
+def embed_question(question: str) -> Optional["np.ndarray"]:
+    """
+    Embedding local d'une question normalisée : racines des mots porteurs de sens (négations comprises)
+    et n-grammes de caractères ("presidentiel" reste proche de "president"), normalisé L2
+    """
+    import numpy as np
+
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for token in _content_tokens(question):
+        root = stem(token)
+        vector[_bucket("w:" + root)] += 1.0
+        padded = f"#{root}#"
+        for i in range(max(1, len(padded) - _CHAR_NGRAM + 1)):
+            vector[_bucket("c:" + padded[i:i + _CHAR_NGRAM])] += 0.5
+
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return None
+    return vector / norm
+
+
+class _ScopeIndex:
+    """Questions déjà traitées d'une portée : matrice d'embeddings + réponses associées"""
+
+    def __init__(self):
+        self.vectors: List["np.ndarray"] = []
+        self.questions: List[str] = []
+        self.markers: List[frozenset] = []
+        self.stems: List[frozenset] = []
+        self.answers: List[Any] = []
+        self.expires_at: List[float] = []
+        self._matrix: Optional["np.ndarray"] = None
+
+    def matrix(self) -> "np.ndarray":
+        import numpy as np
+
+        if self._matrix is None:
+            self._matrix = np.vstack(self.vectors) if self.vectors else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        return self._matrix
+
+    def add(self, vector: "np.ndarray", question: str, answer: Any, expires_at: float, max_entries: int):
+        self.vectors.append(vector)
+        self.questions.append(question)
+        self.markers.append(question_markers(question))
+        self.stems.append(content_stems(question))
+        self.answers.append(answer)
+        self.expires_at.append(expires_at)
+        if len(self.vectors) > max_entries:
+            self.remove([0])
+        self._matrix = None
+
+    def remove(self, positions: List[int]):
+        for position in sorted(positions, reverse=True):
+            del self.vectors[position]
+            del self.questions[position]
+            del self.markers[position]
+            del self.stems[position]
+            del self.answers[position]
+            del self.expires_at[position]
+        self._matrix = None
+
+
+class SemanticCache:
+    """
+    Recherche du plus proche voisin par produit matriciel sur des vecteurs normalisés
+    (recherche exacte, suffisante pour quelques milliers de questions par portée)
+    """
+
+    def __init__(
+        self,
+        default_threshold: float = 0.82,
+        thresholds: Optional[Dict[str, float]] = None,
+        max_entries_per_scope: int = 2000,
+        ttl: float = 24 * 3600
+    ):
+        self.default_threshold = default_threshold
+        self.thresholds = dict(thresholds or {})
+        self.max_entries_per_scope = max_entries_per_scope
+        self.ttl = ttl
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def threshold_for(self, scope: str) -> float:
+        return self.thresholds.get(scope, self.default_threshold)
+
+    def set_threshold(self, scope: str, threshold: float):
+        with self._lock:
+            self.thresholds[scope] = threshold
+
+    def lookup(self, question: str, scope: str) -> Optional[Tuple[Any, float]]:
+        """Réponse de la question la plus proche si sa similarité atteint le seuil de la portée"""
+        vector = embed_question(question)
+        with self._lock:
+            index = self._scopes.get(scope)
+            if vector is None or index is None or not index.vectors:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            expired = [i for i, expires_at in enumerate(index.expires_at) if expires_at <= now]
+            if expired:
+                index.remove(expired)
+                if not index.vectors:
+                    self.misses += 1
+                    return None
+
+            similarities = index.matrix() @ vector
+            markers = question_markers(question)
+            for position, entry_markers in enumerate(index.markers):
+                if entry_markers != markers:
+                    similarities[position] = -1.0
+            threshold = self.threshold_for(scope)
+            stems = content_stems(question)
+            # Candidats au-dessus du seuil, du plus proche au moins proche : le premier de même contenu
+            candidates = sorted(
+                (int(position) for position in (similarities >= threshold).nonzero()[0]),
+                key=lambda position: -similarities[position]
+            )
+            best = next((position for position in candidates if same_content(stems, index.stems[position])), None)
+            if best is None:
+                self.misses += 1
+                return None
+            similarity = float(similarities[best])
+
+            self.hits += 1
+            logger.info(
+                f"🧠 Cache sémantique ({scope}): '{question[:50]}' ≈ '{index.questions[best][:50]}' "
+                f"(similarité {similarity:.2f})"
+            )
+            return index.answers[best], similarity
+
+    def ensure_scope(self, scope: str, loader: Callable[[], Iterable[Tuple[str, Any, float]]]):
+        """
+        Initialise une portée une seule fois à partir de (question, réponse, expiration en timestamp),
+        par exemple les réponses déjà persistées en base
+        """
+        if scope in self._scopes:
+            return
+        with self._lock:
+            if scope in self._scopes:
+                return
+            index = _ScopeIndex()
+            loaded = 0
+            for question, answer, expires_at in loader():
+                vector = embed_question(question)
+                if vector is not None:
+                    index.add(vector, question, answer, expires_at, self.max_entries_per_scope)
+                    loaded += 1
+            self._scopes[scope] = index
+            if loaded:
+                logger.info(f"🧠 Cache sémantique ({scope}): {loaded} questions chargées")
+
+    def store(self, question: str, answer: Any, scope: str, ttl: Optional[float] = None):
+        vector = embed_question(question)
+        if vector is None:
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            index = self._scopes.setdefault(scope, _ScopeIndex())
+            index.add(vector, question, answer, expires_at, self.max_entries_per_scope)
+
+    def clear(self, scope: Optional[str] = None):
+        with self._lock:
+            if scope is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(scope, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "default_threshold": self.default_threshold,
+                "scopes": {
+                    scope: {"entries": len(index.vectors), "threshold": self.threshold_for(scope)}
+                    for scope, index in self._scopes.items()
+                }
+            }
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Instance partagée par le processus"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    default_threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                    thresholds=settings.SEMANTIC_CACHE_SCOPE_THRESHOLDS,
+                    max_entries_per_scope=settings.SEMANTIC_CACHE_MAX_ENTRIES_PER_SCOPE
+                )
+    return _semantic_cache
+
+
+def constitution_scope(route: str, constitution_id: int) -> str:
+    """Portée du cache pour une route de chat d'une constitution donnée ("pdf:3", "articles:3")"""
+    return f"{route}:{constitution_id}"
+
+
+def invalidate_constitution(constitution_id: int):
+    """Oublie les réponses d'une constitution dont les articles ont changé"""
+    cache = get_semantic_cache()
+    for route in ("pdf", "articles"):
+        cache.clear(constitution_scope(route, constitution_id))
@@ -0,0 +1,309 @@
+"""
+Cache de réponses à deux niveaux commun aux workers et aux deux piles de chat (ChatNow, copilot)
+- L1 : LRUTTLCache du processus (lecture sans I/O, TTL court pour borner l'écart entre workers)
+- L2 : partagé par tous les workers — SQLite en mode WAL (index sur l'expiration) ou serveur
+  parlant le protocole Redis (redis-py, ou un client factice compatible pour les tests)
+Les valeurs sont sérialisées en JSON ; chaque pile utilise son propre espace de noms
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.response_cache import LRUTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'écritures entre deux purges des entrées expirées du L2 SQLite
+_PURGE_EVERY = 500
+
+
+class SQLiteL2Cache:
+    """
+    Table (namespace, key) → valeur JSON, expires_at indexé : la lecture ignore les entrées expirées,
+    la purge périodique les supprime par l'index. WAL : les lectures des autres workers ne bloquent pas
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: str, ttl: float):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, time.time() + ttl)
+            )
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def delete(self, namespace: str, key: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def purge_expired(self) -> int:
+        with self._connection() as connection:
+            return connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def count(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+class RedisL2Cache:
+    """
+    Backend protocole Redis : clés "prefix:namespace:key" avec expiration native (SET EX)
+    client : redis.Redis, ou tout objet offrant get / set(ex=) / delete / scan_iter (ex. fakeredis)
+    """
+
+    backend = "redis"
+
+    def __init__(self, client: Any, prefix: str = "constitutionia:cache"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisL2Cache":
+        import redis
+
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        value = self.client.get(self._key(namespace, key))
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, namespace: str, key: str, value: str, ttl: float):
+        self.client.set(self._key(namespace, key), value, ex=max(1, int(ttl)))
+
+    def delete(self, namespace: str, key: str):
+        self.client.delete(self._key(namespace, key))
+
+    def clear(self, namespace: str):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:{namespace}:*", count=500))
+        for start in range(0, len(keys), 500):
+            self.client.delete(*keys[start:start + 500])
+
+    def purge_expired(self) -> int:
+        return 0  # expiration gérée par le serveur
+
+    def count(self) -> Optional[int]:
+        return None
+
+
+class TieredCache:
+    """
+    Vue d'un espace de noms : get lit L1 puis L2 (un hit L2 est recopié en L1), set écrit les deux
+    Une erreur du L2 est journalisée et comptée, jamais propagée : le cache L1 continue de servir
+    """
+
+    def __init__(self, namespace: str, l1: LRUTTLCache, l2: Optional[Any], ttl: float, l1_ttl: float):
+        self.namespace = namespace
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl = ttl
+        # Sans L2, aucun autre worker ne peut invalider : le L1 garde le TTL complet
+        self.l1_ttl = min(ttl, l1_ttl) if l2 is not None else ttl
+        self._lock = threading.Lock()
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+    def __len__(self) -> int:
+        return len(self.l1)
+
+    @property
+    def hits(self) -> int:
+        return self.l1.hits + self.l2_hits
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None or self.l2 is None:
+            return value
+        try:
+            raw = self.l2.get(self.namespace, key)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache L2 ({self.namespace}) indisponible en lecture: {e}")
+            self._count("l2_errors")
+            return None
+        if raw is None:
+            self._count("l2_misses")
+            return None
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            # Ligne illisible : défaut de cache, la réponse sera recalculée puis réécrite
+            logger.warning(f"⚠️ Cache L2 ({self.namespace}) : entrée illisible ignorée: {e}")
+            self._count("l2_errors")
+            self._count("l2_misses")
+            return None
+        self._count("l2_hits")
+        self.l1.set(key, value, ttl=self.l1_ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        if self.l2 is None:
+            self.l1.set(key, value, ttl=ttl)
+            return
+        self.l1.set(key, value, ttl=min(ttl, self.l1_ttl))
+        try:
+            self.l2.set(self.namespace, key, json.dumps(value, ensure_ascii=False, default=str), ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache L2 ({self.namespace}) indisponible en écriture: {e}")
+            self._count("l2_errors")
+
+    def delete(self, key: str):
+        self.l1.delete(key)
+        if self.l2 is not None:
+            try:
+                self.l2.delete(self.namespace, key)
+            except Exception as e:
+                logger.warning(f"⚠️ Cache L2 ({self.namespace}) indisponible: {e}")
+                self._count("l2_errors")
+
+    def clear(self):
+        """Vide l'espace de noms (L1 de ce worker et L2 partagé ; les L1 des autres expirent sous l1_ttl)"""
+        self.l1.clear()
+        if self.l2 is not None:
+            try:
+                self.l2.clear(self.namespace)
+            except Exception as e:
+                logger.warning(f"⚠️ Cache L2 ({self.namespace}) indisponible: {e}")
+                self._count("l2_errors")
+
+    def get_stats(self) -> Dict[str, Any]:
+        l1 = self.l1.get_stats()
+        with self._lock:
+            l2_lookups = self.l2_hits + self.l2_misses
+            l2 = {
+                "backend": getattr(self.l2, "backend", None),
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+                "hit_rate": (self.l2_hits / l2_lookups) if l2_lookups else 0.0
+            }
+        # Chaque recherche passe par L1 : ses compteurs donnent le nombre total de recherches
+        lookups = l1["hits"] + l1["misses"]
+        hits = l1["hits"] + l2["hits"]
+        return {
+            "namespace": self.namespace,
+            "entries": l1["entries"],
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "l1": l1,
+            "l2": l2
+        }
+
+
+def create_l2_backend() -> Optional[Any]:
+    """Backend L2 configuré : "sqlite" (défaut), "redis" (SHARED_CACHE_URL) ou "none" (L1 seul)"""
+    backend = settings.SHARED_CACHE_BACKEND.lower()
+    try:
+        if backend == "sqlite":
+            return SQLiteL2Cache(settings.SHARED_CACHE_PATH)
+        if backend == "redis":
+            return RedisL2Cache.from_url(settings.SHARED_CACHE_URL)
+        if backend == "none":
+            return None
+    except Exception as e:
+        logger.error(f"❌ Cache L2 {backend} indisponible, cache mémoire seul: {e}")
+        return None
+    raise ValueError(f"Backend de cache partagé inconnu: {backend}")
+
+
+_l2_backend: Optional[Any] = None
+_l2_initialized = False
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(namespace: str) -> TieredCache:
+    """Cache à deux niveaux d'un espace de noms ("chatnow", "copilot") ; le L2 est commun au processus"""
+    global _l2_backend, _l2_initialized
+    cache = _caches.get(namespace)
+    if cache is not None:
+        return cache
+    with _caches_lock:
+        if namespace not in _caches:
+            if not _l2_initialized:
+                _l2_backend = create_l2_backend()
+                _l2_initialized = True
+            l1 = LRUTTLCache(
+                f"responses-{namespace}",
+                max_entries=settings.AI_RESPONSE_CACHE_MAX_ENTRIES,
+                max_bytes=settings.AI_RESPONSE_CACHE_MAX_BYTES,
+                ttl=settings.SHARED_CACHE_L1_TTL_SECONDS
+            )
+            _caches[namespace] = TieredCache(
+                namespace,
+                l1,
+                _l2_backend,
+                ttl=settings.AI_CACHE_TTL_SECONDS,
+                l1_ttl=settings.SHARED_CACHE_L1_TTL_SECONDS
+            )
+        return _caches[namespace]
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Métriques par espace de noms et par niveau"""
+    with _caches_lock:
+        caches = dict(_caches)
+    stats: Dict[str, Any] = {name: cache.get_stats() for name, cache in caches.items()}
+    if _l2_backend is not None:
+        try:
+            stats["l2_entries"] = _l2_backend.count()
+        except Exception:
+            stats["l2_entries"] = None
+    return stats
@@ -0,0 +1,383 @@
+"""
+Index en lecture seule partagé par les workers uvicorn/gunicorn via mmap
+Une génération est un dossier de fichiers .npy / .bin (vecteurs des chunks, texte et métadonnées,
+postings BM25 des articles au format CSR) que chaque worker mappe en lecture : les pages sont
+partagées par le cache du noyau au lieu d'une copie FAISS et d'un index BM25 par processus.
+Le worker qui reconstruit l'index publie une nouvelle génération puis bascule le fichier CURRENT
+par renommage atomique ; les autres la détectent à la requête suivante
+"""
+
+import bisect
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+
+# Intervalle minimal entre deux lectures de CURRENT par un worker (secondes)
+_CHECK_INTERVAL = 1.0
+
+
+class SharedDocument:
+    """Passage retourné par la recherche (mêmes attributs qu'un Document LangChain)"""
+
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, page_content: str, metadata: Dict[str, Any]):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def _partition_key(partition: Optional[Hashable]) -> str:
+    return "" if partition is None else str(partition)
+
+
+def _write_blobs(directory: str, name: str, values: Iterable[bytes]):
+    """Concatène des chaînes encodées dans name.bin ; name_offsets.npy donne les bornes de chacune"""
+    offsets = [0]
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as handle:
+        for value in values:
+            handle.write(value)
+            offsets.append(offsets[-1] + len(value))
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+
+class _Blobs:
+    """Chaînes d'un fichier .bin mappé, décodées à la demande"""
+
+    def __init__(self, directory: str, name: str):
+        path = os.path.join(directory, f"{name}.bin")
+        # np.memmap refuse un fichier vide
+        self.data = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, np.uint8)
+        self.offsets = np.load(os.path.join(directory, f"{name}_offsets.npy"), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.data[int(self.offsets[index]):int(self.offsets[index + 1])].tobytes().decode("utf-8")
+
+
+class _SortedKeys:
+    """Vue séquence des clés triées, pour une recherche dichotomique sans charger le vocabulaire"""
+
+    def __init__(self, blobs: _Blobs):
+        self.blobs = blobs
+
+    def __len__(self) -> int:
+        return len(self.blobs)
+
+    def __getitem__(self, index):
+        return self.blobs[index]
+
+
+class MappedBM25Ranker:
+    """
+    Postings BM25 précalculés (cf. BM25Ranker) lus depuis des tableaux CSR mappés :
+    clé "partition\\x1ftoken" triée → [indptr[i], indptr[i+1]) dans docs / weights
+    """
+
+    def __init__(self, directory: str, partitions: Dict[str, int], built_at: float):
+        self._keys = _SortedKeys(_Blobs(directory, "terms"))
+        self._indptr = np.load(os.path.join(directory, "postings_indptr.npy"), mmap_mode="r")
+        self._docs = np.load(os.path.join(directory, "postings_docs.npy"), mmap_mode="r")
+        self._weights = np.load(os.path.join(directory, "postings_weights.npy"), mmap_mode="r")
+        self._partitions = partitions
+        self.built_at = built_at
+
+    @property
+    def is_built(self) -> bool:
+        return True
+
+    @property
+    def document_count(self) -> int:
+        return sum(self._partitions.values())
+
+    def partition_size(self, partition: Optional[Hashable] = None) -> int:
+        return self._partitions.get(_partition_key(partition), 0)
+
+    def _postings(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        index = bisect.bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            return self._docs[0:0], self._weights[0:0]
+        start, end = int(self._indptr[index]), int(self._indptr[index + 1])
+        return self._docs[start:end], self._weights[start:end]
+
+    def score(self, query: str, partition: Optional[Hashable] = None) -> Dict[int, float]:
+        from app.services.bm25_ranker import tokenize_for_ranking
+
+        prefix = f"{_partition_key(partition)}\x1f"
+        scores: Dict[int, float] = {}
+        for token in set(tokenize_for_ranking(query)):
+            docs, weights = self._postings(prefix + token)
+            for doc_id, weight in zip(docs.tolist(), weights.tolist()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        return scores
+
+    def search(self, query: str, partition: Optional[Hashable] = None, top_k: int = 5) -> List[Tuple[int, float]]:
+        scores = self.score(query, partition)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k] if top_k is not None else ranked
+
+
+class SharedIndex:
+    """Une génération mappée en lecture seule : recherche vectorielle exacte (L2) et postings BM25"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as handle:
+            self.manifest: Dict[str, Any] = json.load(handle)
+        self.generation: str = self.manifest["generation"]
+        self.created_at: float = self.manifest["created_at"]
+        self.embedding_model: str = self.manifest["embedding_model"]
+
+        self.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        self.norms = np.load(os.path.join(directory, "norms.npy"), mmap_mode="r")
+        self.constitution_ids = np.load(os.path.join(directory, "constitution_ids.npy"), mmap_mode="r")
+        self.texts = _Blobs(directory, "texts")
+        self.metadatas = _Blobs(directory, "metadatas")
+        self.ranker: Optional[MappedBM25Ranker] = None
+        if self.manifest.get("bm25_partitions") is not None:
+            self.ranker = MappedBM25Ranker(directory, self.manifest["bm25_partitions"], self.created_at)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def document(self, index: int) -> SharedDocument:
+        return SharedDocument(self.texts[index], json.loads(self.metadatas[index]))
+
+    def similarity_search_by_vector(
+        self,
+        vector: Sequence[float],
+        k: int = 4,
+        constitution_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[SharedDocument]:
+        """
+        k chunks les plus proches (distance L2, comme l'index FAISS plat) ; constitution_id restreint
+        les candidats, filters est appliqué aux fetch_k meilleurs comme le filtre FAISS de LangChain
+        """
+        if not len(self) or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        candidates = None
+        if constitution_id is not None:
+            candidates = np.flatnonzero(np.asarray(self.constitution_ids) == constitution_id)
+            if not len(candidates):
+                return []
+            vectors, norms = self.vectors[candidates], self.norms[candidates]
+        else:
+            vectors, norms = self.vectors, self.norms
+        # ||v - q||² = ||v||² - 2 v·q + ||q||² (le dernier terme ne change pas l'ordre)
+        distances = norms - 2.0 * (vectors @ query)
+
+        fetch_k = max(k * 10, 50) if filters else k
+        fetch_k = min(fetch_k, len(distances))
+        top = np.argpartition(distances, fetch_k - 1)[:fetch_k]
+        top = top[np.argsort(distances[top], kind="stable")]
+
+        results: List[SharedDocument] = []
+        for position in top.tolist():
+            index = int(candidates[position]) if candidates is not None else position
+            document = self.document(index)
+            if filters and any(document.metadata.get(field) != value for field, value in filters.items()):
+                continue
+            results.append(document)
+            if len(results) >= k:
+                break
+        return results
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "generation": self.generation,
+            "created_at": self.created_at,
+            "embedding_model": self.embedding_model,
+            "chunks": len(self),
+            "revision": self.manifest.get("revision"),
+            "dimension": self.manifest.get("dimension"),
+            "bm25_documents": self.ranker.document_count if self.ranker else None
+        }
+
+
+def _write_ranker(directory: str, ranker) -> Dict[str, int]:
+    """Postings d'un BM25Ranker en CSR trié par clé ; retourne le nombre de documents par partition"""
+    entries = sorted(
+        (f"{_partition_key(partition)}\x1f{token}", postings)
+        for partition, token, postings in ranker.iter_postings()
+    )
+    indptr = [0]
+    docs: List[int] = []
+    weights: List[float] = []
+    for _, postings in entries:
+        for doc_id, weight in postings:
+            docs.append(doc_id)
+            weights.append(weight)
+        indptr.append(len(docs))
+    _write_blobs(directory, "terms", (key.encode("utf-8") for key, _ in entries))
+    np.save(os.path.join(directory, "postings_indptr.npy"), np.asarray(indptr, dtype=np.int64))
+    np.save(os.path.join(directory, "postings_docs.npy"), np.asarray(docs, dtype=np.int64))
+    np.save(os.path.join(directory, "postings_weights.npy"), np.asarray(weights, dtype=np.float32))
+    return {_partition_key(partition): size for partition, size in ranker.partition_sizes().items()}
+
+
+def publish_generation(
+    vectors: np.ndarray,
+    texts: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+    embedding_model: str,
+    ranker=None,
+    root: Optional[str] = None,
+    keep: int = 2,
+    revision: Optional[str] = None
+) -> Optional[str]:
+    """
+    Écrit une génération complète dans un dossier temporaire, la renomme puis bascule CURRENT
+    (os.replace, atomique) ; un verrou fichier sérialise les publications des workers.
+    revision : révision de l'index FAISS publié ; si CURRENT pointe déjà sur une révision identique
+    ou plus récente, rien n'est publié (retourne None) : une copie périmée ne remplace jamais l'index courant.
+    Les anciennes générations au-delà de keep sont supprimées : un worker qui les mappe encore
+    garde ses pages valides jusqu'à sa bascule (fichiers supprimés mais toujours ouverts)
+    """
+    root = root or settings.SHARED_INDEX_PATH
+    os.makedirs(root, exist_ok=True)
+    generation = f"gen-{int(time.time() * 1000)}-{os.getpid()}"
+    tmp_directory = os.path.join(root, f".tmp-{generation}")
+    os.makedirs(tmp_directory)
+    try:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not len(texts):
+            vectors = vectors.reshape(0, vectors.shape[-1] if vectors.ndim == 2 else 0)
+        np.save(os.path.join(tmp_directory, "vectors.npy"), vectors)
+        np.save(os.path.join(tmp_directory, "norms.npy"), np.einsum("ij,ij->i", vectors, vectors).astype(np.float32))
+        np.save(
+            os.path.join(tmp_directory, "constitution_ids.npy"),
+            np.asarray([m.get("constitution_id") if m.get("constitution_id") is not None else -1 for m in metadatas],
+                       dtype=np.int64)
+        )
+        _write_blobs(tmp_directory, "texts", (text.encode("utf-8") for text in texts))
+        _write_blobs(tmp_directory, "metadatas", (json.dumps(m, ensure_ascii=False, default=str).encode("utf-8")
+                                                  for m in metadatas))
+        manifest = {
+            "generation": generation,
+            "created_at": time.time(),
+            "embedding_model": embedding_model,
+            "dimension": int(vectors.shape[1]),
+            "chunks": len(texts),
+            "revision": revision,
+            "bm25_partitions": _write_ranker(tmp_directory, ranker) if ranker is not None else None
+        }
+        with open(os.path.join(tmp_directory, MANIFEST_FILE), "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+
+        with open(os.path.join(root, LOCK_FILE), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            current_revision = _current_revision(root)
+            if current_revision is not None and (
+                revision is None or _revision_key(current_revision) >= _revision_key(revision)
+            ):
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+                logger.info(f"🗺️ Index partagé déjà à jour (révision {current_revision}), publication ignorée")
+                return None
+            os.rename(tmp_directory, os.path.join(root, generation))
+            current_tmp = os.path.join(root, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+            with open(current_tmp, "w", encoding="utf-8") as handle:
+                handle.write(generation)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+            _prune_generations(root, keep)
+    except Exception:
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        raise
+
+    logger.info(f"🗺️ Index partagé publié: {generation} ({len(texts)} chunks)")
+    return generation
+
+
+def _revision_key(revision: str) -> Tuple[int, ...]:
+    """Révision "<horodatage ns>-<pid>" comparable dans l'ordre des sauvegardes"""
+    try:
+        return tuple(int(part) for part in revision.split("-"))
+    except (AttributeError, ValueError):
+        return (0,)
+
+
+def _current_revision(root: str) -> Optional[str]:
+    """Révision FAISS de la génération pointée par CURRENT (None si absente ou antérieure aux révisions)"""
+    generation = read_current_generation(root)
+    if generation is None:
+        return None
+    try:
+        with open(os.path.join(root, generation, MANIFEST_FILE), encoding="utf-8") as handle:
+            return json.load(handle).get("revision")
+    except (OSError, ValueError):
+        return None
+
+
+def _prune_generations(root: str, keep: int):
+    generations = sorted(
+        (name for name in os.listdir(root) if name.startswith("gen-")),
+        key=lambda name: int(name.split("-")[1])
+    )
+    for name in generations[:-keep]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def read_current_generation(root: Optional[str] = None) -> Optional[str]:
+    try:
+        with open(os.path.join(root or settings.SHARED_INDEX_PATH, CURRENT_FILE), encoding="utf-8") as handle:
+            return handle.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+_current_index: Optional[SharedIndex] = None
+_last_check = 0.0
+_index_lock = threading.Lock()
+
+
+def get_shared_index(root: Optional[str] = None) -> Optional[SharedIndex]:
+    """
+    Génération courante mappée par ce worker (None si désactivé ou jamais publié) ;
+    CURRENT est relu au plus une fois par seconde, une nouvelle génération remplace l'ancienne
+    """
+    global _current_index, _last_check
+    if not settings.SHARED_INDEX_ENABLED:
+        return None
+    now = time.monotonic()
+    if now - _last_check < _CHECK_INTERVAL:
+        return _current_index
+    with _index_lock:
+        if now - _last_check < _CHECK_INTERVAL:
+            return _current_index
+        _last_check = now
+        root = root or settings.SHARED_INDEX_PATH
+        generation = read_current_generation(root)
+        if generation is None:
+            _current_index = None
+        elif _current_index is None or _current_index.generation != generation:
+            try:
+                _current_index = SharedIndex(os.path.join(root, generation))
+                logger.info(f"🗺️ Index partagé mappé: {generation} ({len(_current_index)} chunks)")
+            except Exception as e:
+                logger.error(f"❌ Index partagé {generation} illisible: {e}")
+        return _current_index
+
+
+def reset_shared_index_check():
+    """Force la relecture de CURRENT au prochain appel (après une publication par ce worker)"""
+    global _last_check
+    _last_check = 0.0
@@ -0,0 +1,106 @@
+"""
+Regroupement des requêtes identiques en cours (single-flight)
+Quand la même question arrive plusieurs fois avant que la première réponse ne soit en cache,
+seule la première exécution (le "leader") appelle le LLM ; les doublons attendent son résultat,
+au plus le temps restant de leur propre deadline
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.deadline import DeadlineExceeded, remaining_time
+from app.services.text_normalizer import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+def flight_key(question: str, scope: str, extra: Optional[str] = None) -> str:
+    """Clé d'une requête : question normalisée + portée (constitution), et contexte éventuel"""
+    parts = [scope, " ".join(normalize_text(question).split())]
+    if extra:
+        parts.append(extra)
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class _FlightStats:
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+class SingleFlight(_FlightStats):
+    """Variante pour du code synchrone exécuté dans plusieurs threads"""
+
+    def __init__(self):
+        super().__init__()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Résultat de fn, calculé une seule fois pour les appels simultanés de même clé ;
+        un doublon lève DeadlineExceeded si sa deadline expire avant la fin du leader
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            logger.info("🔗 Requête identique en cours : attente du résultat partagé")
+            try:
+                return future.result(timeout=remaining_time())
+            except FutureTimeoutError:
+                logger.warning("⏱️ Délai dépassé en attendant la requête identique en cours")
+                raise DeadlineExceeded("requête identique en cours")
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class AsyncSingleFlight(_FlightStats):
+    """Variante asyncio : les doublons attendent la tâche du leader"""
+
+    def __init__(self):
+        super().__init__()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info("🔗 Requête identique en cours : attente du résultat partagé")
+            # shield : l'annulation d'un appelant (client déconnecté) n'interrompt pas les autres
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        self.leaders += 1
+
+        def forget(finished: asyncio.Task):
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+
+        task.add_done_callback(forget)
+        return await asyncio.shield(task)
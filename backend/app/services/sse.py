@@ -0,0 +1,18 @@
+"""
+Formatage des réponses Server-Sent Events (text/event-stream) des routes de chat en streaming
+"""
+
+import json
+from typing import Any
+
+# Désactive la mise en tampon des proxies (nginx) pour que chaque fragment parte immédiatement
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Sérialise un événement SSE ; data est encodé en JSON sur une seule ligne"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
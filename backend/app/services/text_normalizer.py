@@ -0,0 +1,75 @@
+"""
+Normalisation du texte français pour la recherche
+Pliage des accents (NFKD) et de la casse, séparation des élisions ("l'article" -> "article")
+et racinisation légère ("citoyennes" -> "citoyen"), partagés par l'index, BM25 et ChatNow
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Articles et pronoms élidés devant une voyelle : l', d', qu', jusqu'...
+_ELISION_PATTERN = re.compile(r"\b(?:l|d|j|m|n|s|t|c|qu|jusqu|lorsqu|puisqu|quoiqu)['’`](?=\w)")
+
+
+def fold(text: str) -> str:
+    """Supprime les accents et la casse : "Élection" -> "election" """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def normalize_text(text: str) -> str:
+    """Texte plié (accents, casse) dont les élisions sont retirées, pour les comparaisons par sous-chaîne"""
+    return _ELISION_PATTERN.sub("", fold(text))
+
+
+@lru_cache(maxsize=4096)
+def normalize_term(term: str) -> str:
+    """normalize_text mémoïsé, pour les listes de mots-clés constantes comparées à chaque requête"""
+    return normalize_text(term)
+
+
+def contains_term(normalized_text: str, term: str) -> bool:
+    """Vrai si le terme (accentué ou non) apparaît dans un texte déjà normalisé"""
+    return normalize_term(term) in normalized_text
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens normalisés (sans racinisation)"""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(normalize_text(text))
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """
+    Racinisation légère du français (variante de l'algorithme "light" de Savoy)
+    Retire pluriel et féminin sans toucher à la dérivation : "libertés" -> "libert", "élections" -> "election"
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+
+    if token.endswith("aux") and len(token) > 4:
+        token = token[:-3] + "al"
+    elif token.endswith(("s", "x")):
+        token = token[:-1]
+
+    if len(token) > 4 and token[-1] in "re":
+        token = token[:-1]
+
+    # Consonne finale doublée : "citoyenn" -> "citoyen"
+    if len(token) > 4 and token[-1] == token[-2] and token[-1] not in "aeiouy":
+        token = token[:-1]
+
+    return token
+
+
+def stem_tokens(text: str) -> List[str]:
+    """Tokens normalisés puis racinisés"""
+    return [stem(token) for token in tokenize(text)]
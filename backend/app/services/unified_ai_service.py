@@ -1,6 +1,5 @@
 import os
 import time
-import signal
 from typing import List, Dict, Any, Tuple, Optional
 from sqlalchemy.orm import Session
 from app.models.constitution import Constitution
@@ -18,6 +17,7 @@ from langchain.prompts import PromptTemplate
 import numpy as np
 import logging
 from app.services.monitoring_service import monitoring_service
+from app.services.deadline import DeadlineExceeded, deadline_scope, run_with_deadline
 
 load_dotenv()
 
@@ -201,16 +201,10 @@ RÉPONSE:"""
             }
         
         try:
-            # Timeout avec gestion d'erreurs
-            def timeout_handler(signum, frame):
-                raise TimeoutError("Recherche RAG trop lente")
-            
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(self.timeout_seconds)
-            
+            # Deadline coopérative (signal.alarm ne fonctionne pas hors du thread principal)
             try:
-                response = self.qa_chain(query)
-                signal.alarm(0)  # Annuler le timeout
+                with deadline_scope(self.timeout_seconds):
+                    response = run_with_deadline(self.qa_chain, query, stage="chaîne RAG")
                 
                 # Extraire les sources avec plus de détails
                 sources = []
@@ -230,8 +224,7 @@ RÉPONSE:"""
                     "confidence": confidence
                 }
                 
-            except TimeoutError:
-                signal.alarm(0)
+            except DeadlineExceeded:
                 return {
                     "answer": "Désolé, la recherche prend trop de temps. Essayez une question plus spécifique.",
                     "sources": [],
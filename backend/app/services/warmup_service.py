@@ -0,0 +1,211 @@
+"""
+Préchauffage du worker au démarrage
+Charge l'index RAG (FAISS depuis le disque ou reconstruction), les clients OpenAI et les classements
+BM25, puis exécute une requête témoin : la première vraie question ne paie plus l'initialisation.
+L'état par composant (statut, durée, erreur) alimente l'endpoint /ready du répartiteur de charge
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Étapes suffisantes pour les routes CRUD / fichiers et la recherche par mots-clés (crud_ready)
+CRUD_STEPS = ("bm25_articles", "bm25_chatnow")
+
+
+class WarmupService:
+    """
+    Étapes exécutées dans l'ordre par un thread démon ; une étape « requise » en attente ou en échec
+    laisse le worker non prêt (l'index RAG l'est dès qu'il est configuré : la première question ne doit pas
+    payer son chargement), une étape optionnelle en échec le laisse prêt en mode dégradé
+    """
+
+    def __init__(self, query: Optional[str] = None):
+        self.query = query or settings.AI_WARMUP_QUERY
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: List[Tuple[str, bool, Callable[[], Optional[str]]]] = [
+            ("bm25_articles", True, self._warm_articles_ranker),
+            ("bm25_chatnow", True, self._warm_chatnow_ranker),
+            ("openai_client", False, self._warm_openai_client),
+            ("rag_index", True, self._warm_rag_index),
+            ("canned_query", False, self._warm_canned_query),
+        ]
+        self.components: Dict[str, Dict[str, Any]] = {
+            name: {"status": PENDING, "required": required, "duration_ms": None, "detail": None}
+            for name, required, _ in self.steps
+        }
+
+    # Étapes : retournent un détail facultatif ; lèvent _Skip si le composant n'est pas configuré
+
+    def _warm_articles_ranker(self) -> Optional[str]:
+        from app.database import SessionLocal
+        from app.services.bm25_ranker import get_articles_ranker
+
+        db = SessionLocal()
+        try:
+            ranker = get_articles_ranker(db)
+            return f"{ranker.document_count} articles"
+        finally:
+            db.close()
+
+    def _warm_chatnow_ranker(self) -> Optional[str]:
+        from app.database import SessionLocal
+        from app.services.bm25_ranker import get_chatnow_ranker
+
+        db = SessionLocal()
+        try:
+            ranker = get_chatnow_ranker(db)
+            return f"{ranker.document_count} articles"
+        finally:
+            db.close()
+
+    def _warm_openai_client(self) -> Optional[str]:
+        if not settings.OPENAI_API_KEY:
+            raise _Skip("OPENAI_API_KEY non définie")
+        from app.services.llm_client import get_async_openai_client, get_openai_client
+
+        get_openai_client()
+        get_async_openai_client()
+        return None
+
+    def _warm_rag_index(self) -> Optional[str]:
+        if not settings.OPENAI_API_KEY and settings.EMBEDDING_BACKEND.lower() == "openai":
+            raise _Skip("OPENAI_API_KEY non définie")
+        from app.services.optimized_ai_service import get_optimized_ai_service
+
+        service = get_optimized_ai_service()
+        if not service._initialize_rag_lazy() or not service.has_vector_index():
+            raise RuntimeError("index vectoriel indisponible")
+        return service.embedding_backend.name if service.embedding_backend else None
+
+    def _warm_canned_query(self) -> Optional[str]:
+        if self.components["rag_index"]["status"] != READY:
+            raise _Skip("index vectoriel non prêt")
+        from app.services.deadline import deadline_scope
+        from app.services.optimized_ai_service import get_optimized_ai_service
+
+        # Recherche hybride seule : embedding de la requête, FAISS et FTS, sans appel au LLM ni écriture de cache
+        with deadline_scope(settings.AI_REQUEST_TIMEOUT_SECONDS):
+            hits = get_optimized_ai_service().hybrid_search(self.query)
+        return f"{len(hits)} passages"
+
+    def run(self):
+        """Exécute toutes les étapes (bloquant) ; une étape en échec n'interrompt pas les suivantes"""
+        with self._lock:
+            self.started_at = time.time()
+            self.finished_at = None
+        logger.info("🔥 Préchauffage du worker...")
+        for name, required, step in self.steps:
+            component = self.components[name]
+            with self._lock:
+                component["status"] = RUNNING
+            start = time.perf_counter()
+            try:
+                detail = step()
+                status = READY
+            except _Skip as e:
+                detail, status = str(e), SKIPPED
+            except Exception as e:
+                detail, status = str(e), FAILED
+                logger.error(f"❌ Préchauffage {name}: {e}")
+            duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            with self._lock:
+                component.update(status=status, duration_ms=duration_ms, detail=detail)
+            logger.info(f"🔥 {name}: {status} ({duration_ms} ms)")
+        with self._lock:
+            self.finished_at = time.time()
+        logger.info(f"✅ Préchauffage terminé en {self.finished_at - self.started_at:.1f}s")
+
+    def start(self):
+        """Lance le préchauffage en arrière-plan (sans effet s'il est déjà en cours)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def disable(self):
+        """Préchauffage désactivé : rien n'est requis, chaque composant s'initialise à sa première requête"""
+        with self._lock:
+            self.started_at = self.finished_at = time.time()
+            for component in self.components.values():
+                component.update(status=SKIPPED, required=False, detail="préchauffage désactivé")
+
+    @property
+    def is_ready(self) -> bool:
+        return self.get_status()["ready"]
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        ready : toutes les étapes requises (classements BM25, index RAG s'il est configuré) sont prêtes ou
+        ignorées ; la requête témoin, optionnelle, peut encore tourner.
+        crud_ready : classements BM25 prêts, le worker sert déjà les routes CRUD / fichiers et la recherche
+        par mots-clés (pour un routage anticipé de ce trafic, /ready reste à 503).
+        status : "warming_up" (étape requise en attente), "failed" (étape requise en échec),
+        "ready" (prêt, finished indique si le préchauffage optionnel est terminé) ou "degraded"
+        (prêt, mais une étape optionnelle a échoué)
+        """
+        with self._lock:
+            finished = self.finished_at is not None
+            components = {name: dict(component) for name, component in self.components.items()}
+            total = (self.finished_at or time.time()) - self.started_at if self.started_at else None
+        required = [c for c in components.values() if c["required"]]
+        ready = self.started_at is not None and all(c["status"] in (READY, SKIPPED) for c in required)
+        crud_ready = self.started_at is not None and all(
+            components[name]["status"] in (READY, SKIPPED) for name in CRUD_STEPS
+        )
+        if ready:
+            status = "degraded" if any(c["status"] == FAILED for c in components.values()) else "ready"
+        elif finished or any(c["status"] == FAILED for c in required):
+            status = "failed"
+        else:
+            status = "warming_up"
+        return {
+            "ready": ready,
+            "crud_ready": crud_ready,
+            "status": status,
+            "finished": finished,
+            "warmup_seconds": round(total, 2) if total is not None else None,
+            "components": components
+        }
+
+
+class _Skip(Exception):
+    """Composant non configuré : étape ignorée sans bloquer la disponibilité"""
+
+
+_warmup_service: Optional[WarmupService] = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup_service() -> WarmupService:
+    """Instance du worker"""
+    global _warmup_service
+    if _warmup_service is None:
+        with _warmup_lock:
+            if _warmup_service is None:
+                _warmup_service = WarmupService()
+    return _warmup_service
+
+
+def start_warmup():
+    """Démarre le préchauffage si activé ; sinon le worker est déclaré prêt sans attendre"""
+    service = get_warmup_service()
+    if settings.AI_WARMUP_ENABLED:
+        service.start()
+    else:
+        service.disable()
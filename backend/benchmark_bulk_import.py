@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark avant/après de l'écriture des imports (articles importés, articles et mots-clés ChatNow)
+Avant : suppression de toutes les lignes puis db.add() objet par objet
+Après : bulk_writer.sync_rows (comparaison par clé, INSERT / UPDATE / DELETE en executemany)
+Trois scénarios sur une base SQLite temporaire : import initial, réimport identique,
+réimport avec une fraction des articles modifiés
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models.constitution  # noqa: F401 - table constitutions (clé étrangère des articles)
+from app.database import Base
+from app.models.constitution_data import Base as ConstitutionDataBase
+from app.models.constitution_data import ConstitutionArticle, ConstitutionKeyword
+from app.models.pdf_import import Article
+from app.services.bulk_writer import sync_rows
+
+WORDS = (
+    "droit liberté garantie président gouvernement parlement tribunal élection vote citoyen "
+    "république constitution pouvoir institution responsabilité mandat session loi peuple"
+).split()
+
+CONSTITUTION_ID = 1
+
+
+def build_articles(count: int, seed: int = 7):
+    """Articles importés et leurs équivalents ChatNow (articles + mots-clés)"""
+    rng = random.Random(seed)
+    imported, chatnow, keywords = [], [], []
+    for number in range(1, count + 1):
+        content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160)))
+        imported.append({
+            'constitution_id': CONSTITUTION_ID,
+            'article_number': f"Article {number}",
+            'title': None,
+            'content': content,
+            'part': f"TITRE {number // 60 + 1}",
+            'section': None,
+            'page_number': number // 3 + 1
+        })
+        article_keywords = sorted(set(rng.sample(WORDS, 10)))
+        chatnow.append({
+            'article_number': str(number),
+            'title': None,
+            'content': content,
+            'category': 'general',
+            'keywords': ', '.join(article_keywords)
+        })
+        for keyword in article_keywords:
+            keywords.append({
+                'keyword': keyword,
+                'article_id': str(number),
+                'context': content[:200] + '...',
+                'frequency': content.count(keyword),
+                'importance_score': 5
+            })
+    return imported, chatnow, keywords
+
+
+def edit(imported, chatnow, keywords, fraction: float, seed: int = 11):
+    """Copie des données avec une fraction des articles modifiés (contenu et mots-clés dérivés)"""
+    rng = random.Random(seed)
+    changed = set(rng.sample(range(len(imported)), max(1, int(len(imported) * fraction))))
+    imported = [dict(row, content=row['content'] + " (révisé)") if i in changed else row for i, row in enumerate(imported)]
+    chatnow = [dict(row, content=row['content'] + " (révisé)") if i in changed else row for i, row in enumerate(chatnow)]
+    changed_ids = {str(i + 1) for i in changed}
+    keywords = [dict(row, frequency=row['frequency'] + 1) if row['article_id'] in changed_ids else row for row in keywords]
+    return imported, chatnow, keywords
+
+
+def write_before(db, imported, chatnow, keywords):
+    """Ancien chemin : tout supprimer, puis un objet ORM par ligne"""
+    db.query(Article).filter(Article.constitution_id == CONSTITUTION_ID).delete()
+    for row in imported:
+        db.add(Article(**row))
+    db.query(ConstitutionArticle).delete()
+    db.query(ConstitutionKeyword).delete()
+    for row in chatnow:
+        db.add(ConstitutionArticle(**row))
+    for row in keywords:
+        db.add(ConstitutionKeyword(**row))
+    db.commit()
+
+
+def write_after(db, imported, chatnow, keywords):
+    """Nouveau chemin : comparaison par clé et écriture en masse des seules différences"""
+    table = Article.__table__
+    sync_rows(db, table, imported, ('constitution_id', 'article_number'), where=table.c.constitution_id == CONSTITUTION_ID)
+    sync_rows(db, ConstitutionArticle.__table__, chatnow, ('article_number',))
+    sync_rows(db, ConstitutionKeyword.__table__, keywords, ('article_id', 'keyword'))
+    db.commit()
+
+
+def run(writer, scenarios, repeat: int):
+    """Meilleur temps (ms) par scénario, chacun rejoué sur une base neuve"""
+    timings = {}
+    for name, setup, data in scenarios:
+        best = float("inf")
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as directory:
+                engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+                Base.metadata.create_all(engine)
+                ConstitutionDataBase.metadata.create_all(engine)
+                db = sessionmaker(bind=engine)()
+                try:
+                    if setup is not None:
+                        writer(db, *setup)
+                    start = time.perf_counter()
+                    writer(db, *data)
+                    best = min(best, time.perf_counter() - start)
+                finally:
+                    db.close()
+                    engine.dispose()
+        timings[name] = best * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=600)
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction d'articles modifiés")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    initial = build_articles(args.articles)
+    edited = edit(*initial, fraction=args.changed)
+    scenarios = [
+        ("import initial", None, initial),
+        ("réimport identique", initial, initial),
+        (f"réimport, {args.changed:.0%} modifiés", initial, edited),
+    ]
+
+    print("🧪 Benchmark de l'écriture des imports")
+    print("=" * 40)
+    print(f"📄 {args.articles} articles importés, {args.articles} articles ChatNow, {len(initial[2])} mots-clés")
+    before = run(write_before, scenarios, args.repeat)
+    after = run(write_after, scenarios, args.repeat)
+    for name, _, _ in scenarios:
+        print(f"⏱️ {name:<24} avant {before[name]:8.1f} ms   après {after[name]:8.1f} ms   x{before[name] / after[name]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
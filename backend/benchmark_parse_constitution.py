@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark du découpage des articles (PDFImporter.parse_constitution → segment_articles)
+Génère un texte de constitution synthétique d'environ 1 Mo (TITRE, CHAPITRE, articles sur
+plusieurs lignes, renvois « article N » dans le corps, pages de 3 000 caractères) et mesure
+le temps de découpage ; --legacy mesure aussi l'ancien parsing à dix expressions régulières.
+Des cas de référence (en-têtes, renvoi à un chapitre coupé en fin de ligne) sont vérifiés d'abord
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.article_segmenter import page_offsets, segment_articles
+
+ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII", "XIII", "XIV", "XV"]
+
+WORDS = (
+    "la loi garantit les droits et libertés fondamentales de tout citoyen dans le respect "
+    "de l'ordre public le président de la république veille au fonctionnement régulier des "
+    "institutions l'assemblée nationale vote les lois et contrôle l'action du gouvernement"
+).split()
+
+
+def build_text(target_bytes: int = 1024 * 1024, page_size: int = 3000, seed: int = 42):
+    """Texte synthétique (≈ target_bytes) découpé en pages : retourne (texte, débuts de page)"""
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    number = 0
+    titre = 0
+    while size < target_bytes:
+        if number % 60 == 0:
+            titre += 1
+            block = [f"TITRE {ROMAN[(titre - 1) % len(ROMAN)]} : DISPOSITIONS {titre}", "DES INSTITUTIONS"]
+        elif number % 12 == 0:
+            block = [f"CHAPITRE {ROMAN[(number // 12) % len(ROMAN)]}"]
+        else:
+            block = []
+        number += 1
+        block.append(f"Article {number} :" if number % 3 else f"Article {number}")
+        for _ in range(rng.randint(2, 8)):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18)))
+            if rng.random() < 0.1:
+                sentence += f" conformément à l'article {rng.randint(1, number)}"
+            block.append(sentence.capitalize() + ".")
+        if rng.random() < 0.2:
+            block.append("")
+        lines.extend(block)
+        size += sum(len(line) + 1 for line in block)
+
+    # Pages de taille fixe, coupées en fin de ligne comme dans une extraction page par page
+    pages, current, current_size = [], [], 0
+    for line in lines:
+        current.append(line)
+        current_size += len(line) + 1
+        if current_size >= page_size:
+            pages.append("\n".join(current))
+            current, current_size = [], 0
+    if current:
+        pages.append("\n".join(current))
+    return "\n".join(pages), page_offsets(pages)
+
+
+def legacy_parse_constitution(text: str) -> list:
+    """Ancien parsing (dix motifs re.finditer, dédoublonnage puis tri), conservé pour comparaison"""
+    patterns = [
+        r'(Article\s+\d+[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(Article\s+\d+\.?[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(ART\.\s*\d+[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(Art\.\s*\d+[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(ARTICLE\s+\d+[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(Article\s+\d+\s*:[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(Article\s+\d+\s*-[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(Article\s+\d+\s*\([^)]*\)[^\n]*)\n((?:[^\n]+\n)+)',
+        r'(Article\s+\d+[^\n]*)\n((?:[^\n]+\n)+?)(?=Article\s+\d+|$)',
+        r'(Article\s+\d+[^\n]*)\n((?:[^\n]+\n)+?)(?=Article\s+\d+|$)'
+    ]
+    articles = []
+    for pattern in patterns:
+        for match in re.finditer(pattern, text, re.VERBOSE | re.IGNORECASE | re.MULTILINE):
+            article_num = match.group(1).strip()
+            content = re.sub(r'\n+', '\n', match.group(2).strip()).strip()
+            number_match = re.search(r'(\d+)', article_num)
+            if content and len(content) > 10:
+                articles.append({
+                    'article_number': f"Article {number_match.group(1) if number_match else article_num}",
+                    'content': content
+                })
+    seen = set()
+    unique_articles = []
+    for article in articles:
+        if article['article_number'] not in seen:
+            seen.add(article['article_number'])
+            unique_articles.append(article)
+    unique_articles.sort(key=lambda x: int(re.search(r'\d+', x['article_number']).group()) if re.search(r'\d+', x['article_number']) else 0)
+    return unique_articles
+
+
+# Texte de référence et découpage attendu : (numéro, début du contenu, fin du contenu, section)
+REFERENCE_TEXT = """TITRE I : DE LA SOUVERAINETÉ
+Article 1er : La souveraineté nationale appartient au peuple.
+Article 2. - Le peuple exerce sa souveraineté par ses représentants conformément aux dispositions du
+Chapitre II du présent titre et par voie de référendum dans les conditions
+prévues par la loi organique.
+Article 3 : Le suffrage est universel, égal et secret.
+Chapitre II : Des élections
+Article 4 : Sont électeurs tous les nationaux majeurs.
+CHAPITRE III
+Article 69.  - Le Président de la République est élu au suffrage universel direct.
+"""
+
+REFERENCE_ARTICLES = [
+    ("Article 1", "La souveraineté", "au peuple.", None),
+    ("Article 2", "Le peuple exerce", "par la loi organique.", None),
+    ("Article 3", "Le suffrage", "et secret.", None),
+    ("Article 4", "Sont électeurs", "majeurs.", "Chapitre II : Des élections"),
+    ("Article 69", "Le Président", "universel direct.", "CHAPITRE III"),
+]
+
+
+def check_correctness() -> list:
+    """Écarts entre le découpage du texte de référence et le résultat attendu (liste vide si correct)"""
+    articles = segment_articles(REFERENCE_TEXT)
+    errors = []
+    if len(articles) != len(REFERENCE_ARTICLES):
+        errors.append(f"{len(articles)} articles au lieu de {len(REFERENCE_ARTICLES)}")
+    for article, (number, start, end, section) in zip(articles, REFERENCE_ARTICLES):
+        content = article['content']
+        if article['article_number'] != number or not content.startswith(start) or not content.endswith(end):
+            errors.append(f"{number}: contenu inattendu {content[:60]!r}...{content[-30:]!r}")
+        if article['section'] != section:
+            errors.append(f"{number}: section {article['section']!r} au lieu de {section!r}")
+    return errors
+
+
+def measure(function, repeat: int):
+    """Meilleur temps sur repeat exécutions (secondes) et dernier résultat"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-kb", type=int, default=1024, help="taille du texte synthétique (Ko)")
+    parser.add_argument("--file", help="texte réel à découper à la place du texte synthétique")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy", action="store_true", help="mesurer aussi l'ancien parsing (lent)")
+    args = parser.parse_args()
+
+    if args.file:
+        text, offsets = Path(args.file).read_text(encoding="utf-8"), None
+    else:
+        text, offsets = build_text(args.size_kb * 1024)
+
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print("🧪 Benchmark du découpage des articles")
+    print("=" * 40)
+    errors = check_correctness()
+    for error in errors:
+        print(f"❌ {error}")
+    if errors:
+        sys.exit(1)
+    print(f"✅ Découpage de référence correct ({len(REFERENCE_ARTICLES)} articles)")
+    print(f"📄 Texte: {size_mb:.2f} Mo, {text.count(chr(10)) + 1} lignes, {len(offsets or [])} pages")
+
+    seconds, articles = measure(lambda: segment_articles(text, offsets), args.repeat)
+    with_pages = sum(1 for article in articles if article['page_number'] is not None)
+    print(f"⚡ Une passe : {seconds * 1000:8.1f} ms  ({len(articles)} articles, {with_pages} avec page, "
+          f"{size_mb / seconds:.1f} Mo/s)")
+
+    if args.legacy:
+        legacy_seconds, legacy_articles = measure(lambda: legacy_parse_constitution(text), 1)
+        print(f"🐢 Dix motifs : {legacy_seconds * 1000:8.1f} ms  ({len(legacy_articles)} articles)")
+        print(f"📊 Accélération: x{legacy_seconds / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Profil du temps d'import de l'application (python -X importtime)
+Vérifie qu'un worker qui ne sert que les routes CRUD / fichiers démarre sous le budget
+et que la pile IA (LangChain, FAISS, modèles locaux, numpy, SDK OpenAI) n'est pas chargée à l'import.
+Deux budgets : l'import à froid complet (framework compris, ce que voit réellement un worker qui démarre)
+et les imports propres à l'application, mesurés après avoir préchargé le framework (FastAPI, SQLAlchemy,
+pydantic-settings) pour repérer les régressions de notre code
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+# Budget de l'import à froid complet de `app.main` (framework compris), en millisecondes
+COLD_IMPORT_BUDGET_MS = float(os.getenv("COLD_IMPORT_TIME_BUDGET_MS", "1000"))
+
+# Budget des imports de `app.main` hors framework, en millisecondes
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "300"))
+
+# Mesures répétées : le meilleur temps écarte le bruit de la machine (cache disque, charge)
+IMPORT_TIME_RUNS = int(os.getenv("IMPORT_TIME_RUNS", "3"))
+
+# Framework importé avant l'application (hors budget)
+FRAMEWORK_MODULES = ("fastapi", "sqlalchemy.orm", "pydantic_settings")
+
+# Modules qui ne doivent être importés qu'à l'initialisation explicite du RAG ou au premier import de PDF
+HEAVY_MODULES = (
+    "langchain",
+    "langchain_community",
+    "langchain_core",
+    "langchain_openai",
+    "faiss",
+    "sentence_transformers",
+    "torch",
+    "onnxruntime",
+    "numpy",
+    "PyPDF2",
+    "openai",
+)
+
+
+def profile_import(module: str = "app.main", preload=FRAMEWORK_MODULES):
+    """
+    Importe preload puis le module dans un interpréteur neuf et retourne
+    (temps du module en ms, {module: cumulé en µs}) ; le temps est le cumulé de l'import de premier niveau
+    du module, qui n'inclut pas les modules de preload déjà chargés
+    """
+    statements = "".join(f"import {name}; " for name in preload) + f"import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statements],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    module_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # "import time:  self [us] | cumulative | imported package" ; l'indentation du nom donne la profondeur
+        _, cumulative_us, name = line.split("|", 2)
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        cumulative[name] = int(cumulative_us)
+        if depth == 1 and name == module:
+            module_us = int(cumulative_us)
+    return module_us / 1000, cumulative
+
+
+def best_import(preload=FRAMEWORK_MODULES):
+    """Meilleure mesure sur IMPORT_TIME_RUNS interpréteurs neufs"""
+    runs = [profile_import(preload=preload) for _ in range(max(1, IMPORT_TIME_RUNS))]
+    return min(runs, key=lambda run: run[0])
+
+
+def test_import_time():
+    """Budgets d'import (à froid et hors framework) et absence de la pile IA"""
+    cold_ms, _ = best_import(preload=())
+    total_ms, cumulative = best_import()
+    runs = max(1, IMPORT_TIME_RUNS)
+
+    print("🧪 Temps d'import de app.main")
+    print("=" * 40)
+    print(f"⏱️ app.main à froid: {cold_ms:.0f} ms, meilleur de {runs} (budget {COLD_IMPORT_BUDGET_MS:.0f} ms)")
+    print(f"⏱️ app.main (hors framework): {total_ms:.0f} ms, meilleur de {runs} (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print("📊 Modules les plus lents (cumulé):")
+    app_modules = {name: micros for name, micros in cumulative.items() if name.startswith("app")}
+    for name, micros in sorted(app_modules.items(), key=lambda item: -item[1])[:15]:
+        print(f"   {micros / 1000:8.1f} ms  {name}")
+
+    loaded = sorted(
+        name for name in cumulative
+        if any(name == heavy or name.startswith(f"{heavy}.") for heavy in HEAVY_MODULES)
+    )
+    assert not loaded, f"Pile IA importée au démarrage: {', '.join(loaded[:10])}"
+    assert total_ms <= IMPORT_BUDGET_MS, f"Import trop lent: {total_ms:.0f} ms > {IMPORT_BUDGET_MS:.0f} ms"
+    assert cold_ms <= COLD_IMPORT_BUDGET_MS, (
+        f"Démarrage à froid trop lent: {cold_ms:.0f} ms > {COLD_IMPORT_BUDGET_MS:.0f} ms"
+    )
+    print("✅ Démarrage sous le budget, pile IA non chargée")
+
+
+if __name__ == "__main__":
+    try:
+        test_import_time()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Vérifie les décisions du cache sémantique sur des paires de questions de référence
+Une reformulation doit réutiliser la réponse ; une question qui change de sens juridique
+(verbe, notion, négation, borne, numéro d'article) ne doit jamais la réutiliser, même très proche
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.semantic_cache import SemanticCache, embed_question
+
+SCOPE = "test"
+
+# (question en cache, question posée)
+SAME_ANSWER = [
+    ("Comment est élu le président de la République ?", "Comment le président de la République est-il élu ?"),
+    ("Quelle est la durée du mandat du président ?", "Quelle est la durée du mandat présidentiel ?"),
+]
+
+DIFFERENT_ANSWER = [
+    ("Qui nomme les membres de la Cour constitutionnelle de la République ?",
+     "Qui révoque les membres de la Cour constitutionnelle de la République ?"),
+    ("Quels droits peuvent être suspendus pendant l'état d'urgence ?",
+     "Quels droits peuvent être suspendus pendant l'état de siège ?"),
+    ("Le président peut-il être réélu ?", "Le président ne peut-il pas être réélu ?"),
+    ("Quel est l'âge minimum pour être candidat ?", "Quel est l'âge maximum pour être candidat ?"),
+    ("Que dit l'article 12 ?", "Que dit l'article 13 ?"),
+]
+
+
+def _similarity(cached: str, question: str) -> float:
+    return float(embed_question(cached) @ embed_question(question))
+
+
+def test_semantic_cache():
+    """Réutilisation des reformulations, refus des questions au sens différent"""
+    print("🧪 Décisions du cache sémantique")
+    print("=" * 40)
+    failures = []
+    for expected_hit, pairs in ((True, SAME_ANSWER), (False, DIFFERENT_ANSWER)):
+        for cached, question in pairs:
+            cache = SemanticCache(default_threshold=0.82)
+            cache.store(cached, {"response": cached}, SCOPE)
+            hit = cache.lookup(question, SCOPE) is not None
+            status = "✅" if hit == expected_hit else "❌"
+            print(f"{status} {'réutilisée' if hit else 'non réutilisée'} ({_similarity(cached, question):.2f}): {question}")
+            if hit != expected_hit:
+                failures.append(question)
+    assert not failures, f"Décisions incorrectes: {failures}"
+    print("✅ Toutes les décisions sont correctes")
+
+
+if __name__ == "__main__":
+    try:
+        test_semantic_cache()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)